@@ -0,0 +1,91 @@
+"""
+Mikro-benchmark parsowania znaczników czasu na pełnej krajowej liście hydro
+
+Uruchomienie:
+    python benchmarks/bench_timestamps.py [--stations 900] [--repeat 20]
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+for path in (ROOT, ROOT / "src"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from flood_monitoring.services.timestamps import IMGWTimestampParser
+
+
+def legacy_parse(date_str):
+    """Dawny IMGWService._parse_datetime (bez logowania) - punkt odniesienia"""
+    if not date_str:
+        return None
+    try:
+        parsed_date = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        for fmt in ("%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M:%S.%f", "%Y-%m-%dT%H:%M:%S.%fZ", "%Y-%m-%dT%H:%M:%SZ"):
+            try:
+                parsed_date = datetime.strptime(date_str.replace("+00:00", ""), fmt)
+                break
+            except ValueError:
+                continue
+        else:
+            return None
+    now = datetime.now()
+    if parsed_date.date() > now.date():
+        return None
+    elif parsed_date.date() == now.date() and parsed_date.time() > now.time():
+        return None
+    return parsed_date
+
+
+def national_payload(stations: int):
+    """Syntetyczne kolumny dat jak w odpowiedzi /api/data/hydro/"""
+    base = datetime.now().replace(minute=0, second=0, microsecond=0) - timedelta(hours=2)
+    stan = []
+    przeplyw = []
+    for _ in range(stations):
+        stan.append((base - timedelta(minutes=10 * random.randint(0, 12))).strftime("%Y-%m-%d %H:%M:%S"))
+        przeplyw.append(
+            (base - timedelta(hours=random.randint(0, 24))).strftime("%Y-%m-%d %H:%M:%S")
+            if random.random() < 0.6
+            else None
+        )
+    return stan + przeplyw
+
+
+def measure(label, func, values, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(values)
+        best = min(best, time.perf_counter() - start)
+    per_value = best / len(values) * 1e6
+    print(f"{label:<28} {best * 1e3:8.2f} ms / payload  {per_value:6.2f} us / value")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--stations", type=int, default=900)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    values = national_payload(args.stations)
+    print(f"{len(values)} timestamp values ({len(set(values))} distinct), best of {args.repeat}")
+
+    legacy = measure("legacy strptime loop", lambda column: [legacy_parse(v) for v in column], values, args.repeat)
+    def parse_uncached(column):
+        parser = IMGWTimestampParser()
+        return [parser._parse_uncached(value) if value else None for value in column]
+
+    uncached = measure("parser, no cache", parse_uncached, values, args.repeat)
+    column = measure("parser.parse_column", lambda column: IMGWTimestampParser().parse_column(column), values, args.repeat)
+    print(f"speed-up vs legacy: {legacy / uncached:.1f}x uncached, {legacy / column:.1f}x column")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+Lokalny zamiennik API IMGW do testów obciążeniowych synchronizacji
+
+Uruchomienie:
+    python benchmarks/fake_imgw.py [--stations 900] [--latency 50] [--error-rate 0.01] [--port 8081]
+
+Serwuje /api/data/hydro/, /api/data/hydro/id/{id} i /api/data/warningshydro z syntetycznych
+danych albo z nagranych plików JSON (--hydro-fixture, --warnings-fixture). Odpowiedzi mają
+ETag i obsługują If-None-Match. Odczyty przesuwają się o 10 minut co --tick sekund
+(albo po wywołaniu FakeIMGW.advance()), żeby kolejne synchronizacje miały nowe dane.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+RIVERS = ("Wisła", "Odra", "San", "Bug", "Narew", "Warta", "Wisłok", "Solinka", "Wołosatka", "Osława")
+VOIVODESHIPS = ("podkarpackie", "małopolskie", "śląskie", "mazowieckie", "dolnośląskie", "lubelskie")
+
+
+def synthetic_stations(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Metadane stacji i bazowe wartości w formacie listy hydro"""
+    rng = random.Random(seed)
+    stations = []
+    for index in range(count):
+        stations.append(
+            {
+                "id_stacji": f"15{index:07d}",
+                "stacja": f"STACJA {index}",
+                "rzeka": rng.choice(RIVERS),
+                "województwo": rng.choice(VOIVODESHIPS),
+                "lon": f"{rng.uniform(14.1, 24.1):.6f}",
+                "lat": f"{rng.uniform(49.0, 54.8):.6f}",
+                "stan_wody": rng.randint(50, 600),
+                "przelyw": round(rng.uniform(0.5, 900.0), 3) if rng.random() < 0.6 else None,
+            }
+        )
+    return stations
+
+
+def synthetic_warnings(stations: List[Dict[str, Any]], count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    now = datetime.now().replace(second=0, microsecond=0)
+    return [
+        {
+            "opublikowano": (now - timedelta(hours=index)).strftime("%Y-%m-%d %H:%M:%S"),
+            "stopień": str(rng.randint(1, 3)),
+            "data_od": now.strftime("%Y-%m-%d %H:%M:%S"),
+            "data_do": (now + timedelta(days=1)).strftime("%Y-%m-%d %H:%M:%S"),
+            "prawdopodobienstwo": str(rng.choice((70, 80, 90))),
+            "numer": str(index + 1),
+            "biuro": "BPH Kraków",
+            "zdarzenie": "Wezbranie z przekroczeniem stanów ostrzegawczych",
+            "przebieg": "Wzrost stanów wody.",
+            "komentarz": "",
+            "obszary": [
+                {"wojewodztwo": station["województwo"], "opis": f"zlewnia {station['rzeka']}", "kod_zlewni": "2"}
+                for station in rng.sample(stations, min(3, len(stations)))
+            ],
+        }
+        for index in range(count)
+    ]
+
+
+class FakeIMGW:
+    """Stan serwera: stacje, generacja odczytów, opóźnienia i wstrzykiwane błędy"""
+
+    def __init__(
+        self,
+        stations: int = 900,
+        warnings: int = 20,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        tick: float = 0.0,
+        hydro_fixture: Optional[str] = None,
+        warnings_fixture: Optional[str] = None,
+        seed: int = 0,
+    ):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.tick = tick
+        self.rng = random.Random(seed)
+        self.recorded = None
+        if hydro_fixture:
+            with open(hydro_fixture, encoding="utf-8") as fixture:
+                self.recorded = json.load(fixture)
+            self.stations = self.recorded
+        else:
+            self.stations = synthetic_stations(stations, seed)
+        if warnings_fixture:
+            with open(warnings_fixture, encoding="utf-8") as fixture:
+                self.warnings = json.load(fixture)
+        else:
+            self.warnings = synthetic_warnings(self.stations, warnings, seed)
+        self.base_time = datetime.now().replace(second=0, microsecond=0) - timedelta(days=1)
+        self.started = time.monotonic()
+        self.manual_generation = 0
+        self.requests = 0
+        self.errors = 0
+        self._cache: Dict[int, Dict[str, Any]] = {}
+
+    def advance(self, steps: int = 1):
+        """Przesuń odczyty o kolejne 10 minut"""
+        self.manual_generation += steps
+
+    @property
+    def generation(self) -> int:
+        automatic = int((time.monotonic() - self.started) / self.tick) if self.tick > 0 else 0
+        return self.manual_generation + automatic
+
+    def _snapshot(self) -> Dict[str, Any]:
+        """Lista hydro dla bieżącej generacji (treść i ETag liczone raz na generację)"""
+        generation = self.generation
+        cached = self._cache.get(generation)
+        if cached is not None:
+            return cached
+        if self.recorded is not None:
+            items = self.recorded
+        else:
+            measured_at = (self.base_time + timedelta(minutes=10 * generation)).strftime("%Y-%m-%d %H:%M:%S")
+            items = []
+            for index, station in enumerate(self.stations):
+                wobble = (index + generation) % 7 - 3
+                item = {key: value for key, value in station.items() if key not in ("stan_wody", "przelyw")}
+                item["stan_wody"] = str(station["stan_wody"] + wobble)
+                item["stan_wody_data_pomiaru"] = measured_at
+                if station["przelyw"] is not None:
+                    item["przelyw"] = f"{station['przelyw'] + wobble / 10:.3f}"
+                    item["przeplyw_data"] = measured_at
+                else:
+                    item["przelyw"] = None
+                    item["przeplyw_data"] = None
+                items.append(item)
+        snapshot = {
+            "items": items,
+            "by_id": {item["id_stacji"]: item for item in items},
+            "body": json.dumps(items, ensure_ascii=False).encode("utf-8"),
+        }
+        snapshot["etag"] = f'"{hashlib.sha1(snapshot["body"]).hexdigest()}"'
+        self._cache = {generation: snapshot}
+        return snapshot
+
+    async def _delay(self) -> bool:
+        """Odczekaj opóźnienie; zwraca True, jeśli żądanie ma zakończyć się błędem"""
+        self.requests += 1
+        delay = self.latency + (self.rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self.error_rate and self.rng.random() < self.error_rate:
+            self.errors += 1
+            return True
+        return False
+
+    @staticmethod
+    def _json(request: web.Request, body: bytes, etag: str) -> web.Response:
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(body=body, content_type="application/json", headers={"ETag": etag})
+
+    async def hydro(self, request: web.Request) -> web.Response:
+        if await self._delay():
+            return web.Response(status=503)
+        snapshot = self._snapshot()
+        return self._json(request, snapshot["body"], snapshot["etag"])
+
+    async def station(self, request: web.Request) -> web.Response:
+        if await self._delay():
+            return web.Response(status=503)
+        item = self._snapshot()["by_id"].get(request.match_info["station_id"])
+        body = json.dumps([item] if item is not None else [], ensure_ascii=False).encode("utf-8")
+        return self._json(request, body, f'"{hashlib.sha1(body).hexdigest()}"')
+
+    async def warnings_list(self, request: web.Request) -> web.Response:
+        if await self._delay():
+            return web.Response(status=503)
+        body = json.dumps(self.warnings, ensure_ascii=False).encode("utf-8")
+        return self._json(request, body, f'"{hashlib.sha1(body).hexdigest()}"')
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/api/data/hydro", self.hydro)
+        app.router.add_get("/api/data/hydro/", self.hydro)
+        # Klient skleja adres bazowy z "/id/..." - dopuszczamy podwójny ukośnik
+        app.router.add_get(r"/api/data/hydro{sep:/+}id/{station_id}", self.station)
+        app.router.add_get("/api/data/warningshydro", self.warnings_list)
+        return app
+
+    def stats(self) -> Dict[str, int]:
+        return {"requests": self.requests, "errors": self.errors, "generation": self.generation}
+
+
+async def start_fake_imgw(fake: FakeIMGW, host: str = "127.0.0.1", port: int = 0) -> web.AppRunner:
+    """Uruchom serwer w bieżącej pętli zdarzeń; port 0 wybiera wolny port (runner.addresses)"""
+    runner = web.AppRunner(fake.app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+def add_server_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--stations", type=int, default=900, help="liczba syntetycznych stacji")
+    parser.add_argument("--warnings", type=int, default=20, help="liczba syntetycznych ostrzeżeń")
+    parser.add_argument("--latency", type=float, default=0.0, help="opóźnienie odpowiedzi [ms]")
+    parser.add_argument("--jitter", type=float, default=0.0, help="losowy rozrzut opóźnienia [ms]")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="odsetek odpowiedzi 503")
+    parser.add_argument("--hydro-fixture", help="nagrana lista hydro (JSON)")
+    parser.add_argument("--warnings-fixture", help="nagrana lista ostrzeżeń (JSON)")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def fake_from_arguments(args: argparse.Namespace, tick: float = 0.0) -> FakeIMGW:
+    return FakeIMGW(
+        stations=args.stations,
+        warnings=args.warnings,
+        latency_ms=args.latency,
+        jitter_ms=args.jitter,
+        error_rate=args.error_rate,
+        tick=tick,
+        hydro_fixture=args.hydro_fixture,
+        warnings_fixture=args.warnings_fixture,
+        seed=args.seed,
+    )
+
+
+async def serve(args: argparse.Namespace):
+    fake = fake_from_arguments(args, args.tick)
+    runner = await start_fake_imgw(fake, args.host, args.port)
+    print(f"Fake IMGW with {len(fake.stations)} stations on http://{args.host}:{args.port}/api/data/hydro")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    add_server_arguments(parser)
+    parser.add_argument("--tick", type=float, default=600.0, help="co ile sekund pojawiają się nowe odczyty")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,35 @@
 """
 Definicje zależności dla FastAPI
 """
-from fastapi import Depends
+from fastapi import Depends, Request
 from sqlalchemy.orm import Session
 
 from src.flood_monitoring.core.database import get_db
 from flood_monitoring.services.database import DatabaseService
+from flood_monitoring.services.http_client import IMGWHttpClient
 from flood_monitoring.services.imgw import IMGWService
+from flood_monitoring.services.jobs import SyncJobQueue
+from flood_monitoring.services.runs import SyncRunStore
 
 
 def get_database_service(db: Session = Depends(get_db)) -> DatabaseService:
     return DatabaseService(db)
 
 
+def get_http_client(request: Request) -> IMGWHttpClient:
+    return request.app.state.http_client
+
+
 def get_imgw_service(
     db_service: DatabaseService = Depends(get_database_service),
+    http_client: IMGWHttpClient = Depends(get_http_client),
 ) -> IMGWService:
-    return IMGWService(db_service)
+    return IMGWService(db_service, http_client)
+
+
+def get_sync_job_queue(db: Session = Depends(get_db)) -> SyncJobQueue:
+    return SyncJobQueue(db)
+
+
+def get_sync_run_store(db: Session = Depends(get_db)) -> SyncRunStore:
+    return SyncRunStore(db)
@@ -1,18 +1,20 @@
+import asyncio
 import logging
 import os
 import sys
+from contextlib import asynccontextmanager
 from typing import Dict
 
-import aiohttp
 from fastapi import Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from flood_monitoring.api.dependencies import get_imgw_service
+from flood_monitoring.api.dependencies import get_http_client, get_imgw_service
 from flood_monitoring.api.routers import stations, sync, warnings
 from src.flood_monitoring.core.config import get_settings
 from src.flood_monitoring.core.database import get_db
+from flood_monitoring.services.http_client import IMGWHttpClient
 from flood_monitoring.services.imgw import IMGWService
 
 log_level = os.getenv("LOG_LEVEL", "INFO")
@@ -27,8 +29,23 @@ logging.getLogger("flood_monitoring").setLevel(logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 settings = get_settings()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Zasoby o czasie życia aplikacji (synchronizacją zajmuje się osobny worker)"""
+    app.state.http_client = IMGWHttpClient()
+    await app.state.http_client.start()
+    try:
+        yield
+    finally:
+        await app.state.http_client.close()
+
+
 app = FastAPI(
-    title=settings.PROJECT_NAME, openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    title=settings.PROJECT_NAME,
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -52,7 +69,9 @@ async def root():
 
 @app.get("/health", response_model=Dict[str, str])
 async def health_check(
-    db: Session = Depends(get_db), imgw_service: IMGWService = Depends(get_imgw_service)
+    db: Session = Depends(get_db),
+    imgw_service: IMGWService = Depends(get_imgw_service),
+    http_client: IMGWHttpClient = Depends(get_http_client),
 ):
     logger.info("Performing health check")
     status = {
@@ -63,7 +82,7 @@ async def health_check(
     }
 
     try:
-        db.execute(text("SELECT 1"))
+        await asyncio.to_thread(db.execute, text("SELECT 1"))
         logger.debug("Database connection test successful")
     except Exception as e:
         logger.error(f"Database connection test failed: {str(e)}")
@@ -72,14 +91,13 @@ async def health_check(
         raise HTTPException(status_code=503, detail=status)
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(f"{imgw_service.base_url}/station") as response:
-                if response.status != 200:
-                    logger.error(f"IMGW API test failed with status {response.status}")
-                    status["status"] = "unhealthy"
-                    status["imgw_api"] = f"error: status {response.status}"
-                    raise HTTPException(status_code=503, detail=status)
-                logger.debug("IMGW API connection test successful")
+        async with http_client.session.get(f"{imgw_service.base_url}/station") as response:
+            if response.status != 200:
+                logger.error(f"IMGW API test failed with status {response.status}")
+                status["status"] = "unhealthy"
+                status["imgw_api"] = f"error: status {response.status}"
+                raise HTTPException(status_code=503, detail=status)
+            logger.debug("IMGW API connection test successful")
     except Exception as e:
         logger.error(f"IMGW API connection test failed: {str(e)}")
         status["status"] = "unhealthy"
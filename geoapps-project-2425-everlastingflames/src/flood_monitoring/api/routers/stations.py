@@ -1,12 +1,13 @@
 import logging
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Literal, Optional, Dict, Any
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 from geojson import Feature, FeatureCollection, Point
 
 from flood_monitoring.api.dependencies import get_database_service
+from flood_monitoring.services import rollups
 from flood_monitoring.services.database import DatabaseService
 
 logger = logging.getLogger(__name__)
@@ -23,12 +24,19 @@ class Station(BaseModel):
     wojewodztwo: str
 
 
-class StanMeasurement(BaseModel):
+class RollupFields(BaseModel):
+    """Tylko dla agregatów: wartość pomiaru jest wtedy średnią z okresu"""
+    minimum: Optional[float] = None
+    maksimum: Optional[float] = None
+    liczba: Optional[int] = None
+
+
+class StanMeasurement(RollupFields):
     stan_wody_data_pomiaru: datetime
     stan_wody: float
 
 
-class PrzeplywMeasurement(BaseModel):
+class PrzeplywMeasurement(RollupFields):
     przeplyw_data: datetime
     przelyw: float
 
@@ -36,10 +44,12 @@ class PrzeplywMeasurement(BaseModel):
 class StationMeasurements(BaseModel):
     stan: List[StanMeasurement]
     przelyw: List[PrzeplywMeasurement]
+    rozdzielczosc: str = "raw"
+    next_cursor: Optional[str] = None
 
 """Pobieranie danych w formacie geojson"""
 @router.get("/", response_model=Dict[str, Any])
-async def get_stations(db_service: DatabaseService = Depends(get_database_service)):
+def get_stations(db_service: DatabaseService = Depends(get_database_service)):
 
     try:
         stations = db_service.get_all_stations()
@@ -80,24 +90,43 @@ async def get_stations(db_service: DatabaseService = Depends(get_database_servic
 
 """Dane dla pojedynczej stacji"""
 @router.get("/{station_id}", response_model=StationMeasurements)
-async def get_station_data(
+def get_station_data(
     station_id: str,
     days: int = 7,
     extended: bool = False,
     limit: int = 100,
+    resolution: Literal["auto", "raw", "hour", "day"] = "auto",
+    paginate: bool = False,
+    cursor: Optional[str] = None,
+    stan_limit: int = Query(50, ge=1, le=1000),
+    przeplyw_limit: int = Query(50, ge=1, le=1000),
     db_service: DatabaseService = Depends(get_database_service),
 ):
 
     try:
-        logger.info(f"Received request for station {station_id} data (extended={extended}, days={days}, limit={limit})")
+        logger.info(f"Received request for station {station_id} data (extended={extended}, days={days}, limit={limit}, resolution={resolution}, paginate={paginate or bool(cursor)})")
         
-        if extended:
-            measurements = db_service.get_station_measurements_extended(station_id, days, limit)
+        if paginate or cursor:
+            # Surowe pomiary stronami od najnowszych; kolejna strona po next_cursor z odpowiedzi
+            measurements = db_service.get_station_measurements_page(
+                station_id, days, stan_limit, przeplyw_limit, cursor
+            )
         else:
-            measurements = db_service.get_station_measurements(station_id, days)
+            if resolution == "auto":
+                # Długie zakresy z agregatów zamiast wszystkich surowych pomiarów
+                resolution = rollups.resolution_for(days)
+            if extended and resolution == "raw":
+                measurements = db_service.get_station_measurements_extended(station_id, days, limit)
+            elif resolution == "raw":
+                measurements = db_service.get_station_measurements(station_id, days)
+            else:
+                measurements = db_service.get_station_rollups(station_id, days, resolution)
+            measurements["rozdzielczosc"] = resolution
             
         logger.info(f"Sending response for station {station_id}: {len(measurements.get('stan', []))} stan measurements, {len(measurements.get('przelyw', []))} flow measurements")
         return measurements
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting data for station {station_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
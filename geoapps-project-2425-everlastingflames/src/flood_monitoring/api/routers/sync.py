@@ -1,77 +1,172 @@
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
-from flood_monitoring.services.imgw import IMGWService
-from flood_monitoring.api.dependencies import get_imgw_service
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from flood_monitoring.services.database import DatabaseService
+from flood_monitoring.services.jobs import SyncJobQueue
+from flood_monitoring.services.locks import is_locked
+from flood_monitoring.services.polling import load_snapshot
+from flood_monitoring.services.runs import SyncRunStore
+from flood_monitoring.api.dependencies import get_database_service, get_sync_job_queue, get_sync_run_store
+from src.flood_monitoring.core.config import get_settings
+from datetime import datetime
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
 router = APIRouter(prefix="/sync", tags=["sync"])
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
-"""Pomiary dla stacji w tle"""
-async def sync_all_measurements(imgw_service: IMGWService, days: int = 7):
 
+class SyncJobResponse(BaseModel):
+    id: int
+    kind: str
+    params: Dict[str, Any]
+    status: str
+    utworzono: datetime
+    rozpoczeto: Optional[datetime] = None
+    zakonczono: Optional[datetime] = None
+    worker: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    model_config = {"from_attributes": True}
+
+
+class SyncRunResponse(BaseModel):
+    id: int
+    kind: str
+    trigger: str
+    job_id: Optional[int] = None
+    status: str
+    rozpoczeto: datetime
+    zakonczono: Optional[datetime] = None
+    czas_trwania: Optional[float] = None
+    etapy: Optional[Dict[str, float]] = None
+    liczniki: Optional[Dict[str, int]] = None
+    http: Optional[Dict[str, Any]] = None
+    bledy: Optional[Dict[str, str]] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    model_config = {"from_attributes": True}
+
+
+def enqueue(queue: SyncJobQueue, kind: str, message: str, **params) -> Dict[str, Any]:
+    """Dodaj zadanie do kolejki workera i zwróć jego identyfikator (409, jeśli taka synchronizacja już trwa)"""
     try:
-        stations = await imgw_service.get_stations()
-        for station in stations:
-            try:
-                await imgw_service.get_station_data(station["id_stacji"], days=days)
-            except Exception as e:
-                logger.error(f"Blad synchronizacji stacji {station['id_stacji']}: {str(e)}")
+        running = is_locked(queue.db, kind)
     except Exception as e:
-        logger.error(f"Blad pobierania: {str(e)}")
-"""Wszystkie dane z imgw"""
-@router.post("/all")
-async def sync_all_data(background_tasks: BackgroundTasks, days: int = 7, imgw_service: IMGWService = Depends(get_imgw_service)):
-
+        logger.error(f"Blad sprawdzania blokady: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    if running:
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "Synchronizacja juz trwa", "kind": kind, "run_id": SyncRunStore(queue.db).active(kind)},
+        )
     try:
-        background_tasks.add_task(sync_all_measurements, imgw_service, days)
-        return {"message": "Synchronizacja danych w tle ..."}
+        job = queue.enqueue(kind, params)
+        return {"message": message, "job_id": job.id, "status": job.status}
     except Exception as e:
-        logger.error(f"Blad synchronizacji: {str(e)}")
+        logger.error(f"Blad kolejkowania: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+"""Wszystkie dane z imgw: domyślnie jedno pobranie listy hydro, z by_id=true każda stacja osobno"""
+@router.post("/all", status_code=202)
+def sync_all_data(
+    by_id: bool = False,
+    concurrency: Optional[int] = None,
+    queue: SyncJobQueue = Depends(get_sync_job_queue),
+):
+
+    if by_id:
+        return enqueue(queue, "all", "Synchronizacja danych po ID w kolejce ...", concurrency=concurrency)
+    return enqueue(queue, "measurements", "Synchronizacja danych w kolejce ...")
+
 """Synchronizacja stacji i ich pomiarow"""
-@router.post("/stations")
-async def sync_stations(imgw_service: IMGWService = Depends(get_imgw_service)):
+@router.post("/stations", status_code=202)
+def sync_stations(
+    bulk: bool = True,
+    station_ids: Optional[List[str]] = Query(None),
+    concurrency: Optional[int] = None,
+    queue: SyncJobQueue = Depends(get_sync_job_queue),
+):
+
+    if station_ids:
+        return enqueue(
+            queue, "all", f"Synchronizacja {len(station_ids)} stacji w kolejce ...",
+            station_ids=list(dict.fromkeys(station_ids)), concurrency=concurrency,
+        )
+    if bulk:
+        return enqueue(queue, "measurements", "Synchronizacja stacji i pomiarow w kolejce ...")
+    return enqueue(queue, "all", "Synchronizacja stacji w kolejce ...", concurrency=concurrency)
+
+"""Synchronizacja danych dla konkretnej stacji"""
+@router.post("/station/{station_id}", status_code=202)
+def sync_station_data(station_id: str, queue: SyncJobQueue = Depends(get_sync_job_queue)):
+
+    return enqueue(queue, "all", f"Synchronizacja stacji {station_id} w kolejce ...", station_ids=[station_id])
+
+"""Synchronizacja ostrzezen imgw dla"""
+@router.post("/warnings", status_code=202)
+def sync_warnings(queue: SyncJobQueue = Depends(get_sync_job_queue)):
+
+    return enqueue(queue, "warnings", "Synchronizacja ostrzezen w kolejce ...")
+
+"""Ostatnie zadania synchronizacji"""
+@router.get("/jobs", response_model=List[SyncJobResponse])
+def get_sync_jobs(
+    limit: int = Query(50, ge=1, le=500),
+    status: Optional[str] = None,
+    queue: SyncJobQueue = Depends(get_sync_job_queue),
+):
 
     try:
-        stations = await imgw_service.get_stations()
-        stan_count = 0
-        przeplyw_count = 0
-        for station in stations:
-            try:
-                measurement_stan = await imgw_service.get_station_data_stan(station["id_stacji"], days=7)
-                measurement_przelyw = await imgw_service.get_station_data_przelyw(station["id_stacji"], days=7)
-                stan_count += len(measurement_stan["stan_wody"])
-                przeplyw_count += len(measurement_przelyw["przelyw"])
-                logger.info(f"Synchronizowano pomiary dla stacji {station['id_stacji']}: {len(measurement_stan['stan_wody'])} stan, {len(measurement_przelyw['przelyw'])} przelyw")
-            except Exception as e:
-                logger.error(f"Blad synchronizacji dla stacji {station['id_stacji']}: {str(e)}")
-        return {
-            "message": f"Zaktualizowano {len(stations)} stacji, {stan_count} pomiarow, {przeplyw_count} przeplywow"
-        }
+        return queue.recent(limit, status)
     except Exception as e:
-        logger.error(f"Blad synchronizacji: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-"""Synchronizacja danych dla konkretnej stacji"""
-@router.post("/station/{station_id}")
-async def sync_station_data(station_id: str, days: int = 7, imgw_service: IMGWService = Depends(get_imgw_service)):
+"""Status zadania synchronizacji"""
+@router.get("/jobs/{job_id}", response_model=SyncJobResponse)
+def get_sync_job(job_id: int, queue: SyncJobQueue = Depends(get_sync_job_queue)):
+
+    job = queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Zadanie nie istnieje")
+    return job
+
+"""Ostatnie przebiegi synchronizacji z czasami etapów i opóźnieniami IMGW"""
+@router.get("/runs", response_model=List[SyncRunResponse])
+def get_sync_runs(
+    limit: int = Query(50, ge=1, le=500),
+    kind: Optional[str] = None,
+    status: Optional[str] = None,
+    store: SyncRunStore = Depends(get_sync_run_store),
+):
 
     try:
-        measurements = await imgw_service.get_station_data(station_id, days)
-        return {"message": f"Zaktualizowano dane dla stacji {station_id}"}
+        return store.recent(limit, kind, status)
     except Exception as e:
-        logger.error(f"Blad synchronizacja dla:  {station_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-"""Synchronizacja ostrzezen imgw dla"""
-@router.post("/warnings")
-async def sync_warnings(imgw_service: IMGWService = Depends(get_imgw_service)):
+"""Szczegóły przebiegu synchronizacji"""
+@router.get("/runs/{run_id}", response_model=SyncRunResponse)
+def get_sync_run(run_id: int, store: SyncRunStore = Depends(get_sync_run_store)):
+
+    run = store.get(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Przebieg nie istnieje")
+    return run
 
+
+"""Harmonogram odpytywania stacji zapisany przez worker (z licznikami trafień i chybień)"""
+@router.get("/schedule")
+def get_poll_schedule(db_service: DatabaseService = Depends(get_database_service)):
+
+    if not settings.SYNC_ADAPTIVE_POLLING:
+        raise HTTPException(status_code=404, detail="Adaptacyjne odpytywanie jest wylaczone")
     try:
-        await imgw_service.sync_warnings()
-        return {"message": "Ostrzezenia zsynchronizowane"}
+        snapshot = load_snapshot(db_service.db)
     except Exception as e:
-        logger.error(f"Blad synchronizacji: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="Worker nie zapisal jeszcze harmonogramu")
+    return snapshot
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from pydantic import BaseModel  # Add this import
 from datetime import datetime
 
@@ -28,11 +28,14 @@ class WarningResponse(BaseModel):
     zdarzenie: str
     przebieg: str
     komentarz: str
+    aktywne: bool = True
+    zmieniono: Optional[datetime] = None
+    wycofano: Optional[datetime] = None
     obszary: List[WarningAreaResponse]
 
 """Pobieranie listy ostrzezen"""
 @router.get("/", response_model=List[WarningResponse])
-async def get_warnings(db_service: DatabaseService = Depends(get_database_service)):
+def get_warnings(db_service: DatabaseService = Depends(get_database_service)):
 
     try:
         warnings = db_service.get_all_warnings()
@@ -58,6 +61,9 @@ async def get_warnings(db_service: DatabaseService = Depends(get_database_servic
                     zdarzenie=warning.zdarzenie,
                     przebieg=warning.przebieg,
                     komentarz=warning.komentarz,
+                    aktywne=warning.aktywne,
+                    zmieniono=warning.zmieniono,
+                    wycofano=warning.wycofano,
                     obszary=areas
                 )
             )
@@ -67,7 +73,7 @@ async def get_warnings(db_service: DatabaseService = Depends(get_database_servic
 
 """Pobieranie konkretnych ostrzezen"""
 @router.get("/{warning_id}", response_model=WarningResponse)
-async def get_warning(
+def get_warning(
     warning_id: int,
     db_service: DatabaseService = Depends(get_database_service),
 ):
@@ -95,6 +101,9 @@ async def get_warning(
             zdarzenie=warning.zdarzenie,
             przebieg=warning.przebieg,
             komentarz=warning.komentarz,
+            aktywne=warning.aktywne,
+            zmieniono=warning.zmieniono,
+            wycofano=warning.wycofano,
             obszary=areas
         )
     except Exception as e:
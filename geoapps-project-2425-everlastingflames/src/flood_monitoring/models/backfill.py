@@ -0,0 +1,20 @@
+from sqlalchemy import Column, DateTime, Integer, String, func
+
+from src.flood_monitoring.core.database import Base
+
+
+class BackfillFile(Base):
+
+    __tablename__ = "backfill_files"
+
+    skrot = Column(String, primary_key=True)
+    nazwa = Column(String, nullable=False)
+    rozmiar = Column(Integer, nullable=False)
+    zaimportowano = Column(DateTime, nullable=False, server_default=func.now())
+    wiersze = Column(Integer, nullable=False, default=0)
+    stan_dodane = Column(Integer, nullable=False, default=0)
+    przeplyw_dodane = Column(Integer, nullable=False, default=0)
+    nieznane_stacje = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<BackfillFile(nazwa='{self.nazwa}', skrot='{self.skrot[:12]}')>"
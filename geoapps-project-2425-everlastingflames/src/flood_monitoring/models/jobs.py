@@ -0,0 +1,27 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text, func
+from sqlalchemy.dialects.postgresql import JSONB
+
+from src.flood_monitoring.core.database import Base
+
+
+class SyncJob(Base):
+
+    __tablename__ = "sync_jobs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(String, nullable=False)
+    params = Column(JSONB, nullable=False, default=dict, server_default="{}")
+    status = Column(String, nullable=False, default="queued", server_default="queued")
+    utworzono = Column(DateTime, nullable=False, server_default=func.now())
+    rozpoczeto = Column(DateTime)
+    zakonczono = Column(DateTime)
+    worker = Column(String)
+    result = Column(JSONB)
+    error = Column(Text)
+
+    __table_args__ = (
+        Index("ix_sync_jobs_status_id", "status", "id"),
+    )
+
+    def __repr__(self):
+        return f"<SyncJob(id={self.id}, kind='{self.kind}', status='{self.status}')>"
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, DateTime, Float, ForeignKey, String
+
+from src.flood_monitoring.core.database import Base
+
+
+class StationLatest(Base):
+    """Najnowszy pomiar stanu wody i przepływu każdej stacji, aktualizowany przy zapisie pomiarów"""
+
+    __tablename__ = "station_latest"
+
+    station_id = Column(String, ForeignKey("stations.id_stacji"), primary_key=True)
+    stan_wody = Column(Float)
+    stan_wody_data_pomiaru = Column(DateTime)
+    przeplyw = Column(Float)
+    przeplyw_data = Column(DateTime)
+
+    def __repr__(self):
+        return f"<StationLatest(station_id='{self.station_id}', stan_wody_data_pomiaru='{self.stan_wody_data_pomiaru}')>"
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, DateTime, Integer
+from sqlalchemy.dialects.postgresql import JSONB
+
+from src.flood_monitoring.core.database import Base
+
+
+class PollSchedule(Base):
+    """Ostatni stan harmonogramu odpytywania zapisany przez worker (jeden wiersz)"""
+
+    __tablename__ = "poll_schedule"
+
+    id = Column(Integer, primary_key=True, default=1)
+    zapisano = Column(DateTime, nullable=False)
+    harmonogram = Column(JSONB, nullable=False)
+
+    def __repr__(self):
+        return f"<PollSchedule(zapisano='{self.zapisano}')>"
@@ -0,0 +1,42 @@
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, PrimaryKeyConstraint, String
+from sqlalchemy.orm import declared_attr
+
+from src.flood_monitoring.core.database import Base
+
+
+class RollupColumns:
+    """Agregaty pomiarów stacji w okresie (godzina lub doba czasu lokalnego)"""
+
+    @declared_attr
+    def station_id(cls):
+        return Column(String, ForeignKey("stations.id_stacji"), nullable=False)
+
+    # "stan" albo "przeplyw"
+    seria = Column(String, nullable=False)
+    okres = Column(DateTime, nullable=False)
+    liczba = Column(Integer, nullable=False)
+    # Suma i suma kwadratów pozwalają przyrostowo liczyć średnią i odchylenie standardowe
+    suma = Column(Float, nullable=False)
+    suma_kwadratow = Column(Float, nullable=False)
+    minimum = Column(Float, nullable=False)
+    maksimum = Column(Float, nullable=False)
+    ostatni_pomiar = Column(DateTime, nullable=False)
+    ostatnia_wartosc = Column(Float, nullable=False)
+
+    @declared_attr
+    def __table_args__(cls):
+        # Klucz zaczyna się od stacji - wykres jednej stacji to jeden zakres indeksu
+        return (PrimaryKeyConstraint("station_id", "seria", "okres"),)
+
+    def __repr__(self):
+        return f"<{type(self).__name__}(station_id='{self.station_id}', seria='{self.seria}', okres='{self.okres}')>"
+
+
+class HourlyRollup(RollupColumns, Base):
+
+    __tablename__ = "measurement_rollups_hourly"
+
+
+class DailyRollup(RollupColumns, Base):
+
+    __tablename__ = "measurement_rollups_daily"
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, DateTime, Float, Index, Integer, String, Text
+from sqlalchemy.dialects.postgresql import JSONB
+
+from src.flood_monitoring.core.database import Base
+
+
+class SyncRun(Base):
+
+    __tablename__ = "sync_runs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(String, nullable=False)
+    trigger = Column(String, nullable=False)
+    job_id = Column(Integer)
+    status = Column(String, nullable=False, default="running", server_default="running")
+    rozpoczeto = Column(DateTime, nullable=False)
+    zakonczono = Column(DateTime)
+    czas_trwania = Column(Float)
+    etapy = Column(JSONB)
+    liczniki = Column(JSONB)
+    http = Column(JSONB)
+    bledy = Column(JSONB)
+    result = Column(JSONB)
+    error = Column(Text)
+
+    __table_args__ = (
+        Index("ix_sync_runs_kind_id", "kind", "id"),
+    )
+
+    def __repr__(self):
+        return f"<SyncRun(id={self.id}, kind='{self.kind}', status='{self.status}')>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, String, Text, true
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import ARRAY
 
@@ -20,9 +20,17 @@ class HydroWarning(Base):
     zdarzenie = Column(String, nullable=False)
     przebieg = Column(Text, nullable=False)
     komentarz = Column(Text, nullable=False)
+    aktywne = Column(Boolean, nullable=False, default=True, server_default=true())
+    zmieniono = Column(DateTime)
+    wycofano = Column(DateTime)
+    skrot = Column(String)
 
     areas = relationship("WarningArea", back_populates="warning")
 
+    __table_args__ = (
+        Index("ix_warning_key", "numer", "biuro", "opublikowano"),
+    )
+
     def __repr__(self):
         return f"<HydroWarning(numer='{self.numer}', zdarzenie='{self.zdarzenie}')>"
 
@@ -39,5 +47,9 @@ class WarningArea(Base):
 
     warning = relationship("HydroWarning", back_populates="areas")
 
+    __table_args__ = (
+        Index("ix_warning_area_warning_id", "warning_id"),
+    )
+
     def __repr__(self):
         return f"<WarningArea(wojewodztwo='{self.wojewodztwo}', opis='{self.opis}')>"
\ No newline at end of file
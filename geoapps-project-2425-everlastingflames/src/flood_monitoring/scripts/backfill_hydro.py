@@ -0,0 +1,90 @@
+"""
+Import archiwalnych danych hydrologicznych IMGW (dobowe pliki codz_*.csv / *.zip)
+
+Uruchomienie: python -m flood_monitoring.scripts.backfill_hydro KATALOG_LUB_PLIK... [--station-map mapa.csv]
+
+Pliki ZIP są czytane strumieniowo, bez rozpakowywania. Każdy plik jest importowany w osobnej
+transakcji i odnotowywany w tabeli backfill_files, więc po przerwaniu wystarczy uruchomić
+import ponownie - zaimportowane pliki zostaną pominięte (--force importuje je jeszcze raz).
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from typing import List, Optional
+
+from src.flood_monitoring.core.config import get_settings
+from src.flood_monitoring.core.database import SessionLocal
+from flood_monitoring.services.backfill import HydroBackfill, load_station_map
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+    handlers=[logging.StreamHandler(sys.stdout)],
+)
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def collect_files(paths: List[str]) -> List[str]:
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, names in os.walk(path):
+                files.extend(
+                    os.path.join(directory, name) for name in names if name.lower().endswith((".zip", ".csv"))
+                )
+        else:
+            files.append(path)
+    return sorted(files)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Import archiwalnych danych hydrologicznych IMGW")
+    parser.add_argument("paths", nargs="+", help="pliki CSV/ZIP lub katalogi z nimi")
+    parser.add_argument("--station-map", help='plik CSV "kod_archiwalny,id_stacji" dla kodów innych niż id_stacji')
+    parser.add_argument("--force", action="store_true", help="importuj także pliki już zaimportowane")
+    parser.add_argument("--flush-rows", type=int, default=50 * settings.INGEST_BATCH_SIZE,
+                        help="liczba pomiarów zbieranych przed COPY")
+    args = parser.parse_args(argv)
+
+    station_map = load_station_map(args.station_map) if args.station_map else None
+    files = collect_files(args.paths)
+    totals = {"files": 0, "skipped": 0, "failed": 0, "rows": 0, "stan_inserted": 0, "przeplyw_inserted": 0}
+    started = time.perf_counter()
+
+    db = SessionLocal()
+    try:
+        backfill = HydroBackfill(db, station_map, args.flush_rows)
+        for path in files:
+            file_started = time.perf_counter()
+            try:
+                result = backfill.import_file(path, force=args.force)
+            except Exception as e:
+                totals["failed"] += 1
+                logger.error(f"Failed to import {path}: {str(e)}")
+                continue
+            if result is None:
+                totals["skipped"] += 1
+                logger.info(f"Skipping {path}: already imported")
+                continue
+            totals["files"] += 1
+            for key in ("rows", "stan_inserted", "przeplyw_inserted"):
+                totals[key] += result[key]
+            logger.info(f"Imported {path} in {time.perf_counter() - file_started:.1f}s: {result}")
+        if backfill.unknown_codes:
+            logger.warning(
+                f"{len(backfill.unknown_codes)} station codes not found in stations table, e.g. "
+                f"{sorted(backfill.unknown_codes)[:10]} - add them with --station-map"
+            )
+    finally:
+        db.close()
+
+    logger.info(f"Backfill finished in {time.perf_counter() - started:.1f}s: {totals}")
+    return 1 if totals["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""
+Sprawdzenie zgodności tabeli station_latest z surowymi pomiarami
+
+Uruchomienie: python -m flood_monitoring.scripts.check_station_latest [--fix] [--show 20]
+
+Kod wyjścia 1 oznacza rozbieżności (bez --fix). Z --fix tabela jest odbudowywana w jednej
+transakcji; zapis pomiarów czeka w tym czasie z aktualizacją najnowszych odczytów.
+"""
+import argparse
+import logging
+import sys
+from typing import List, Optional
+
+from src.flood_monitoring.core.database import SessionLocal
+from flood_monitoring.services import latest
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+    handlers=[logging.StreamHandler(sys.stdout)],
+)
+logger = logging.getLogger(__name__)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Zgodność station_latest z tabelami pomiarów")
+    parser.add_argument("--fix", action="store_true", help="odbuduj station_latest, jeśli są rozbieżności")
+    parser.add_argument("--show", type=int, default=20, help="liczba wypisanych rozbieżności na serię")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        mismatches = latest.check(db)
+        for series, rows in mismatches.items():
+            if not rows:
+                logger.info(f"{series}: station_latest consistent")
+                continue
+            logger.warning(f"{series}: {len(rows)} stations differ from raw measurements")
+            for row in rows[:args.show]:
+                logger.warning(
+                    f"  {row['station_id']}: stored {row['stored_value']} at {row['stored_at']}, "
+                    f"expected {row['expected_value']} at {row['expected_at']}"
+                )
+        if not any(mismatches.values()):
+            return 0
+        if not args.fix:
+            return 1
+
+        stations = latest.rebuild(db)
+        db.commit()
+        logger.info(f"station_latest rebuilt for {stations} stations")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"station_latest check failed: {str(e)}")
+        return 1
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""
+Worker synchronizacji: wykonuje zadania z kolejki sync_jobs i okresowy harmonogram
+
+Uruchomienie: python -m flood_monitoring.scripts.ingest_worker
+Można uruchomić kilka workerów. Każdy trzyma blokadę obecności; zadania przerwane przez worker,
+który przestał działać, wracają do kolejki.
+"""
+import asyncio
+import logging
+import os
+import signal
+import socket
+import sys
+from typing import Any, Dict, Optional, Tuple
+
+from src.flood_monitoring.core.config import get_settings
+from src.flood_monitoring.core.database import SessionLocal
+from flood_monitoring.services.archive import PayloadArchive
+from flood_monitoring.services.http_client import IMGWHttpClient
+from flood_monitoring.services.jobs import SyncJobQueue
+from flood_monitoring.services.locks import SyncAlreadyRunning, WorkerLock
+from flood_monitoring.services.polling import AdaptivePollPlanner
+from flood_monitoring.services.runs import tracked_run
+from flood_monitoring.services.scheduler import SyncScheduler
+from flood_monitoring.services.sync_runner import run_sync_job
+from flood_monitoring.services.watermarks import MeasurementWatermarks
+
+logging.basicConfig(
+    level=getattr(logging, os.getenv("LOG_LEVEL", "INFO")),
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+    handlers=[logging.StreamHandler(sys.stdout)],
+)
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+ClaimedJob = Tuple[int, str, Dict[str, Any]]
+# Co ile sekund bezczynny worker szuka zadań osieroconych przez zatrzymane workery
+REQUEUE_INTERVAL = 60
+
+
+def warm_watermarks(watermarks: MeasurementWatermarks):
+    db = SessionLocal()
+    try:
+        watermarks.warm(db)
+    finally:
+        db.close()
+
+
+def requeue_interrupted() -> int:
+    db = SessionLocal()
+    try:
+        return SyncJobQueue(db).requeue_interrupted()
+    finally:
+        db.close()
+
+
+def claim_job(worker: str) -> Optional[ClaimedJob]:
+    db = SessionLocal()
+    try:
+        job = SyncJobQueue(db).claim(worker)
+        return (job.id, job.kind, dict(job.params)) if job is not None else None
+    finally:
+        db.close()
+
+
+def finish_job(job_id: int, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+    db = SessionLocal()
+    try:
+        SyncJobQueue(db).finish(job_id, result=result, error=error)
+    finally:
+        db.close()
+
+
+class IngestWorker:
+    """Jedyny proces zapisujący dane z IMGW: kolejka zadań z API oraz harmonogram"""
+
+    def __init__(self):
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self.http_client = IMGWHttpClient(PayloadArchive() if settings.ARCHIVE_ENABLED else None)
+        self.poll_planner = AdaptivePollPlanner() if settings.SYNC_ADAPTIVE_POLLING else None
+        self.watermarks = MeasurementWatermarks() if settings.SYNC_WATERMARKS_ENABLED else None
+        self.scheduler: Optional[SyncScheduler] = None
+        self.presence = WorkerLock(self.name)
+        self.stopping = asyncio.Event()
+        # Wyniki zadań, których nie udało się zapisać w bazie - ponawiane w kolejnych obiegach pętli
+        self.unfinished: Dict[int, Dict[str, Any]] = {}
+
+    async def run(self):
+        # Blokadę obecności trzymamy przed pobraniem pierwszego zadania aż do zakończenia procesu
+        if not await asyncio.to_thread(self.presence.try_lock):
+            raise RuntimeError(f"Worker name {self.name} already in use")
+        await self.http_client.start()
+        try:
+            if self.watermarks is not None:
+                try:
+                    await asyncio.to_thread(warm_watermarks, self.watermarks)
+                except Exception as e:
+                    logger.error(f"Watermark warm-up failed, continuing with empty cache: {str(e)}")
+            await asyncio.to_thread(requeue_interrupted)
+            loop = asyncio.get_running_loop()
+            requeued_at = loop.time()
+
+            if settings.SYNC_SCHEDULER_ENABLED:
+                self.scheduler = SyncScheduler(self.http_client, self.poll_planner, self.watermarks)
+                self.scheduler.start()
+
+            logger.info(f"Ingest worker {self.name} started")
+            while not self.stopping.is_set():
+                if self.unfinished:
+                    await self.retry_unfinished()
+                try:
+                    job = await asyncio.to_thread(claim_job, self.name)
+                except Exception as e:
+                    logger.error(f"Claiming sync job failed: {str(e)}")
+                    job = None
+                if job is None:
+                    if loop.time() - requeued_at >= REQUEUE_INTERVAL:
+                        requeued_at = loop.time()
+                        try:
+                            await asyncio.to_thread(requeue_interrupted)
+                        except Exception as e:
+                            logger.error(f"Requeue of interrupted jobs failed: {str(e)}")
+                    try:
+                        await asyncio.wait_for(self.stopping.wait(), timeout=settings.SYNC_WORKER_POLL_INTERVAL)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                await self.execute(*job)
+        finally:
+            if self.scheduler is not None:
+                await self.scheduler.stop()
+            await self.http_client.close()
+            if self.unfinished:
+                # Po zwolnieniu blokady obecności zadania wrócą do kolejki w innym workerze
+                logger.warning(f"Sync jobs {sorted(self.unfinished)} left unfinished, they will be requeued")
+            await asyncio.to_thread(self.presence.unlock)
+            logger.info(f"Ingest worker {self.name} stopped")
+
+    async def execute(self, job_id: int, kind: str, params: Dict[str, Any]):
+        """Wykonaj zadanie z kolejki i zapisz jego wynik"""
+        logger.info(f"Running sync job {job_id} ({kind}, {params})")
+        try:
+            result = await tracked_run(
+                kind,
+                "job",
+                lambda: run_sync_job(
+                    kind,
+                    self.http_client,
+                    station_ids=params.get("station_ids"),
+                    concurrency=params.get("concurrency"),
+                    poll_planner=self.poll_planner,
+                    watermarks=self.watermarks,
+                ),
+                job_id=job_id,
+            )
+        except SyncAlreadyRunning as e:
+            # Te same dane właśnie odświeża inny przebieg - zadanie nie ma nic do zrobienia
+            logger.warning(f"Sync job {job_id} skipped: {str(e)}")
+            await self.finish(job_id, result={"skipped": "already running", "active_run_id": e.run_id})
+            return
+        except Exception as e:
+            logger.error(f"Sync job {job_id} failed: {str(e)}")
+            await self.finish(job_id, error=str(e))
+            return
+        if await self.finish(job_id, result=result):
+            logger.info(f"Sync job {job_id} finished")
+
+    async def finish(self, job_id: int, **outcome) -> bool:
+        """Zapisz wynik zadania; błąd bazy nie przerywa workera, wynik zostaje do ponowienia"""
+        try:
+            await asyncio.to_thread(finish_job, job_id, **outcome)
+        except Exception as e:
+            logger.error(f"Recording result of sync job {job_id} failed, will retry: {str(e)}")
+            self.unfinished[job_id] = outcome
+            return False
+        self.unfinished.pop(job_id, None)
+        return True
+
+    async def retry_unfinished(self):
+        for job_id, outcome in list(self.unfinished.items()):
+            if await self.finish(job_id, **outcome):
+                logger.info(f"Result of sync job {job_id} recorded on retry")
+
+    def stop(self):
+        """Zakończ po bieżącym zadaniu"""
+        logger.info("Stopping ingest worker after the current job")
+        self.stopping.set()
+
+
+async def main():
+    worker = IngestWorker()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    await worker.run()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
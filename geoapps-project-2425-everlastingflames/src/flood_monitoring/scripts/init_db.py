@@ -1,8 +1,33 @@
 import time
 
+from sqlalchemy import text
 from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
 
 from src.flood_monitoring.core.database import Base, engine
+from flood_monitoring.models import backfill, jobs, latest, measurements, polling, rollups, runs, station, warnings  # noqa: F401 - rejestracja tabel
+from flood_monitoring.services import latest as station_latest, partitions
+
+# Zmiany schematu istniejących tabel (create_all nie dodaje kolumn); każda instrukcja jest idempotentna
+SCHEMA_UPGRADES = [
+    "ALTER TABLE hydro_warnings ADD COLUMN IF NOT EXISTS aktywne BOOLEAN NOT NULL DEFAULT true",
+    "ALTER TABLE hydro_warnings ADD COLUMN IF NOT EXISTS zmieniono TIMESTAMP",
+    "ALTER TABLE hydro_warnings ADD COLUMN IF NOT EXISTS wycofano TIMESTAMP",
+    "ALTER TABLE hydro_warnings ADD COLUMN IF NOT EXISTS skrot VARCHAR",
+    "CREATE INDEX IF NOT EXISTS ix_warning_key ON hydro_warnings (numer, biuro, opublikowano)",
+    "CREATE INDEX IF NOT EXISTS ix_warning_area_warning_id ON warning_areas (warning_id)",
+]
+
+
+# Tabela -> (kolumna czasu, dawny unikalny klucz, indeksy pokryte kluczem głównym (stacja, czas))
+COMPACT_KEYS = {
+    "stan_measurements": (
+        "stan_wody_data_pomiaru", "uix_station_stan_time", ("ix_stan_station_id", "ix_stan_station_date"),
+    ),
+    "przeplyw_measurements": (
+        "przeplyw_data", "uix_station_przeplyw_time", ("ix_przeplyw_station_id", "ix_przeplyw_station_date"),
+    ),
+}
 
 
 def wait_for_db(max_retries=5, retry_interval=5):
@@ -24,6 +49,88 @@ def wait_for_db(max_retries=5, retry_interval=5):
                 return False
 
 
+def upgrade_schema():
+    """Doprowadź istniejące tabele do bieżącego schematu"""
+    with engine.begin() as connection:
+        for statement in SCHEMA_UPGRADES:
+            connection.execute(text(statement))
+
+
+def partition_tables():
+    """Przenieś niepartycjonowane tabele pomiarów do partycji miesięcznych i utwórz partycje bieżącego okna"""
+    for table in partitions.PARTITIONED_TABLES:
+        with engine.begin() as connection:
+            if partitions.is_partitioned(connection, table) is False:
+                print(f"Przenoszenie tabeli {table} do partycji miesięcznych...")
+                moved = partitions.migrate_table(connection, table)
+                print(f"Przeniesiono {moved} wierszy tabeli {table}")
+    with engine.begin() as connection:
+        partitions.maintain(connection)
+
+
+def compact_measurement_keys():
+    """Zastąp tekstowy klucz id kluczem głównym (station_id, czas) i usuń zbędne indeksy.
+
+    Indeksy unikalne partycji powstają przez CREATE INDEX CONCURRENTLY, bez blokowania zapisów.
+    Zamiana kluczy w krótkiej transakcji tylko dołącza gotowe indeksy, bez przebudowy.
+    """
+    for table, (time_column, unique_key, redundant) in COMPACT_KEYS.items():
+        with engine.connect() as connection:
+            legacy = connection.execute(
+                text("SELECT 1 FROM information_schema.columns WHERE table_name = :table AND column_name = 'id'"),
+                {"table": table},
+            ).scalar()
+        if not legacy:
+            continue
+
+        print(f"Zmiana klucza głównego tabeli {table} na (station_id, {time_column})...")
+        with engine.connect() as connection:
+            connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+            children = sorted(partitions.existing_partitions(connection, table).values()) + [f"{table}_default"]
+            for child in children:
+                state = connection.execute(
+                    text(
+                        "SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:index)"
+                    ),
+                    {"index": f"{child}_pk_new"},
+                ).scalar()
+                if state is False:
+                    # Pozostałość po przerwanej budowie indeksu
+                    connection.execute(text(f"DROP INDEX CONCURRENTLY {child}_pk_new"))
+                if state is not True and connection.execute(text("SELECT to_regclass(:t)"), {"t": child}).scalar():
+                    connection.execute(
+                        text(f"CREATE UNIQUE INDEX CONCURRENTLY {child}_pk_new ON {child} (station_id, {time_column})")
+                    )
+
+        with engine.begin() as connection:
+            connection.execute(text("SET LOCAL lock_timeout = '30s'"))
+            connection.execute(text(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {table}_pkey"))
+            for child in children:
+                if connection.execute(text("SELECT to_regclass(:index)"), {"index": f"{child}_pk_new"}).scalar():
+                    connection.execute(
+                        text(f"ALTER TABLE {child} ADD CONSTRAINT {child}_pkey PRIMARY KEY USING INDEX {child}_pk_new")
+                    )
+            # Indeksy partycji z kluczem głównym są dołączane do indeksu tabeli nadrzędnej bez budowy
+            connection.execute(text(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (station_id, {time_column})"))
+            connection.execute(text(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {unique_key}"))
+            for index in redundant:
+                connection.execute(text(f"DROP INDEX IF EXISTS {index}"))
+            # Usunięcie kolumny zmienia tylko katalog; miejsce zwalniają kolejne zapisy i VACUUM
+            connection.execute(text(f"ALTER TABLE {table} DROP COLUMN id"))
+        print(f"Klucz główny tabeli {table} zmieniony")
+
+
+def populate_station_latest():
+    """Wypełnij pustą tabelę station_latest na podstawie istniejących pomiarów"""
+    with Session(engine) as db:
+        if db.execute(text("SELECT EXISTS (SELECT 1 FROM station_latest)")).scalar():
+            return
+        stations = station_latest.rebuild(db)
+        db.commit()
+        if stations:
+            print(f"Tabela station_latest wypełniona dla {stations} stacji")
+
+
 def init_db():
     """Inicjalizacja bazy danych"""
     if not wait_for_db():
@@ -32,6 +139,10 @@ def init_db():
     try:
         # Tworzymy wszystkie tabele
         Base.metadata.create_all(bind=engine)
+        upgrade_schema()
+        partition_tables()
+        compact_measurement_keys()
+        populate_station_latest()
         print("Tabele zostały pomyślnie utworzone!")
         return True
     except Exception as e:
@@ -0,0 +1,70 @@
+"""
+Przeliczenie agregatów godzinowych i dobowych z surowych pomiarów (dane sprzed wprowadzenia agregatów)
+
+Uruchomienie: python -m flood_monitoring.scripts.rebuild_rollups [--since 2020-01-01] [--series stan przeplyw]
+
+Agregaty są przeliczane miesiącami, każdy miesiąc w osobnej transakcji, więc przerwane
+przeliczenie można bezpiecznie powtórzyć. Worker może w tym czasie działać.
+"""
+import argparse
+import logging
+import sys
+import time
+from datetime import date, datetime
+from typing import List, Optional
+
+from src.flood_monitoring.core.database import SessionLocal
+from flood_monitoring.services import rollups
+from flood_monitoring.services.partitions import add_months, month_start
+from flood_monitoring.services.timestamps import warsaw_now
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+    handlers=[logging.StreamHandler(sys.stdout)],
+)
+logger = logging.getLogger(__name__)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Przeliczenie agregatów pomiarów z surowych danych")
+    parser.add_argument("--since", type=date.fromisoformat, help="pierwszy miesiąc (domyślnie najstarszy pomiar)")
+    parser.add_argument("--series", nargs="+", choices=sorted(rollups.SERIES), default=sorted(rollups.SERIES))
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    last = add_months(month_start(warsaw_now()), 1)
+    db = SessionLocal()
+    try:
+        for series in args.series:
+            first = args.since or rollups.first_measurement(db, series)
+            if first is None:
+                logger.info(f"No {series} measurements, nothing to rebuild")
+                continue
+            month, total = month_start(first), 0
+            while month < last:
+                end = add_months(month, 1)
+                try:
+                    counted = rollups.rebuild(
+                        db, series, datetime.combine(month, datetime.min.time()), datetime.combine(end, datetime.min.time())
+                    )
+                    db.commit()
+                except Exception as e:
+                    db.rollback()
+                    logger.error(f"Failed to rebuild {series} rollups for {month:%Y-%m}: {str(e)}")
+                    return 1
+                total += counted
+                if counted:
+                    logger.info(f"Rebuilt {series} rollups for {month:%Y-%m} from {counted} measurements")
+                month = end
+            logger.info(f"Rebuilt {series} rollups from {total} measurements")
+    finally:
+        db.close()
+
+    logger.info(f"Rollup rebuild finished in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+Ponowny import danych z archiwum surowych odpowiedzi IMGW
+
+Uruchomienie: python -m flood_monitoring.scripts.replay_archive [--kind hydro station warnings] [--since RRRR-MM-DD] [--force]
+
+Pomiary z kolejnych migawek są zbierane i zapisywane zbiorczo (INSERT ... ON CONFLICT DO NOTHING),
+z pominięciem odczytów powtarzających się między migawkami. Znaczniki z pamięci workera nie są
+używane, więc import uzupełnia także luki sprzed ostatnich zapisanych pomiarów. Stacje z migawek
+są tylko dopisywane, jeśli ich brakuje - istniejących nazw i współrzędnych import nie zmienia.
+Ostrzeżenia odtwarzane są migawka po migawce, żeby zachować historię zmian i wycofań - czasem zmiany
+i wycofania jest czas pobrania migawki. Jeśli baza zawiera zmiany ostrzeżeń nowsze niż
+pierwsza odtwarzana migawka, import ostrzeżeń jest przerywany (chyba że podano --force).
+"""
+import argparse
+import hashlib
+import logging
+import sys
+import time
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from src.flood_monitoring.core.config import get_settings
+from src.flood_monitoring.core.database import SessionLocal
+from flood_monitoring.services.archive import ARCHIVE_KINDS, PayloadArchive
+from flood_monitoring.services.database import DatabaseService
+from flood_monitoring.services.imgw import IMGWService
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+    handlers=[logging.StreamHandler(sys.stdout)],
+)
+logging.getLogger("flood_monitoring.services.database").setLevel(logging.WARNING)
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class MeasurementReplay:
+    """Bufor pomiarów z migawek zapisywany partiami"""
+
+    def __init__(self, service: IMGWService, flush_rows: int):
+        self.service = service
+        self.flush_rows = flush_rows
+        self.stations: Dict[str, Dict[str, Any]] = {}
+        self.rows: Dict[str, List[Any]] = {"stan": [], "przeplyw": []}
+        self.last: Dict[str, Dict[str, Any]] = {"stan": {}, "przeplyw": {}}
+        self.counts = {"snapshots": 0, "read": 0, "repeated": 0, "inserted": 0}
+
+    def add(self, payload: List[Dict[str, Any]]):
+        feed = self.service.parse_hydro_feed(payload)
+        self.counts["snapshots"] += 1
+        for station in feed["stations"]:
+            self.stations[station["id_stacji"]] = station
+        for series in ("stan", "przeplyw"):
+            last = self.last[series]
+            for row in feed[series]:
+                self.counts["read"] += 1
+                # Lista hydro zwraca ostatni odczyt stacji, więc kolejne migawki zwykle go powtarzają
+                if last.get(row[0]) == row[1]:
+                    self.counts["repeated"] += 1
+                    continue
+                last[row[0]] = row[1]
+                self.rows[series].append(row)
+        if len(self.rows["stan"]) + len(self.rows["przeplyw"]) >= self.flush_rows:
+            self.flush()
+
+    def flush(self):
+        db_service = self.service.db_service
+        if self.stations:
+            # Migawki bywają starsze niż stan bazy, więc tylko uzupełniamy brakujące stacje
+            db_service.sync_stations(list(self.stations.values()), update_existing=False)
+            self.stations = {}
+        self.counts["inserted"] += db_service.add_stan_measurements(self.rows["stan"])[0]
+        self.counts["inserted"] += db_service.add_przeplyw_measurements(self.rows["przeplyw"])[0]
+        self.rows = {"stan": [], "przeplyw": []}
+
+
+def replay_measurements(
+    archive: PayloadArchive, service: IMGWService, kind: str, since: Optional[date], until: Optional[date], flush_rows: int
+) -> Dict[str, int]:
+    replay = MeasurementReplay(service, flush_rows)
+    for _, _, line in archive.read(kind, since, until):
+        replay.add(archive.payload(line))
+    replay.flush()
+    return replay.counts
+
+
+def replay_warnings(
+    archive: PayloadArchive, service: IMGWService, since: Optional[date], until: Optional[date], force: bool = False
+) -> Dict[str, int]:
+    counts = {"snapshots": 0, "identical": 0, "inserted": 0, "updated": 0, "withdrawn": 0}
+    previous = None
+    last_change = service.db_service.last_warning_change()
+    for fetched_at, _, line in archive.read("warnings", since, until):
+        # Migawka starsza niż zapisany stan wycofałaby nowsze ostrzeżenia i cofnęła ich treść
+        if counts["snapshots"] == 0 and last_change is not None and last_change > fetched_at and not force:
+            raise RuntimeError(
+                f"Database has warning changes from {last_change:%Y-%m-%d %H:%M}, newer than the first "
+                f"archived snapshot ({fetched_at:%Y-%m-%d %H:%M}); use --force to replay warnings anyway"
+            )
+        digest = hashlib.sha256(line[line.index(b',"payload":'):]).hexdigest()
+        counts["snapshots"] += 1
+        if digest == previous:
+            counts["identical"] += 1
+            continue
+        previous = digest
+        result = service.db_service.sync_warnings(service.parse_warnings(archive.payload(line)), now=fetched_at)
+        for key in ("inserted", "updated", "withdrawn"):
+            counts[key] += result[key]
+    return counts
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Import danych z archiwum odpowiedzi IMGW")
+    parser.add_argument("--kind", nargs="+", choices=ARCHIVE_KINDS, default=list(ARCHIVE_KINDS))
+    parser.add_argument("--since", type=date.fromisoformat, help="pierwszy dzień (RRRR-MM-DD)")
+    parser.add_argument("--until", type=date.fromisoformat, help="ostatni dzień (RRRR-MM-DD)")
+    parser.add_argument("--archive-dir", default=settings.ARCHIVE_DIR)
+    parser.add_argument("--flush-rows", type=int, default=50 * settings.INGEST_BATCH_SIZE,
+                        help="liczba pomiarów zbieranych przed zapisem")
+    parser.add_argument("--force", action="store_true",
+                        help="odtwórz ostrzeżenia mimo nowszych zmian ostrzeżeń w bazie")
+    args = parser.parse_args(argv)
+
+    archive = PayloadArchive(args.archive_dir)
+    db = SessionLocal()
+    try:
+        service = IMGWService(DatabaseService(db), http_client=None)
+        for kind in args.kind:
+            started = time.perf_counter()
+            if kind == "warnings":
+                counts = replay_warnings(archive, service, args.since, args.until, args.force)
+            else:
+                counts = replay_measurements(archive, service, kind, args.since, args.until, args.flush_rows)
+            logger.info(f"Replayed {kind} archive in {time.perf_counter() - started:.1f}s: {counts}")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Archive replay failed: {str(e)}")
+        return 1
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""
+Synchronizacja danych IMGW z wiersza poleceń (cron, zadania wsadowe) - bez API i workera
+
+Uruchomienie: python -m flood_monitoring.scripts.sync [stations measurements warnings all]
+              [--station ID ...] [--concurrency N] [--dry-run] [--json]
+
+Kody wyjścia: 0 - sukces, 1 - błąd synchronizacji, 2 - błędne argumenty,
+3 - synchronizacja zakończona, ale części stacji nie udało się pobrać,
+4 - ta sama synchronizacja trwa już w innym procesie.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_PARTIAL = 3
+EXIT_BUSY = 4
+KINDS = ("stations", "measurements", "warnings", "all")
+DEFAULT_KINDS = ("stations", "measurements", "warnings")
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Synchronizacja danych IMGW bez uruchamiania API")
+    parser.add_argument(
+        "kinds", nargs="*", metavar="{" + ",".join(KINDS) + "}",
+        help="zadania w kolejności wykonania (domyślnie stations measurements warnings); all - stacje po ID",
+    )
+    parser.add_argument("--station", dest="station_ids", action="append", metavar="ID",
+                        help="synchronizuj tylko te stacje (po ID, można powtarzać)")
+    parser.add_argument("--concurrency", type=int, help="równoległe pobrania stacji po ID")
+    parser.add_argument("--dry-run", action="store_true", help="pobierz i przetwórz dane bez zapisu do bazy")
+    parser.add_argument("--json", action="store_true", help="wynik i czasy jako JSON na stdout")
+    parser.add_argument("--quiet", action="store_true", help="tylko ostrzeżenia i błędy w logach")
+    args = parser.parse_args(argv)
+    unknown = [kind for kind in args.kinds if kind not in KINDS]
+    if unknown:
+        parser.error(f"unknown sync task: {', '.join(unknown)} (choose from {', '.join(KINDS)})")
+    args.kinds = args.kinds or list(DEFAULT_KINDS)
+    return args
+
+
+async def dry_run(kind: str, http_client, station_ids: Optional[List[str]]) -> Dict[str, Any]:
+    """Pobierz i sparsuj dane tak jak synchronizacja, bez połączenia z bazą"""
+    from flood_monitoring.services.imgw import IMGWService
+
+    service = IMGWService(None, http_client)
+    if kind == "warnings":
+        return {"warnings": len(service.parse_warnings(await service.get_warnings()))}
+
+    if station_ids:
+        payload, errors = [], {}
+        for station_id in station_ids:
+            status, data = await http_client.get_json(f"{service.base_url}/id/{station_id}")
+            if status == 200:
+                payload.extend(data or [])
+            else:
+                errors[station_id] = f"IMGW API returned status {status}"
+    else:
+        payload, errors = await service.fetch_hydro_feed(), {}
+    feed = service.parse_hydro_feed(payload)
+    result = {"stations": len(feed["stations"]), "stan_fetched": len(feed["stan"]),
+              "przeplyw_fetched": len(feed["przeplyw"])}
+    if errors:
+        result.update(failed=len(errors), errors=errors)
+    return result
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    from src.flood_monitoring.core.config import get_settings
+    from flood_monitoring.services.archive import PayloadArchive
+    from flood_monitoring.services.http_client import IMGWHttpClient
+    from flood_monitoring.services.locks import SyncAlreadyRunning
+    from flood_monitoring.services.runs import tracked_run
+    from flood_monitoring.services.sync_runner import run_sync_job
+
+    settings = get_settings()
+    kinds = list(dict.fromkeys(args.kinds))
+    if args.station_ids:
+        # Podzbiór stacji synchronizujemy po ID; listę stacji i ostrzeżenia wykonujemy jak zwykle
+        kinds = ["all" if kind in ("measurements", "all") else kind for kind in kinds]
+        kinds = list(dict.fromkeys(kinds))
+
+    archive = PayloadArchive() if settings.ARCHIVE_ENABLED and not args.dry_run else None
+    report: Dict[str, Any] = {"dry_run": args.dry_run, "tasks": {}}
+    started = time.perf_counter()
+    async with IMGWHttpClient(archive) as http_client:
+        for kind in kinds:
+            station_ids = args.station_ids if kind == "all" else None
+            task_started = time.perf_counter()
+            try:
+                if args.dry_run:
+                    result = await dry_run(kind, http_client, station_ids)
+                else:
+                    result = await tracked_run(
+                        kind,
+                        "cli",
+                        lambda: run_sync_job(
+                            kind, http_client, station_ids=station_ids, concurrency=args.concurrency
+                        ),
+                    )
+                status = "partial" if result.get("failed") else "done"
+                report["tasks"][kind] = {"status": status, "result": result}
+            except SyncAlreadyRunning as e:
+                logger.warning(f"{kind} sync skipped: {str(e)}")
+                report["tasks"][kind] = {"status": "busy", "active_run_id": e.run_id}
+            except Exception as e:
+                logger.error(f"{kind} sync failed: {str(e)}")
+                report["tasks"][kind] = {"status": "failed", "error": str(e)}
+            report["tasks"][kind]["seconds"] = round(time.perf_counter() - task_started, 3)
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    return report
+
+
+def exit_code(report: Dict[str, Any]) -> int:
+    statuses = {task["status"] for task in report["tasks"].values()}
+    if "failed" in statuses:
+        return EXIT_FAILED
+    if "partial" in statuses:
+        return EXIT_PARTIAL
+    if "busy" in statuses:
+        return EXIT_BUSY
+    return EXIT_OK
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(
+        level=logging.WARNING if args.quiet else getattr(logging, os.getenv("LOG_LEVEL", "INFO")),
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+        # Przy --json stdout zawiera wyłącznie wynik
+        handlers=[logging.StreamHandler(sys.stderr if args.json else sys.stdout)],
+    )
+
+    report = asyncio.run(run(args))
+    code = exit_code(report)
+    if args.json:
+        print(json.dumps({**report, "exit_code": code}, ensure_ascii=False, default=str))
+    else:
+        for kind, task in report["tasks"].items():
+            detail = task.get("error") or task.get("result") or f"active run {task.get('active_run_id')}"
+            logger.info(f"{kind}: {task['status']} in {task['seconds']:.1f}s - {detail}")
+        logger.info(f"Sync finished in {report['seconds']:.1f}s with exit code {code}")
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Archiwum surowych odpowiedzi IMGW
+"""
+import gzip
+import json
+import logging
+import os
+import threading
+from datetime import date, datetime
+from typing import Any, Iterator, List, Optional, Tuple
+
+from src.flood_monitoring.core.config import get_settings
+from flood_monitoring.services.timestamps import warsaw_now
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+ARCHIVE_KINDS = ("hydro", "station", "warnings")
+
+
+class PayloadArchive:
+    """Archiwum tylko do dopisywania: {katalog}/{rodzaj}/{RRRR-MM-DD}/{GG}.jsonl.gz
+
+    Każda odpowiedź to jeden wiersz JSON {"fetched_at", "url", "payload"} zapisany jako
+    osobny człon gzip - pliki można dopisywać bez ich przepisywania, a gzip czyta je jako
+    jeden strumień. Treść odpowiedzi zapisywana jest bez ponownej serializacji.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or settings.ARCHIVE_DIR
+        self._lock = threading.Lock()
+
+    def path(self, kind: str, fetched_at: datetime) -> str:
+        return os.path.join(self.root, kind, fetched_at.strftime("%Y-%m-%d"), f"{fetched_at:%H}.jsonl.gz")
+
+    def write(self, kind: str, url: str, body: bytes, fetched_at: Optional[datetime] = None) -> str:
+        """Dopisz surową odpowiedź (bajty JSON) do partycji godzinowej"""
+        fetched_at = fetched_at or warsaw_now()
+        if b"\n" in body:
+            body = json.dumps(json.loads(body), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        header = json.dumps({"fetched_at": fetched_at.isoformat(), "url": url}, ensure_ascii=False)
+        line = header[:-1].encode("utf-8") + b',"payload":' + body + b"}\n"
+        member = gzip.compress(line, compresslevel=settings.ARCHIVE_COMPRESSION_LEVEL)
+
+        path = self.path(kind, fetched_at)
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "ab") as archive_file:
+                archive_file.write(member)
+        return path
+
+    def files(self, kind: str, since: Optional[date] = None, until: Optional[date] = None) -> List[str]:
+        """Pliki archiwum danego rodzaju w kolejności chronologicznej"""
+        kind_dir = os.path.join(self.root, kind)
+        if not os.path.isdir(kind_dir):
+            return []
+        paths = []
+        for day in sorted(os.listdir(kind_dir)):
+            try:
+                partition = date.fromisoformat(day)
+            except ValueError:
+                continue
+            if (since and partition < since) or (until and partition > until):
+                continue
+            day_dir = os.path.join(kind_dir, day)
+            paths.extend(os.path.join(day_dir, name) for name in sorted(os.listdir(day_dir)) if name.endswith(".jsonl.gz"))
+        return paths
+
+    def read(
+        self, kind: str, since: Optional[date] = None, until: Optional[date] = None
+    ) -> Iterator[Tuple[datetime, str, bytes]]:
+        """Strumień (fetched_at, url, wiersz) bez wczytywania całych plików do pamięci"""
+        for path in self.files(kind, since, until):
+            try:
+                with gzip.open(path, "rb") as archive_file:
+                    for line in archive_file:
+                        header = json.loads(line[:line.index(b',"payload":')] + b"}")
+                        yield datetime.fromisoformat(header["fetched_at"]), header["url"], line
+            except (EOFError, gzip.BadGzipFile) as e:
+                # Ucięty ostatni człon (np. po awarii w trakcie zapisu) - wcześniejsze wiersze są już odczytane
+                logger.warning(f"Truncated archive file {path}: {str(e)}")
+
+    @staticmethod
+    def payload(line: bytes) -> Any:
+        return json.loads(line)["payload"]
@@ -0,0 +1,264 @@
+"""
+Import archiwalnych danych hydrologicznych IMGW (pliki CSV/ZIP z danymi dobowymi)
+"""
+import codecs
+import csv
+import hashlib
+import io
+import logging
+import os
+import zipfile
+from datetime import datetime, timezone
+from typing import Dict, IO, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from src.flood_monitoring.core.config import get_settings
+from flood_monitoring.models.backfill import BackfillFile
+from flood_monitoring.models.station import Station
+from flood_monitoring.services import partitions, rollups
+from flood_monitoring.services.timestamps import WARSAW, warsaw_now
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Wartości oznaczające brak pomiaru w plikach archiwalnych
+MISSING_VALUES = {"stan": 9999.0, "przeplyw": 99999.999}
+# Dobowy stan wody i przepływ odnoszą się do obserwacji o 6:00 UTC
+OBSERVATION_HOUR_UTC = 6
+READ_CHUNK = 1024 * 1024
+
+TARGETS = {
+    "stan": ("stan_measurements", "stan_wody_data_pomiaru", "stan_wody"),
+    "przeplyw": ("przeplyw_measurements", "przeplyw_data", "przelyw"),
+}
+
+ArchiveRow = Tuple[str, datetime, Optional[float], Optional[float]]
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as archive_file:
+        for chunk in iter(lambda: archive_file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_station_map(path: str) -> Dict[str, str]:
+    """Mapa kodów archiwalnych na id_stacji z pliku CSV "kod,id_stacji" (bez nagłówka)"""
+    mapping = {}
+    with open(path, newline="", encoding="utf-8-sig") as map_file:
+        for row in csv.reader(map_file):
+            if len(row) >= 2 and row[0].strip():
+                mapping[normalize_code(row[0])] = row[1].strip()
+    return mapping
+
+
+def normalize_code(code: str) -> str:
+    code = code.strip().strip('"').strip()
+    return code.zfill(9) if code.isdigit() else code
+
+
+def detect_encoding(raw: IO[bytes]) -> str:
+    """Nowsze pliki są w UTF-8, starsze w Windows-1250.
+
+    Sprawdzany jest cały plik porcjami - polskie znaki w pliku Windows-1250 mogą pojawić się
+    dopiero daleko od początku, a pomyłka kończy się błędem dekodowania w połowie importu.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        for chunk in iter(lambda: raw.read(READ_CHUNK), b""):
+            # Czyste ASCII jest poprawnym UTF-8, o ile nie kończy sekwencji rozpoczętej w poprzedniej porcji
+            if not chunk.isascii() or decoder.getstate()[0]:
+                decoder.decode(chunk)
+        decoder.decode(b"", final=True)
+        return "utf-8-sig"
+    except UnicodeDecodeError:
+        return "cp1250"
+
+
+def _is_data_member(name: str) -> bool:
+    # Paczki zawierają też pliki zjawisk (zjaw_*) i opisy formatu
+    base = os.path.basename(name).lower()
+    return base.endswith(".csv") and not base.startswith("zjaw")
+
+
+def iter_csv_streams(path: str) -> Iterator[Tuple[str, IO[str]]]:
+    """Strumienie tekstowe plików CSV - bezpośrednio z paczki ZIP, bez rozpakowywania na dysk"""
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for name in sorted(archive.namelist()):
+                if not _is_data_member(name):
+                    continue
+                with archive.open(name) as member:
+                    encoding = detect_encoding(member)
+                with archive.open(name) as member:
+                    yield name, io.TextIOWrapper(member, encoding=encoding, newline="")
+    else:
+        with open(path, "rb") as raw:
+            encoding = detect_encoding(raw)
+        with open(path, encoding=encoding, newline="") as text:
+            yield os.path.basename(path), text
+
+
+class HydroArchiveParser:
+    """Wiersze dobowe: kod, nazwa, rzeka, rok hydrologiczny, miesiąc hydrologiczny, dzień,
+    stan [cm], przepływ [m3/s], temperatura [, miesiąc kalendarzowy].
+
+    Rok hydrologiczny zaczyna się 1 listopada poprzedniego roku kalendarzowego.
+    """
+
+    def __init__(self):
+        self.invalid = 0
+        self._days: Dict[Tuple[int, int, int], datetime] = {}
+
+    def _measured_at(self, year: int, month: int, day: int) -> datetime:
+        key = (year, month, day)
+        try:
+            return self._days[key]
+        except KeyError:
+            observed = datetime(year, month, day, OBSERVATION_HOUR_UTC, tzinfo=timezone.utc)
+            measured_at = self._days[key] = observed.astimezone(WARSAW).replace(tzinfo=None)
+            return measured_at
+
+    @staticmethod
+    def _value(raw: str, series: str) -> Optional[float]:
+        raw = raw.strip()
+        if not raw:
+            return None
+        value = float(raw.replace(",", "."))
+        return None if value == MISSING_VALUES[series] else value
+
+    def parse(self, row: List[str]) -> Optional[ArchiveRow]:
+        if len(row) < 9:
+            self.invalid += 1
+            return None
+        try:
+            hydro_year = int(row[3])
+            if len(row) >= 10 and row[9].strip():
+                month = int(row[9])
+            else:
+                month = (int(row[4]) + 9) % 12 + 1
+            year = hydro_year - 1 if month >= 11 else hydro_year
+            measured_at = self._measured_at(year, month, int(row[5]))
+            stan = self._value(row[6], "stan")
+            przeplyw = self._value(row[7], "przeplyw")
+        except ValueError:
+            # Nagłówki, niepełne wiersze i daty spoza kalendarza
+            self.invalid += 1
+            return None
+        return normalize_code(row[0]), measured_at, stan, przeplyw
+
+
+class HydroBackfill:
+    """Import plików archiwalnych: COPY do tabel tymczasowych i INSERT ... ON CONFLICT DO NOTHING.
+
+    Każdy plik to jedna transakcja razem z wpisem w backfill_files, więc przerwany import
+    można wznowić - zaimportowane pliki są pomijane, a ponowny import nie tworzy duplikatów.
+    Pomiary stacji nieobecnych w tabeli stations (i mapie kodów) są pomijane.
+    """
+
+    def __init__(self, db: Session, station_map: Optional[Dict[str, str]] = None, flush_rows: Optional[int] = None):
+        self.db = db
+        self.station_map = station_map or {}
+        self.flush_rows = flush_rows or 50 * settings.INGEST_BATCH_SIZE
+        self.known: Set[str] = {station_id for station_id, in db.query(Station.id_stacji)}
+        self.unknown_codes: Set[str] = set()
+
+    def imported(self, digest: str) -> bool:
+        return self.db.query(BackfillFile.skrot).filter(BackfillFile.skrot == digest).first() is not None
+
+    def _copy(self, cursor, series: str, buffer: io.StringIO) -> int:
+        """Przenieś bufor przez tabelę tymczasową do tabeli pomiarów; zwraca liczbę dodanych"""
+        table, time_column, value_column = TARGETS[series]
+        buffer.seek(0)
+        cursor.copy_expert(f"COPY backfill_{series} (station_id, measured_at, value) FROM STDIN", buffer)
+        # Dane historyczne trafiają do własnych partycji miesięcznych zamiast do partycji domyślnej
+        cursor.execute(f"SELECT min(measured_at), max(measured_at) FROM backfill_{series}")
+        first, last = cursor.fetchone()
+        if first is not None:
+            partitions.ensure_range(self.db, first, last)
+        # Dodane pomiary od razu trafiają do agregatów godzinowych i dobowych
+        inserted = self.db.execute(
+            text(
+                rollups.rollup_statement(
+                    series,
+                    f"INSERT INTO {table} (station_id, {time_column}, {value_column}) "
+                    f"SELECT DISTINCT ON (station_id, measured_at) station_id, measured_at, value FROM backfill_{series} "
+                    f"ON CONFLICT (station_id, {time_column}) DO NOTHING "
+                    f"RETURNING station_id, {time_column} AS measured_at, {value_column} AS value"
+                )
+            ),
+            {"series": series},
+        ).scalar()
+        cursor.execute(f"TRUNCATE backfill_{series}")
+        buffer.seek(0)
+        buffer.truncate()
+        return inserted
+
+    def import_file(self, path: str, force: bool = False) -> Optional[Dict[str, int]]:
+        """Zaimportuj jeden plik CSV lub ZIP; None, jeśli był już zaimportowany"""
+        digest = file_digest(path)
+        if not force and self.imported(digest):
+            return None
+
+        parser = HydroArchiveParser()
+        result = {"rows": 0, "stan_inserted": 0, "przeplyw_inserted": 0, "unknown_station_rows": 0}
+        buffers = {"stan": io.StringIO(), "przeplyw": io.StringIO()}
+        pending = 0
+        cursor = self.db.connection().connection.cursor()
+        try:
+            for series in TARGETS:
+                cursor.execute(
+                    f"CREATE TEMP TABLE IF NOT EXISTS backfill_{series} "
+                    "(station_id varchar, measured_at timestamp, value double precision) ON COMMIT DROP"
+                )
+
+            for _, stream in iter_csv_streams(path):
+                for row in csv.reader(stream):
+                    parsed = parser.parse(row)
+                    if parsed is None:
+                        continue
+                    code, measured_at, stan, przeplyw = parsed
+                    result["rows"] += 1
+                    station_id = self.station_map.get(code, code)
+                    if station_id not in self.known:
+                        result["unknown_station_rows"] += 1
+                        self.unknown_codes.add(code)
+                        continue
+                    for series, value in (("stan", stan), ("przeplyw", przeplyw)):
+                        if value is not None:
+                            buffers[series].write(f"{station_id}\t{measured_at.isoformat()}\t{value!r}\n")
+                            pending += 1
+                    if pending >= self.flush_rows:
+                        for series, buffer in buffers.items():
+                            result[f"{series}_inserted"] += self._copy(cursor, series, buffer)
+                        pending = 0
+            for series, buffer in buffers.items():
+                result[f"{series}_inserted"] += self._copy(cursor, series, buffer)
+
+            ledger = {
+                "skrot": digest,
+                "nazwa": os.path.basename(path),
+                "rozmiar": os.path.getsize(path),
+                "wiersze": result["rows"],
+                "stan_dodane": result["stan_inserted"],
+                "przeplyw_dodane": result["przeplyw_inserted"],
+                "nieznane_stacje": result["unknown_station_rows"],
+            }
+            self.db.execute(
+                insert(BackfillFile.__table__)
+                .values(ledger)
+                .on_conflict_do_update(index_elements=["skrot"], set_={**ledger, "zaimportowano": warsaw_now()})
+            )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        finally:
+            cursor.close()
+
+        result["invalid_rows"] = parser.invalid
+        return result
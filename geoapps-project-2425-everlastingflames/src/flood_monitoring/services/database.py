@@ -1,17 +1,92 @@
+import base64
+import hashlib
+import json
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 
-from geoalchemy2.shape import from_shape
-from shapely.geometry import Point
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import Float, bindparam, delete, func, or_, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
 
+from src.flood_monitoring.core.config import get_settings
+from flood_monitoring.models.latest import StationLatest
 from flood_monitoring.models.measurements import PrzeplywMeasurement, StanMeasurement
 from flood_monitoring.models.station import Station
 from flood_monitoring.models.warnings import HydroWarning, WarningArea
+from flood_monitoring.services import rollups
+from flood_monitoring.services.timestamps import warsaw_now
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+MeasurementRow = Tuple[str, datetime, float]
+STATION_FIELDS = ("stacja", "rzeka", "lat", "lon", "wojewodztwo")
+WARNING_FIELDS = (
+    "opublikowano",
+    "stopien",
+    "data_od",
+    "data_do",
+    "prawdopodobienstwo",
+    "numer",
+    "biuro",
+    "zdarzenie",
+    "przebieg",
+    "komentarz",
+)
+WarningKey = Tuple[str, str, datetime]
+
+
+# Seria bez pozycji w kursorze zaczyna od najnowszego pomiaru
+_PAGE_START = object()
+
+
+def _encode_cursor(state: Dict[str, Any]) -> str:
+    """Nieprzezroczysty kursor stronicowania: base64 z JSON czasów granicznych"""
+    payload = {key: value.isoformat() if value is not None else None for key, value in state.items()}
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        state = {key: datetime.fromisoformat(value) if value is not None else None for key, value in payload.items()}
+        if state.get("since") is None:
+            raise ValueError("cursor without range start")
+        return state
+    except (ValueError, TypeError, AttributeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def _point(lon, lat):
+    """Geometria punktu budowana po stronie bazy"""
+    return func.ST_SetSRID(func.ST_MakePoint(lon, lat), 4326)
+
+
+def _warning_digest(warning: Dict[str, Any]) -> str:
+    """Skrót treści ostrzeżenia (z obszarami) do wykrywania zmian u źródła"""
+    content = {field: warning[field] for field in WARNING_FIELDS}
+    content["obszary"] = warning["obszary"]
+    payload = json.dumps(content, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _diff_warnings(
+    feed: Dict[WarningKey, Dict[str, Any]], existing: Dict[WarningKey, Any], digests: Dict[WarningKey, str]
+) -> Tuple[List[WarningKey], List[WarningKey], List[WarningKey], List[int]]:
+    """Podział listy IMGW względem zapisanych ostrzeżeń: (nowe, zmienione, przywrócone, id wycofanych).
+
+    Ostrzeżenie z niezmienionym skrótem treści nie trafia do żadnej grupy zmian (brak UPDATE),
+    chyba że było wycofane i wróciło do listy.
+    """
+    new = [key for key in feed if key not in existing]
+    changed = [key for key in feed if key in existing and existing[key].skrot != digests[key]]
+    reactivated = [
+        key for key in feed
+        if key in existing and not existing[key].aktywne and existing[key].skrot == digests[key]
+    ]
+    withdrawn = [row.id for key, row in existing.items() if key not in feed and row.aktywne]
+    return new, changed, reactivated, withdrawn
 
 
 class DatabaseService:
@@ -29,6 +104,213 @@ class DatabaseService:
     def get_warning_by_id(self, warning_id: int):
         """Pobierz ostrzeżenie po ID"""
         return self.db.query(HydroWarning).filter(HydroWarning.id == warning_id).first()
+
+    def last_warning_change(self) -> Optional[datetime]:
+        """Czas najnowszej zapisanej zmiany ostrzeżeń (publikacji, zmiany treści lub wycofania)"""
+        return self.db.query(
+            func.greatest(
+                func.max(HydroWarning.opublikowano), func.max(HydroWarning.zmieniono), func.max(HydroWarning.wycofano)
+            )
+        ).scalar()
+
+    def sync_warnings(self, warnings: List[Dict[str, Any]], now: Optional[datetime] = None) -> Dict[str, int]:
+        """Zbiorcza synchronizacja ostrzeżeń z bieżącym stanem listy IMGW w jednej transakcji
+
+        Nowe ostrzeżenia są wstawiane, zmienione aktualizowane, a aktywne ostrzeżenia
+        nieobecne w liście oznaczane jako wycofane. `now` to czas stanu listy zapisywany
+        jako chwila zmiany/wycofania (przy imporcie z archiwum - czas pobrania migawki).
+        """
+        feed: Dict[WarningKey, Dict[str, Any]] = {}
+        for warning in warnings:
+            feed[(warning["numer"], warning["biuro"], warning["opublikowano"])] = warning
+
+        key_columns = tuple_(HydroWarning.numer, HydroWarning.biuro, HydroWarning.opublikowano)
+        condition = HydroWarning.aktywne.is_(True)
+        if feed:
+            condition = or_(condition, key_columns.in_(list(feed)))
+        existing = {
+            (row.numer, row.biuro, row.opublikowano): row
+            for row in self.db.query(
+                HydroWarning.id, HydroWarning.numer, HydroWarning.biuro, HydroWarning.opublikowano,
+                HydroWarning.skrot, HydroWarning.aktywne,
+            ).filter(condition)
+        }
+
+        digests = {key: _warning_digest(warning) for key, warning in feed.items()}
+        new, changed, reactivated, withdrawn = _diff_warnings(feed, existing, digests)
+
+        table = HydroWarning.__table__
+        batch_size = settings.INGEST_BATCH_SIZE
+        now = now or warsaw_now()
+        try:
+            ids = {key: existing[key].id for key in changed}
+            for start in range(0, len(new), batch_size):
+                stmt = (
+                    insert(table)
+                    .values(
+                        [
+                            {
+                                **{field: feed[key][field] for field in WARNING_FIELDS},
+                                "aktywne": True,
+                                "skrot": digests[key],
+                            }
+                            for key in new[start:start + batch_size]
+                        ]
+                    )
+                    .returning(table.c.id, table.c.numer, table.c.biuro, table.c.opublikowano)
+                )
+                for row in self.db.execute(stmt):
+                    ids[(row.numer, row.biuro, row.opublikowano)] = row.id
+
+            if changed:
+                stmt = (
+                    update(table)
+                    .where(table.c.id == bindparam("b_id"))
+                    .values(
+                        {
+                            **{field: bindparam(f"b_{field}") for field in WARNING_FIELDS},
+                            "skrot": bindparam("b_skrot"),
+                            "aktywne": True,
+                            "wycofano": None,
+                            # Pierwsze wyliczenie skrótu dla starych wierszy nie jest zmianą treści
+                            "zmieniono": bindparam("b_zmieniono"),
+                        }
+                    )
+                )
+                self.db.execute(
+                    stmt,
+                    [
+                        {
+                            "b_id": existing[key].id,
+                            **{f"b_{field}": feed[key][field] for field in WARNING_FIELDS},
+                            "b_skrot": digests[key],
+                            "b_zmieniono": now if existing[key].skrot is not None else None,
+                        }
+                        for key in changed
+                    ],
+                )
+                self.db.execute(
+                    delete(WarningArea.__table__).where(
+                        WarningArea.__table__.c.warning_id.in_([existing[key].id for key in changed])
+                    )
+                )
+
+            areas = [
+                {
+                    "warning_id": ids[key],
+                    "wojewodztwo": area["wojewodztwo"],
+                    "opis": area["opis"],
+                    "kod_zlewni": area["kod_zlewni"],
+                }
+                for key in ids
+                for area in feed[key]["obszary"]
+            ]
+            for start in range(0, len(areas), batch_size):
+                self.db.execute(insert(WarningArea.__table__).values(areas[start:start + batch_size]))
+
+            if reactivated:
+                self.db.execute(
+                    update(table)
+                    .where(table.c.id.in_([existing[key].id for key in reactivated]))
+                    .values(aktywne=True, wycofano=None)
+                )
+            if withdrawn:
+                self.db.execute(
+                    update(table)
+                    .where(table.c.id.in_(withdrawn))
+                    .values(aktywne=False, wycofano=now)
+                )
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            raise
+
+        result = {
+            "inserted": len(new),
+            "updated": len(changed) + len(reactivated),
+            "withdrawn": len(withdrawn),
+            "untouched": len(feed) - len(new) - len(changed) - len(reactivated),
+        }
+        logger.info(f"Warning sync: {result}")
+        return result
+
+    def sync_stations(self, stations: List[Dict[str, Any]], update_existing: bool = True) -> Dict[str, int]:
+        """Zbiorcza synchronizacja stacji: nowe wstaw, zmienione zaktualizuj w jednej transakcji
+
+        update_existing=False wstawia tylko brakujące stacje - dane z archiwum nie mogą nadpisać
+        aktualnych nazw i współrzędnych stacji.
+        """
+        existing = {
+            row.id_stacji: tuple(row[1:])
+            for row in self.db.query(
+                Station.id_stacji, Station.stacja, Station.rzeka, Station.lat, Station.lon, Station.wojewodztwo
+            )
+        }
+
+        new = {}
+        changed = {}
+        unchanged = set()
+        for station in stations:
+            current = existing.get(station["id_stacji"])
+            if current is None:
+                new[station["id_stacji"]] = station
+            elif update_existing and current != tuple(station[field] for field in STATION_FIELDS):
+                changed[station["id_stacji"]] = station
+            else:
+                unchanged.add(station["id_stacji"])
+
+        table = Station.__table__
+        batch_size = settings.INGEST_BATCH_SIZE
+        try:
+            new_rows = list(new.values())
+            for start in range(0, len(new_rows), batch_size):
+                stmt = (
+                    insert(table)
+                    .values(
+                        [
+                            {
+                                "id_stacji": station["id_stacji"],
+                                **{field: station[field] for field in STATION_FIELDS},
+                                "geom": _point(station["lon"], station["lat"]),
+                            }
+                            for station in new_rows[start:start + batch_size]
+                        ]
+                    )
+                    .on_conflict_do_nothing(index_elements=["id_stacji"])
+                )
+                self.db.execute(stmt)
+
+            if changed:
+                stmt = (
+                    update(table)
+                    .where(table.c.id_stacji == bindparam("b_id_stacji"))
+                    .values(
+                        {
+                            **{field: bindparam(f"b_{field}") for field in STATION_FIELDS},
+                            "geom": _point(bindparam("b_lon", type_=Float), bindparam("b_lat", type_=Float)),
+                        }
+                    )
+                )
+                self.db.execute(
+                    stmt,
+                    [
+                        {f"b_{key}": value for key, value in station.items()}
+                        for station in changed.values()
+                    ],
+                )
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            raise
+
+        result = {
+            "inserted": len(new),
+            "updated": len(changed),
+            "unchanged": len(unchanged),
+        }
+        logger.info(f"Station sync: {result}")
+        return result
+
     def get_or_create_station(
         self,
         id_stacji: str,
@@ -39,88 +321,92 @@ class DatabaseService:
         wojewodztwo: str
 
     ) -> Station:
-        """Pobierz lub utwórz stację"""
-        station = self.db.query(Station).filter_by(id_stacji=id_stacji).first()
-        if not station:
-            # Tworzymy punkt geometryczny
-            point = Point(lon, lat)
-            geom = from_shape(point, srid=4326)
-
-            station = Station(
-                id_stacji=id_stacji,
-                stacja=stacja,
-                lat=lat,
-                lon=lon,
-                rzeka=rzeka,
-                geom=geom,
-                wojewodztwo=wojewodztwo
-            )
-            self.db.add(station)
-            try:
-                self.db.commit()
-            except IntegrityError:
-                self.db.rollback()
-                raise
-        return station
-
-    def add_stan_measurement(
-        self, station_id: str, stan_wody_data_pomiaru: datetime, stan_wody: float
-    ) -> bool:
-        """Dodaj pomiar stanu wody. Zwraca True jeśli dodano nowy pomiar, False jeśli już istniał."""
-        existing = (
-            self.db.query(StanMeasurement)
-            .filter_by(station_id=station_id, stan_wody_data_pomiaru=stan_wody_data_pomiaru)
-            .first()
+        """Pobierz lub utwórz stację (aktualizuje metadane, jeśli się zmieniły)"""
+        self.sync_stations(
+            [
+                {
+                    "id_stacji": id_stacji,
+                    "stacja": stacja,
+                    "lat": lat,
+                    "lon": lon,
+                    "rzeka": rzeka,
+                    "wojewodztwo": wojewodztwo,
+                }
+            ]
         )
+        return self.db.query(Station).filter_by(id_stacji=id_stacji).first()
 
-        if existing:
-            return False
+    def _insert_measurements(
+        self, model, series: str, time_column: str, value_column: str, rows: List[MeasurementRow]
+    ) -> Tuple[int, int]:
+        """Wstaw pomiary partiami jednym INSERT ... ON CONFLICT DO NOTHING na partię.
 
-        measurement_id = f"{station_id}_{stan_wody_data_pomiaru.isoformat()}"
-        measurement = StanMeasurement(
-            id=measurement_id, station_id=station_id, stan_wody_data_pomiaru=stan_wody_data_pomiaru, stan_wody=stan_wody
-        )
-        self.db.add(measurement)
+        Nowo dodane pomiary są w tej samej transakcji doliczane do agregatów godzinowych i dobowych.
+        """
+        inserted = 0
+        batch_size = settings.INGEST_BATCH_SIZE
         try:
+            for start in range(0, len(rows), batch_size):
+                values = [
+                    {
+                        "station_id": station_id,
+                        time_column: measured_at,
+                        value_column: value,
+                    }
+                    for station_id, measured_at, value in rows[start:start + batch_size]
+                ]
+                stmt = (
+                    insert(model)
+                    .values(values)
+                    .on_conflict_do_nothing(index_elements=["station_id", time_column])
+                    .returning(model.station_id, getattr(model, time_column), getattr(model, value_column))
+                )
+                added = self.db.execute(stmt).all()
+                rollups.apply(self.db, series, added)
+                inserted += len(added)
             self.db.commit()
-            return True
         except IntegrityError:
             self.db.rollback()
+            raise
+        return inserted, len(rows) - inserted
+
+    def add_stan_measurements(self, rows: List[MeasurementRow]) -> Tuple[int, int]:
+        """Dodaj pomiary stanu wody zbiorczo. Zwraca (dodane, pominięte)."""
+        return self._insert_measurements(
+            StanMeasurement, "stan", "stan_wody_data_pomiaru", "stan_wody", rows
+        )
+
+    def add_przeplyw_measurements(self, rows: List[MeasurementRow]) -> Tuple[int, int]:
+        """Dodaj pomiary przepływu zbiorczo. Zwraca (dodane, pominięte)."""
+        return self._insert_measurements(
+            PrzeplywMeasurement, "przeplyw", "przeplyw_data", "przelyw", rows
+        )
+
+    def add_stan_measurement(
+        self, station_id: str, stan_wody_data_pomiaru: datetime, stan_wody: float
+    ) -> bool:
+        """Dodaj pomiar stanu wody. Zwraca True jeśli dodano nowy pomiar, False jeśli już istniał."""
+        try:
+            inserted, _ = self.add_stan_measurements([(station_id, stan_wody_data_pomiaru, stan_wody)])
+        except IntegrityError:
             return False
+        return inserted == 1
 
     def add_przeplyw_measurement(
         self, station_id: str, przeplyw_data: datetime, przelyw: float
     ) -> bool:
         """Dodaj pomiar przepływu. Zwraca True jeśli dodano nowy pomiar, False jeśli już istniał."""
-        existing = (
-            self.db.query(PrzeplywMeasurement)
-            .filter_by(station_id=station_id, przeplyw_data=przeplyw_data)
-            .first()
-        )
-
-        if existing:
-            return False
-
-        measurement_id = f"{station_id}_{przeplyw_data.isoformat()}"
-        measurement = PrzeplywMeasurement(
-            id=measurement_id,
-            station_id=station_id,
-            przeplyw_data=przeplyw_data,
-            przelyw=przelyw
-        )
-        self.db.add(measurement)
         try:
-            self.db.commit()
-            return True
+            inserted, _ = self.add_przeplyw_measurements([(station_id, przeplyw_data, przelyw)])
         except IntegrityError:
-            self.db.rollback()
             return False
+        return inserted == 1
 
     def get_station_measurements(self, station_id: str, days: int = 1):
         """Pobierz pomiary z konkretnej stacji z ostatnich X dni"""
         from datetime import timedelta
 
-        start_date = datetime.now() - timedelta(days=days)
+        start_date = warsaw_now() - timedelta(days=days)
 
         logger.info(f"Fetching measurements for station {station_id} from {start_date}")
 
@@ -160,7 +446,7 @@ class DatabaseService:
 
     def get_station_measurements_extended(self, station_id: str, days: int = 1, limit: int = 100) -> Dict[str, List[Dict[str, Any]]]:
         """Pobierz rozszerzone pomiary z konkretnej stacji z większą ilością punktów danych dla wykresów"""
-        start_date = datetime.now() - timedelta(days=days)
+        start_date = warsaw_now() - timedelta(days=days)
 
         stan_measurements = (
             self.db.query(StanMeasurement)
@@ -201,110 +487,71 @@ class DatabaseService:
 
         return result
 
-    def get_station_measurements_batch(self, station_id: str, days: int = 1, batch_size: int = 50, offset: int = 0) -> Dict[str, List[Dict[str, Any]]]:
-        """Pobierz pomiary w partiach dla lepszej wydajności przy dużych zbiorach danych"""
-        start_date = datetime.now() - timedelta(days=days)
-
-        stan_measurements = (
-            self.db.query(StanMeasurement)
-            .filter(
-                StanMeasurement.station_id == station_id,
-                StanMeasurement.stan_wody_data_pomiaru >= start_date,
-            )
-            .order_by(StanMeasurement.stan_wody_data_pomiaru.desc())
-            .offset(offset)
-            .limit(batch_size)
-            .all()
-        )
-
-        przeplyw_measurements = (
-            self.db.query(PrzeplywMeasurement)
-            .filter(
-                PrzeplywMeasurement.station_id == station_id,
-                PrzeplywMeasurement.przeplyw_data >= start_date,
-            )
-            .order_by(PrzeplywMeasurement.przeplyw_data.desc())
-            .offset(offset)
-            .limit(batch_size)
-            .all()
-        )
+    def get_station_measurements_page(
+        self,
+        station_id: str,
+        days: int = 1,
+        stan_limit: int = 50,
+        przeplyw_limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Pobierz stronę pomiarów od najnowszych wstecz, stronicowanie po czasie pomiaru (keyset).
+
+        Kursor zapamiętuje początek zakresu i ostatni zwrócony czas każdej serii, więc kolejne strony
+        nie przesuwają się wraz z upływem czasu, a każda strona to jeden zakres indeksu (station_id, czas).
+        """
+        if cursor:
+            state = _decode_cursor(cursor)
+            start_date = state["since"]
+        else:
+            state = {}
+            start_date = warsaw_now() - timedelta(days=days)
+
+        result: Dict[str, Any] = {}
+        next_state: Dict[str, Any] = {"since": start_date}
+        for key, model, time_column, value_column, limit in (
+            ("stan", StanMeasurement, "stan_wody_data_pomiaru", "stan_wody", stan_limit),
+            ("przelyw", PrzeplywMeasurement, "przeplyw_data", "przelyw", przeplyw_limit),
+        ):
+            measured_at = getattr(model, time_column)
+            position = state.get(key, _PAGE_START)
+            rows = []
+            if position is not None:
+                query = self.db.query(measured_at, getattr(model, value_column)).filter(
+                    model.station_id == station_id, measured_at >= start_date
+                )
+                if position is not _PAGE_START:
+                    query = query.filter(measured_at < position)
+                rows = query.order_by(measured_at.desc()).limit(limit).all()
+            # None oznacza serię bez kolejnych stron
+            next_state[key] = rows[-1][0] if len(rows) == limit else None
+            result[key] = [{time_column: row[0], value_column: row[1]} for row in reversed(rows)]
 
-        stan_measurements.reverse()
-        przeplyw_measurements.reverse()
+        more = next_state["stan"] is not None or next_state["przelyw"] is not None
+        result["next_cursor"] = _encode_cursor(next_state) if more else None
 
-        result = {
-            "stan": [
-                {"stan_wody_data_pomiaru": m.stan_wody_data_pomiaru, "stan_wody": m.stan_wody} for m in stan_measurements
-            ],
-            "przelyw": [
-                {"przeplyw_data": m.przeplyw_data, "przelyw": m.przelyw}
-                for m in przeplyw_measurements
-            ],
-            "has_more": len(stan_measurements) == batch_size or len(przeplyw_measurements) == batch_size,
-            "next_offset": offset + batch_size
-        }
+        logger.info(f"Retrieved page: {len(result['stan'])} water level and {len(result['przelyw'])} flow measurements for station {station_id} (limits: {stan_limit}/{przeplyw_limit}, more: {more})")
 
-        logger.info(f"Retrieved batch data: {len(stan_measurements)} water level and {len(przeplyw_measurements)} flow measurements for station {station_id} (batch_size: {batch_size}, offset: {offset})")
+        return result
 
+    def get_station_rollups(self, station_id: str, days: int, resolution: str) -> Dict[str, List[Dict[str, Any]]]:
+        """Pobierz agregaty godzinowe ("hour") lub dobowe ("day") stacji z ostatnich X dni"""
+        result = rollups.station_rollups(self.db, station_id, days, resolution)
+        logger.info(f"Retrieved {len(result['stan'])} water level and {len(result['przelyw'])} flow {resolution} rollups for station {station_id} from last {days} days")
         return result
 
     def get_latest_measurements_for_all_stations(self) -> Dict[str, Dict[str, Any]]:
-        """Pobierz najnowsze pomiary dla wszystkich stacji"""
-        latest_stan_subquery = (
-            self.db.query(
-                StanMeasurement.station_id,
-                func.max(StanMeasurement.stan_wody_data_pomiaru).label('max_date')
-            )
-            .group_by(StanMeasurement.station_id)
-            .subquery()
-        )
-        
-        latest_stan_measurements = (
-            self.db.query(StanMeasurement)
-            .join(
-                latest_stan_subquery,
-                and_(
-                    StanMeasurement.station_id == latest_stan_subquery.c.station_id,
-                    StanMeasurement.stan_wody_data_pomiaru == latest_stan_subquery.c.max_date
-                )
-            )
-            .all()
-        )
-
-        latest_przeplyw_subquery = (
-            self.db.query(
-                PrzeplywMeasurement.station_id,
-                func.max(PrzeplywMeasurement.przeplyw_data).label('max_date')
-            )
-            .group_by(PrzeplywMeasurement.station_id)
-            .subquery()
-        )
-        
-        latest_przeplyw_measurements = (
-            self.db.query(PrzeplywMeasurement)
-            .join(
-                latest_przeplyw_subquery,
-                and_(
-                    PrzeplywMeasurement.station_id == latest_przeplyw_subquery.c.station_id,
-                    PrzeplywMeasurement.przeplyw_data == latest_przeplyw_subquery.c.max_date
-                )
-            )
-            .all()
-        )
-
+        """Pobierz najnowsze pomiary dla wszystkich stacji (tabela station_latest aktualizowana przy zapisie)"""
         result = {}
+        for latest in self.db.query(StationLatest):
+            measurements = {}
+            if latest.stan_wody_data_pomiaru is not None:
+                measurements['stan_wody'] = latest.stan_wody
+                measurements['stan_wody_data_pomiaru'] = latest.stan_wody_data_pomiaru
+            if latest.przeplyw_data is not None:
+                measurements['przeplyw'] = latest.przeplyw
+                measurements['przeplyw_data'] = latest.przeplyw_data
+            result[latest.station_id] = measurements
 
-        for measurement in latest_stan_measurements:
-            if measurement.station_id not in result:
-                result[measurement.station_id] = {}
-            result[measurement.station_id]['stan_wody'] = measurement.stan_wody
-            result[measurement.station_id]['stan_wody_data_pomiaru'] = measurement.stan_wody_data_pomiaru
-
-        for measurement in latest_przeplyw_measurements:
-            if measurement.station_id not in result:
-                result[measurement.station_id] = {}
-            result[measurement.station_id]['przeplyw'] = measurement.przelyw
-            result[measurement.station_id]['przeplyw_data'] = measurement.przeplyw_data
-        
         logger.info(f"Retrieved latest measurements for {len(result)} stations")
         return result
@@ -0,0 +1,139 @@
+"""
+Współdzielony klient HTTP do API IMGW
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import aiohttp
+
+from src.flood_monitoring.core.config import get_settings
+from flood_monitoring.services.archive import PayloadArchive
+from flood_monitoring.services.runs import current_run
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class IMGWHttpClient:
+    """Klient HTTP o czasie życia aplikacji: pula połączeń, cache DNS, timeouty i keep-alive"""
+
+    def __init__(self, archive: Optional[PayloadArchive] = None):
+        self.archive = archive
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._validators: Dict[str, Dict[str, Optional[str]]] = {}
+        self._pending: Dict[str, Dict[str, Optional[str]]] = {}
+
+    async def start(self):
+        """Utwórz sesję z pulą połączeń"""
+        if self._session is not None:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=settings.IMGW_HTTP_POOL_SIZE,
+            limit_per_host=settings.IMGW_HTTP_POOL_SIZE_PER_HOST,
+            use_dns_cache=True,
+            ttl_dns_cache=settings.IMGW_HTTP_DNS_TTL,
+            keepalive_timeout=settings.IMGW_HTTP_KEEPALIVE_TIMEOUT,
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=settings.IMGW_HTTP_TOTAL_TIMEOUT,
+            connect=settings.IMGW_HTTP_CONNECT_TIMEOUT,
+            sock_read=settings.IMGW_HTTP_READ_TIMEOUT,
+        )
+        self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        logger.info(
+            f"IMGW HTTP client started (pool={settings.IMGW_HTTP_POOL_SIZE}, "
+            f"per_host={settings.IMGW_HTTP_POOL_SIZE_PER_HOST})"
+        )
+
+    async def close(self):
+        """Zamknij sesję i połączenia z puli"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+            logger.info("IMGW HTTP client closed")
+
+    async def __aenter__(self) -> "IMGWHttpClient":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            raise RuntimeError("IMGW HTTP client is not started")
+        return self._session
+
+    async def get_json(
+        self, url: str, conditional: bool = False, archive_kind: Optional[str] = None
+    ) -> Tuple[int, Any]:
+        """Pobierz JSON. Zwraca (status, dane); dane są None, jeśli status != 200.
+
+        W trybie warunkowym wysyła ETag/Last-Modified ostatniej potwierdzonej odpowiedzi
+        i zwraca 304 także wtedy, gdy serwer odesłał 200 z identyczną treścią.
+        Z podanym archive_kind nowa treść odpowiedzi trafia do archiwum.
+        """
+        if not conditional:
+            status, body, _ = await self._get(url)
+            if status != 200:
+                return status, None
+            await self._archive(archive_kind, url, body)
+            return 200, json.loads(body)
+
+        known = self._validators.get(url)
+        headers = {}
+        if known and known["etag"]:
+            headers["If-None-Match"] = known["etag"]
+        if known and known["last_modified"]:
+            headers["If-Modified-Since"] = known["last_modified"]
+
+        status, body, response_headers = await self._get(url, headers)
+        if status != 200:
+            return status, None
+        validators = {
+            "etag": response_headers.get("ETag"),
+            "last_modified": response_headers.get("Last-Modified"),
+            "digest": hashlib.sha256(body).hexdigest(),
+        }
+
+        if known and known["digest"] == validators["digest"]:
+            return 304, None
+        self._pending[url] = validators
+        await self._archive(archive_kind, url, body)
+        return 200, json.loads(body)
+
+    async def _get(self, url: str, headers: Optional[Dict[str, str]] = None) -> Tuple[int, Optional[bytes], Any]:
+        """Wykonaj GET i zapisz czas odpowiedzi w bieżącym przebiegu synchronizacji"""
+        stats = current_run()
+        started = time.perf_counter()
+        try:
+            async with self.session.get(url, headers=headers) as response:
+                body = await response.read() if response.status == 200 else None
+                status, response_headers = response.status, response.headers
+        except Exception:
+            if stats is not None:
+                stats.record_http(time.perf_counter() - started, None)
+            raise
+        if stats is not None:
+            stats.record_http(time.perf_counter() - started, status)
+        return status, body, response_headers
+
+    async def _archive(self, kind: Optional[str], url: str, body: bytes):
+        """Zapis do archiwum nie może przerwać synchronizacji"""
+        if self.archive is None or kind is None:
+            return
+        try:
+            await asyncio.to_thread(self.archive.write, kind, url, body)
+        except Exception as e:
+            logger.error(f"Failed to archive {kind} payload from {url}: {str(e)}")
+
+    def confirm(self, url: str):
+        """Zapamiętaj wersję zasobu dopiero po jej udanym przetworzeniu"""
+        validators = self._pending.pop(url, None)
+        if validators is not None:
+            self._validators[url] = validators
@@ -1,273 +1,277 @@
 """
 Serwis do pobierania danych z IMGW
 """
+import asyncio
 import logging
-from datetime import datetime
-from typing import Any, Dict, List
-
-import aiohttp
+from typing import Any, Dict, List, Optional, Tuple
 
 from src.flood_monitoring.core.config import get_settings
 from flood_monitoring.services.database import DatabaseService
-from flood_monitoring.models.warnings import WarningArea, HydroWarning
+from flood_monitoring.services.http_client import IMGWHttpClient
+from flood_monitoring.services.polling import AdaptivePollPlanner
+from flood_monitoring.services.runs import sync_stage
+from flood_monitoring.services.timestamps import IMGWTimestampParser
+from flood_monitoring.services.watermarks import MeasurementWatermarks
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+MEASUREMENT_COUNTERS = (
+    "stan_fetched",
+    "stan_inserted",
+    "stan_skipped",
+    "przeplyw_fetched",
+    "przeplyw_inserted",
+    "przeplyw_skipped",
+)
+
 
 class IMGWService:
     """Serwis do obsługi danych z IMGW"""
 
-    def __init__(self, db_service: DatabaseService):
+    def __init__(
+        self,
+        db_service: DatabaseService,
+        http_client: IMGWHttpClient,
+        poll_planner: Optional[AdaptivePollPlanner] = None,
+        watermarks: Optional[MeasurementWatermarks] = None,
+    ):
         self.db_service = db_service
+        self.http_client = http_client
+        self.poll_planner = poll_planner
+        self.watermarks = watermarks
         self.base_url = settings.IMGW_API_URL
         self.warnings_url = settings.IMGW_WARNINGS_URL
 
-    async def get_stations(self) -> List[Dict[str, Any]]:
-        """Pobierz listę stacji pomiarowych i zaktualizuj bazę danych"""
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{self.base_url}") as response:
-                    if response.status == 200:
-                        stations = await response.json()
-                        for station in stations:
-                            try:
-                                self.db_service.get_or_create_station(
-                                    id_stacji=station["id_stacji"],
-                                    stacja=station["stacja"],
-                                    lat=float(station["lat"]),
-                                    lon=float(station["lon"]),
-                                    rzeka=station.get("rzeka"),
-                                    wojewodztwo=station.get("wojewodztwo")
-                                )
-                            except Exception as e:
-                                logger.error(
-                                    f"Error saving station {station['id_stacji']}: {str(e)}"
-                                )
-                        return stations
-                    else:
-                        logger.error(f"IMGW API returned status {response.status}")
-                        return []
-        except Exception as e:
-            logger.error(f"Error fetching stations: {str(e)}")
-            return []
-
-    def _parse_datetime(self, date_str: str) -> datetime:
-        """Parsuje datę z różnych formatów"""
-        if not date_str:
+    async def fetch_hydro_feed(self, conditional: bool = False) -> Optional[List[Dict[str, Any]]]:
+        """Pobierz pełną listę hydro IMGW jednym zapytaniem (None - lista bez zmian)"""
+        status, data = await self.http_client.get_json(
+            f"{self.base_url}", conditional=conditional, archive_kind="hydro"
+        )
+        if status == 304:
             return None
+        if status != 200:
+            raise Exception(f"IMGW API returned status {status}")
+        return data
 
-        try:
-            try:
-                parsed_date = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S")
-            except ValueError:
-                formats = [
-                    "%Y-%m-%dT%H:%M:%S",
-                    "%Y-%m-%dT%H:%M:%S.%f",
-                    "%Y-%m-%dT%H:%M:%S.%fZ",
-                    "%Y-%m-%dT%H:%M:%SZ",
-                ]
+    def parse_hydro_feed(self, payload: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+        """Wyciągnij stacje, stany wody i przepływy z listy hydro w jednym przebiegu"""
+        stations = []
+        raw = {"stan": [], "przeplyw": []}
 
-                for fmt in formats:
-                    try:
-                        parsed_date = datetime.strptime(
-                            date_str.replace("+00:00", ""), fmt
-                        )
-                        break
-                    except ValueError:
-                        continue
-                else:
-                    return None
+        for item in payload:
+            station_id = item.get("id_stacji")
+            if not station_id:
+                continue
 
-            now = datetime.now()
-            if parsed_date.date() > now.date():
-                logger.warning(f"Found future date: {date_str}, skipping")
-                return None
-            elif parsed_date.date() == now.date() and parsed_date.time() > now.time():
-                logger.warning(
-                    f"Found future time on current date: {date_str}, skipping"
+            try:
+                stations.append(
+                    {
+                        "id_stacji": station_id,
+                        "stacja": item["stacja"],
+                        "lat": float(item["lat"]),
+                        "lon": float(item["lon"]),
+                        "rzeka": item.get("rzeka"),
+                        "wojewodztwo": item.get("wojewodztwo") or item.get("województwo"),
+                    }
                 )
-                return None
+            except (KeyError, TypeError, ValueError):
+                logger.warning(f"Invalid station metadata for station {station_id}, skipping")
+                continue
 
-            return parsed_date
-        except Exception as e:
-            logger.error(f"Error parsing date {date_str}: {str(e)}")
-            return None
+            for series, value_key, date_key in (
+                ("stan", "stan_wody", "stan_wody_data_pomiaru"),
+                ("przeplyw", "przelyw", "przeplyw_data"),
+            ):
+                if item.get(value_key) is None:
+                    continue
+                try:
+                    value = float(item[value_key])
+                except (TypeError, ValueError):
+                    logger.warning(f"Invalid {value_key} value for station {station_id}")
+                    continue
+                raw[series].append((station_id, item.get(date_key), value))
 
-    async def get_station_data_przelyw(self, station_id: str, days: int = 7) -> Dict[str, Any]:
-        """Pobierz dane z konkretnej stacji i zaktualizuj bazę danych"""
-        try:
-            async with aiohttp.ClientSession() as session:
-                logger.info(f"Fetching data for station {station_id} from IMGW API")
-                async with session.get(f"{self.base_url}/id/{station_id}") as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        logger.info(
-                            f"Received raw data from IMGW API for station {station_id}: {data}"
-                        )
+        parser = IMGWTimestampParser()
+        feed = {"stations": stations}
+        for series, rows in raw.items():
+            parsed = parser.parse_column([measured_at for _, measured_at, _ in rows])
+            feed[series] = [
+                (station_id, measured_at, value)
+                for (station_id, _, value), measured_at in zip(rows, parsed)
+                if measured_at is not None
+            ]
+        if parser.invalid or parser.future:
+            logger.warning(
+                f"Skipped {parser.invalid} invalid and {parser.future} future timestamps in hydro feed"
+            )
+        return feed
 
-                        if not data or len(data) == 0:
-                            logger.warning(f"No data received for station {station_id}")
-                            return {"stan_wody": []}
+    async def sync_hydro_feed(self) -> Dict[str, int]:
+        """Synchronizacja zbiorcza: stacje i pomiary z jednego pobrania listy hydro"""
+        with sync_stage("fetch"):
+            payload = await self.fetch_hydro_feed(conditional=True)
+        if payload is None:
+            logger.info("Hydro feed unchanged since last sync, skipping")
+            if self.poll_planner is not None:
+                self.poll_planner.observe(list(self.poll_planner.last_seen), [])
+            return {
+                **dict.fromkeys(("stations", "stations_inserted", "stations_updated"), 0),
+                **dict.fromkeys(MEASUREMENT_COUNTERS, 0),
+                "unchanged": 1,
+            }
 
-                        measurement = data[0]
+        with sync_stage("parse"):
+            feed = self.parse_hydro_feed(payload)
+        with sync_stage("stations"):
+            station_result = await asyncio.to_thread(self.db_service.sync_stations, feed["stations"])
 
-                        if (
-                            "przeplyw_data" in measurement
-                            and "przelyw" in measurement
-                            and measurement["przelyw"] is not None
-                        ):
-                            przeplyw_data = self._parse_datetime(measurement["przeplyw_data"])
-                            if przeplyw_data:
-                                if self.db_service.add_przeplyw_measurement(
-                                    station_id=station_id,
-                                    przeplyw_data=przeplyw_data,
-                                    przelyw=float(measurement["przelyw"]),
-                                ):
-                                    logger.info(
-                                        f"Dodano nowy pomiar dla stacji {station_id}"
-                                    )
-                                else:
-                                    logger.info(
-                                        f"Pomiar dla stacji {station_id} już istnieje w bazie"
-                                    )
-                                return {
-                                    "przelyw": [
-                                        {
-                                            "przeplyw_data": measurement["przeplyw_data"],
-                                            "przelyw": float(measurement["przelyw"]),
-                                        }
-                                    ]
-                                }
+        result = {
+            "stations": len(feed["stations"]),
+            "stations_inserted": station_result["inserted"],
+            "stations_updated": station_result["updated"],
+            **await self.ingest_measurements(feed),
+            "unchanged": 0,
+        }
+        self.http_client.confirm(f"{self.base_url}")
+        logger.info(f"Bulk hydro sync finished: {result}")
+        return result
 
-                        logger.warning(
-                            f"Invalid measurement data for station {station_id}"
-                        )
-                        return {"przeplyw_data": []}
-                    else:
-                        logger.error(
-                            f"IMGW API returned status {response.status} for station {station_id}"
-                        )
-                        return {"przeplyw_data": []}
-        except Exception as e:
-            logger.error(f"Error fetching data for station {station_id}: {str(e)}")
-            return {"przelyw": []}
+    def _write_measurements(self, stan_rows, przeplyw_rows) -> Tuple[int, int, int, int]:
+        """Zapis obu serii w bazie (wywoływany w wątku roboczym)"""
+        stan_inserted, stan_skipped = self.db_service.add_stan_measurements(stan_rows)
+        przeplyw_inserted, przeplyw_skipped = self.db_service.add_przeplyw_measurements(przeplyw_rows)
+        return stan_inserted, stan_skipped, przeplyw_inserted, przeplyw_skipped
 
+    async def ingest_measurements(self, feed: Dict[str, List[Any]]) -> Dict[str, int]:
+        """Zapisz stany i przepływy z przetworzonej listy hydro
 
-    async def get_station_data_stan(self, station_id: str, days: int = 7) -> Dict[str, Any]:
-        """Pobierz dane z konkretnej stacji i zaktualizuj bazę danych"""
-        try:
-            async with aiohttp.ClientSession() as session:
-                logger.info(f"Fetching data for station {station_id} from IMGW API")
-                async with session.get(f"{self.base_url}/id/{station_id}") as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        logger.info(
-                            f"Received raw data from IMGW API for station {station_id}: {data}"
-                        )
+        Zapytania do bazy wykonywane są w puli wątków, a stan w pamięci (znaczniki,
+        harmonogram) aktualizowany jest w pętli zdarzeń.
+        """
+        stan_rows, stan_known = feed["stan"], 0
+        przeplyw_rows, przeplyw_known = feed["przeplyw"], 0
+        if self.watermarks is not None:
+            stan_rows, stan_known = self.watermarks.filter_new("stan", stan_rows)
+            przeplyw_rows, przeplyw_known = self.watermarks.filter_new("przeplyw", przeplyw_rows)
 
-                        if not data or len(data) == 0:
-                            logger.warning(f"No data received for station {station_id}")
-                            return {"stan_wody": []}
+        with sync_stage("measurements"):
+            stan_inserted, stan_skipped, przeplyw_inserted, przeplyw_skipped = await asyncio.to_thread(
+                self._write_measurements, stan_rows, przeplyw_rows
+            )
 
-                        measurement = data[0]
+        if self.watermarks is not None:
+            self.watermarks.advance("stan", stan_rows)
+            self.watermarks.advance("przeplyw", przeplyw_rows)
 
-                        if (
-                            "stan_wody_data_pomiaru" in measurement
-                            and "stan_wody" in measurement
-                            and measurement["stan_wody"] is not None
-                        ):
-                            stan_wody_data_pomiaru = self._parse_datetime(measurement["stan_wody_data_pomiaru"])
-                            if stan_wody_data_pomiaru:
-                                if self.db_service.add_stan_measurement(
-                                    station_id=station_id,
-                                    stan_wody_data_pomiaru=stan_wody_data_pomiaru,
-                                    stan_wody=float(measurement["stan_wody"]),
-                                ):
-                                    logger.info(
-                                        f"Dodano nowy pomiar dla stacji {station_id}"
-                                    )
-                                else:
-                                    logger.info(
-                                        f"Pomiar dla stacji {station_id} już istnieje w bazie"
-                                    )
+        if self.poll_planner is not None:
+            self.poll_planner.observe(
+                [station["id_stacji"] for station in feed["stations"]],
+                feed["stan"] + feed["przeplyw"],
+            )
 
-                                return {
-                                    "stan_wody": [
-                                        {
-                                            "stan_wody_data_pomiaru": measurement["stan_wody_data_pomiaru"],
-                                            "stan_wody": float(measurement["stan_wody"]),
-                                        }
-                                    ]
-                                }
+        return {
+            "stan_fetched": len(feed["stan"]),
+            "stan_inserted": stan_inserted,
+            "stan_skipped": stan_skipped + stan_known,
+            "przeplyw_fetched": len(feed["przeplyw"]),
+            "przeplyw_inserted": przeplyw_inserted,
+            "przeplyw_skipped": przeplyw_skipped + przeplyw_known,
+        }
 
-                        logger.warning(
-                            f"Invalid measurement data for station {station_id}"
-                        )
-                        return {"stan_wody_data_pomiaru": []}
-                    else:
-                        logger.error(
-                            f"IMGW API returned status {response.status} for station {station_id}"
-                        )
-                        return {"stan_wody_data_pomiaru": []}
+    async def get_stations(self) -> List[Dict[str, Any]]:
+        """Pobierz listę stacji pomiarowych i zaktualizuj bazę danych"""
+        try:
+            with sync_stage("fetch"):
+                stations = await self.fetch_hydro_feed()
         except Exception as e:
-            logger.error(f"Error fetching data for station {station_id}: {str(e)}")
-            return {"stan_wody": []}
-
-    async def get_warnings(self) -> List[Dict[str, Any]]:
-        """Pobierz ostrzeżenia hydrologiczne z API IMGW"""
-        url = f"{self.warnings_url}"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data
-                else:
-                    raise Exception(f"Error fetching warnings: {response.status}")
+            logger.error(f"Error fetching stations: {str(e)}")
+            return []
 
-    async def sync_warnings(self):
-        """Synchronizuj ostrzeżenia hydrologiczne do bazy danych"""
         try:
-            warnings = await self.get_warnings()
-            for warning_data in warnings:
-                warning_data['opublikowano'] = datetime.strptime(warning_data['opublikowano'], '%Y-%m-%d %H:%M:%S')
-                warning_data['data_od'] = datetime.strptime(warning_data['data_od'], '%Y-%m-%d %H:%M:%S')
-                warning_data['data_do'] = datetime.strptime(warning_data['data_do'], '%Y-%m-%d %H:%M:%S')
+            with sync_stage("stations"):
+                await asyncio.to_thread(self.db_service.sync_stations, self.parse_hydro_feed(stations)["stations"])
+        except Exception as e:
+            logger.error(f"Error saving stations: {str(e)}")
+        return stations
+
+    async def get_station_data(self, station_id: str) -> Dict[str, int]:
+        """Pobierz stan i przepływ stacji jednym zapytaniem i zapisz w bazie"""
+        url = f"{self.base_url}/id/{station_id}"
+        with sync_stage("fetch"):
+            status, data = await self.http_client.get_json(url, conditional=True, archive_kind="station")
+        if status == 304:
+            if self.poll_planner is not None:
+                self.poll_planner.observe([station_id], [])
+            return {**dict.fromkeys(MEASUREMENT_COUNTERS, 0), "unchanged": 1}
+        if status != 200:
+            raise Exception(f"IMGW API returned status {status} for station {station_id}")
+
+        with sync_stage("parse"):
+            feed = self.parse_hydro_feed(data or [])
+        result = {**await self.ingest_measurements(feed), "unchanged": 0}
+        self.http_client.confirm(url)
+        return result
 
-                existing = self.db_service.db.query(HydroWarning).filter(
-                    HydroWarning.numer == warning_data['numer'],
-                    HydroWarning.biuro == warning_data['biuro'],
-                    HydroWarning.opublikowano == warning_data['opublikowano']
-                ).first()
+    async def get_warnings(self, conditional: bool = False) -> Optional[List[Dict[str, Any]]]:
+        """Pobierz ostrzeżenia hydrologiczne z API IMGW (None - lista bez zmian)"""
+        url = f"{self.warnings_url}"
+        status, data = await self.http_client.get_json(url, conditional=conditional, archive_kind="warnings")
+        if status == 200:
+            return data
+        elif status == 304:
+            return None
+        else:
+            raise Exception(f"Error fetching warnings: {status}")
 
-                if not existing:
-                    new_warning = HydroWarning(
-                        opublikowano=warning_data['opublikowano'],
-                        stopien=warning_data['stopień'],
-                        data_od=warning_data['data_od'],
-                        data_do=warning_data['data_do'],
-                        prawdopodobienstwo=warning_data['prawdopodobienstwo'],
-                        numer=warning_data['numer'],
-                        biuro=warning_data['biuro'],
-                        zdarzenie=warning_data['zdarzenie'],
-                        przebieg=warning_data['przebieg'],
-                        komentarz=warning_data['komentarz']
-                    )
-                    self.db_service.db.add(new_warning)
-                    self.db_service.db.flush()
+    def parse_warnings(self, payload: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Przekształć listę ostrzeżeń IMGW na rekordy zgodne z modelem HydroWarning"""
+        parser = IMGWTimestampParser(allow_future=True)
+        records = []
+        for warning_data in payload:
+            dates = {field: parser.parse(warning_data[field]) for field in ('opublikowano', 'data_od', 'data_do')}
+            if None in dates.values():
+                logger.warning(f"Invalid dates in warning {warning_data.get('numer')}, skipping")
+                continue
+            records.append(
+                {
+                    **dates,
+                    "stopien": warning_data['stopień'],
+                    "prawdopodobienstwo": warning_data['prawdopodobienstwo'],
+                    "numer": warning_data['numer'],
+                    "biuro": warning_data['biuro'],
+                    "zdarzenie": warning_data['zdarzenie'],
+                    "przebieg": warning_data['przebieg'],
+                    "komentarz": warning_data['komentarz'],
+                    "obszary": [
+                        {
+                            "wojewodztwo": area['wojewodztwo'],
+                            "opis": area['opis'],
+                            "kod_zlewni": area['kod_zlewni'],
+                        }
+                        for area in warning_data['obszary']
+                    ],
+                }
+            )
+        return records
 
-                    for area in warning_data['obszary']:
-                        new_area = WarningArea(
-                            warning_id=new_warning.id,
-                            wojewodztwo=area['wojewodztwo'],
-                            opis=area['opis'],
-                            kod_zlewni=area['kod_zlewni']
-                        )
-                        self.db_service.db.add(new_area)
+    async def sync_warnings(self) -> Dict[str, int]:
+        """Synchronizuj ostrzeżenia hydrologiczne do bazy danych"""
+        try:
+            with sync_stage("fetch"):
+                warnings = await self.get_warnings(conditional=True)
+            if warnings is None:
+                logger.info("Warnings feed unchanged since last sync, skipping")
+                return {"warnings": 0, "unchanged": 1, "inserted": 0, "updated": 0, "withdrawn": 0, "untouched": 0}
 
-                self.db_service.db.commit()
-                logger.info(f"Synchronized {len(warnings)} warnings")
+            with sync_stage("parse"):
+                records = self.parse_warnings(warnings)
+            with sync_stage("warnings"):
+                result = await asyncio.to_thread(self.db_service.sync_warnings, records)
+            logger.info(f"Synchronized {len(records)} warnings")
+            self.http_client.confirm(f"{self.warnings_url}")
+            return {"warnings": len(records), "unchanged": 0, **result}
         except Exception as e:
-            self.db_service.db.rollback()
+            await asyncio.to_thread(self.db_service.db.rollback)
             logger.error(f"Error syncing warnings: {str(e)}")
             raise
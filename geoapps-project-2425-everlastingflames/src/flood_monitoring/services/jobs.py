@@ -0,0 +1,109 @@
+"""
+Trwała kolejka zadań synchronizacji w tabeli Postgres
+"""
+import logging
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session
+
+from flood_monitoring.models.jobs import SyncJob
+from flood_monitoring.services.locks import worker_alive
+from flood_monitoring.services.timestamps import warsaw_now
+
+logger = logging.getLogger(__name__)
+
+JOB_KINDS = ("all", "stations", "measurements", "warnings")
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class SyncJobQueue:
+    """Kolejka zadań: API tylko dodaje zadania, worker pobiera je przez FOR UPDATE SKIP LOCKED"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def enqueue(self, kind: str, params: Optional[Dict[str, Any]] = None) -> SyncJob:
+        """Dodaj zadanie; identyczne zadanie oczekujące w kolejce jest zwracane zamiast duplikatu"""
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown sync job: {kind}")
+        params = {key: value for key, value in (params or {}).items() if value is not None}
+
+        pending = self.db.execute(
+            select(SyncJob)
+            .where(SyncJob.kind == kind, SyncJob.status == "queued", SyncJob.params == params)
+            .order_by(SyncJob.id)
+            .limit(1)
+        ).scalar_one_or_none()
+        if pending is not None:
+            return pending
+
+        job = SyncJob(kind=kind, params=params, status="queued", utworzono=warsaw_now())
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        logger.info(f"Enqueued sync job {job.id} ({kind}, {params})")
+        return job
+
+    def claim(self, worker: str) -> Optional[SyncJob]:
+        """Pobierz najstarsze oczekujące zadanie i oznacz je jako uruchomione"""
+        job = self.db.execute(
+            select(SyncJob)
+            .where(SyncJob.status == "queued")
+            .order_by(SyncJob.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        ).scalar_one_or_none()
+        if job is None:
+            self.db.rollback()
+            return None
+        job.status = "running"
+        job.rozpoczeto = warsaw_now()
+        job.worker = worker
+        self.db.commit()
+        return job
+
+    def finish(self, job_id: int, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        """Zapisz wynik albo błąd zadania"""
+        self.db.execute(
+            update(SyncJob)
+            .where(SyncJob.id == job_id)
+            .values(
+                status="failed" if error is not None else "done",
+                zakonczono=warsaw_now(),
+                result=result,
+                error=error,
+            )
+        )
+        self.db.commit()
+
+    def requeue_interrupted(self) -> int:
+        """Przywróć do kolejki zadania przerwane w trakcie - tylko te, których worker już nie działa"""
+        workers = self.db.execute(
+            select(SyncJob.worker).where(SyncJob.status == "running").distinct()
+        ).scalars().all()
+        orphaned = [worker for worker in workers if worker is None or not worker_alive(self.db, worker)]
+        if not orphaned:
+            self.db.rollback()
+            return 0
+        owners = [SyncJob.worker.in_([worker for worker in orphaned if worker is not None])]
+        if None in orphaned:
+            owners.append(SyncJob.worker.is_(None))
+        count = self.db.execute(
+            update(SyncJob)
+            .where(SyncJob.status == "running", or_(*owners))
+            .values(status="queued", rozpoczeto=None, worker=None)
+        ).rowcount
+        self.db.commit()
+        if count:
+            logger.warning(f"Requeued {count} sync jobs interrupted on stopped workers {orphaned}")
+        return count
+
+    def get(self, job_id: int) -> Optional[SyncJob]:
+        return self.db.get(SyncJob, job_id)
+
+    def recent(self, limit: int = 50, status: Optional[str] = None) -> List[SyncJob]:
+        query = select(SyncJob).order_by(SyncJob.id.desc()).limit(limit)
+        if status is not None:
+            query = query.where(SyncJob.status == status)
+        return list(self.db.execute(query).scalars())
@@ -0,0 +1,70 @@
+"""
+Tabela station_latest: najnowszy odczyt każdej stacji, sprawdzanie zgodności z pomiarami i odbudowa
+"""
+import logging
+from typing import Any, Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from flood_monitoring.models.latest import StationLatest
+
+logger = logging.getLogger(__name__)
+
+# Seria -> (tabela pomiarów, kolumna czasu, kolumna wartości, kolumna wartości w station_latest, kolumna czasu w station_latest)
+LATEST_COLUMNS = {
+    "stan": ("stan_measurements", "stan_wody_data_pomiaru", "stan_wody", "stan_wody", "stan_wody_data_pomiaru"),
+    "przeplyw": ("przeplyw_measurements", "przeplyw_data", "przelyw", "przeplyw", "przeplyw_data"),
+}
+TABLE = StationLatest.__tablename__
+
+
+def upsert_sql(series: str, source: str) -> str:
+    """INSERT najnowszych odczytów z relacji source(station_id, measured_at, value); starsze nie nadpisują nowszych"""
+    _, _, _, value_column, time_column = LATEST_COLUMNS[series]
+    return (
+        f"INSERT INTO {TABLE} AS l (station_id, {value_column}, {time_column}) "
+        f"SELECT DISTINCT ON (station_id) station_id, value, measured_at FROM {source} "
+        f"ORDER BY station_id, measured_at DESC "
+        f"ON CONFLICT (station_id) DO UPDATE SET "
+        f"{value_column} = excluded.{value_column}, {time_column} = excluded.{time_column} "
+        f"WHERE l.{time_column} IS NULL OR excluded.{time_column} >= l.{time_column}"
+    )
+
+
+def _expected_sql(series: str) -> str:
+    """Najnowszy pomiar każdej stacji z surowej tabeli - jedno zejście indeksem klucza głównego na stację"""
+    table, time_column, value_column, _, _ = LATEST_COLUMNS[series]
+    return (
+        f"SELECT s.id_stacji AS station_id, m.measured_at, m.value FROM stations s "
+        f"CROSS JOIN LATERAL (SELECT {time_column} AS measured_at, {value_column} AS value FROM {table} "
+        f"WHERE station_id = s.id_stacji ORDER BY {time_column} DESC LIMIT 1) m"
+    )
+
+
+def check(db: Session) -> Dict[str, List[Dict[str, Any]]]:
+    """Porównaj station_latest z surowymi pomiarami; zwraca rozbieżności dla każdej serii"""
+    mismatches = {}
+    for series, (_, _, _, value_column, time_column) in LATEST_COLUMNS.items():
+        rows = db.execute(
+            text(
+                f"WITH expected AS ({_expected_sql(series)}) "
+                f"SELECT coalesce(e.station_id, l.station_id) AS station_id, "
+                f"e.measured_at AS expected_at, e.value AS expected_value, "
+                f"l.{time_column} AS stored_at, l.{value_column} AS stored_value "
+                f"FROM expected e FULL JOIN {TABLE} l ON l.station_id = e.station_id "
+                f"WHERE e.measured_at IS DISTINCT FROM l.{time_column} OR e.value IS DISTINCT FROM l.{value_column}"
+            )
+        )
+        mismatches[series] = [dict(row._mapping) for row in rows]
+    return mismatches
+
+
+def rebuild(db: Session) -> int:
+    """Odbuduj station_latest od zera z surowych pomiarów (w bieżącej transakcji); zwraca liczbę stacji"""
+    # Blokada wyklucza równoległe aktualizacje z ingestu do końca transakcji
+    db.execute(text(f"LOCK TABLE {TABLE} IN SHARE ROW EXCLUSIVE MODE"))
+    db.execute(text(f"DELETE FROM {TABLE}"))
+    for series in LATEST_COLUMNS:
+        db.execute(text(f"WITH expected AS ({_expected_sql(series)}) {upsert_sql(series, 'expected')}"))
+    return db.execute(text(f"SELECT count(*) FROM {TABLE}")).scalar()
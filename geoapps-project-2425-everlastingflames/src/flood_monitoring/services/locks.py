@@ -0,0 +1,128 @@
+"""
+Koordynacja synchronizacji między procesami przez blokady doradcze Postgres
+"""
+import logging
+import zlib
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from src.flood_monitoring.core.database import engine as default_engine
+
+logger = logging.getLogger(__name__)
+
+# Zadania zapisujące te same tabele wykluczają się wzajemnie; stations, measurements i all
+# zapisują tabelę stations (metadane z listy hydro), więc tworzą jedną grupę
+LOCK_GROUPS = {
+    "stations": "hydro",
+    "measurements": "hydro",
+    "all": "hydro",
+    "warnings": "warnings",
+}
+
+
+def _key(name: str) -> int:
+    # Dodatnie int4, żeby klucze dało się porównać z kolumnami oid w pg_locks
+    return zlib.crc32(name.encode("utf-8")) & 0x7FFFFFFF
+
+
+NAMESPACE = _key("flood_monitoring.sync")
+# Blokady trzymane przez działające workery - po nich rozpoznajemy osierocone zadania
+WORKER_NAMESPACE = _key("flood_monitoring.worker")
+
+
+def lock_group(kind: str) -> str:
+    return LOCK_GROUPS.get(kind, kind)
+
+
+class SyncAlreadyRunning(Exception):
+    """Inny proces wykonuje już synchronizację z tej samej grupy"""
+
+    def __init__(self, kind: str, run_id: Optional[int] = None):
+        self.kind = kind
+        self.run_id = run_id
+        super().__init__(
+            f"{kind} sync already running" + (f" (run {run_id})" if run_id is not None else "")
+        )
+
+
+class SyncLock:
+    """Blokada doradcza na poziomie sesji Postgres, trzymana na osobnym połączeniu przez cały przebieg.
+
+    Blokadę zwalnia unlock(), a w razie awarii procesu - zamknięcie połączenia przez serwer.
+    """
+
+    def __init__(self, kind: str, engine: Engine = default_engine):
+        self.group = lock_group(kind)
+        self.namespace = NAMESPACE
+        self.key = _key(self.group)
+        self.engine = engine
+        self._connection: Optional[Connection] = None
+
+    def try_lock(self) -> bool:
+        connection = self.engine.connect()
+        try:
+            acquired = connection.execute(
+                text("SELECT pg_try_advisory_lock(:namespace, :key)"),
+                {"namespace": self.namespace, "key": self.key},
+            ).scalar()
+            connection.commit()
+        except Exception:
+            connection.close()
+            raise
+        if not acquired:
+            connection.close()
+            return False
+        self._connection = connection
+        return True
+
+    def unlock(self):
+        if self._connection is None:
+            return
+        try:
+            self._connection.execute(
+                text("SELECT pg_advisory_unlock(:namespace, :key)"),
+                {"namespace": self.namespace, "key": self.key},
+            )
+            self._connection.commit()
+        except Exception as e:
+            # Zamknięcie połączenia poniżej i tak zwalnia blokadę po stronie serwera
+            logger.error(f"Failed to release {self.group} sync lock: {str(e)}")
+            self._connection.invalidate()
+        finally:
+            self._connection.close()
+            self._connection = None
+
+
+class WorkerLock(SyncLock):
+    """Blokada obecności workera trzymana przez cały czas jego działania"""
+
+    def __init__(self, worker: str, engine: Engine = default_engine):
+        super().__init__(worker, engine)
+        self.group = worker
+        self.namespace = WORKER_NAMESPACE
+        self.key = _key(worker)
+
+
+def _is_held(db: Session, namespace: int, key: int) -> bool:
+    return bool(
+        db.execute(
+            text(
+                "SELECT EXISTS (SELECT 1 FROM pg_locks WHERE locktype = 'advisory' AND granted "
+                "AND classid = :namespace AND objid = :key AND objsubid = 2)"
+            ),
+            {"namespace": namespace, "key": key},
+        ).scalar()
+    )
+
+
+def is_locked(db: Session, kind: str) -> bool:
+    """Czy jakikolwiek proces trzyma blokadę grupy zadania"""
+    return _is_held(db, NAMESPACE, _key(lock_group(kind)))
+
+
+def worker_alive(db: Session, worker: str) -> bool:
+    """Czy worker o tej nazwie nadal działa (trzyma swoją blokadę obecności)"""
+    return _is_held(db, WORKER_NAMESPACE, _key(worker))
@@ -0,0 +1,197 @@
+"""
+Miesięczne partycje tabel pomiarów: tworzenie, przenoszenie z partycji domyślnej i retencja
+"""
+import logging
+import re
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Optional, Union
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from src.flood_monitoring.core.config import get_settings
+from src.flood_monitoring.core.database import Base
+from flood_monitoring.services.locks import NAMESPACE, _key
+from flood_monitoring.services.timestamps import warsaw_now
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Tabela partycjonowana -> kolumna klucza partycji
+PARTITIONED_TABLES = {
+    "stan_measurements": "stan_wody_data_pomiaru",
+    "przeplyw_measurements": "przeplyw_data",
+}
+PARTITION_NAME = re.compile(r"_p(\d{4})(\d{2})$")
+
+Executor = Union[Connection, Session]
+
+
+def month_start(value: Union[date, datetime]) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def _lock(db: Executor):
+    """Tworzenie i usuwanie partycji w jednej transakcji naraz (blokada do końca transakcji).
+
+    Klucz różni się od blokady przebiegu "partitions" z tracked_run, żeby konserwacja nie czekała na samą siebie.
+    """
+    db.execute(
+        text("SELECT pg_advisory_xact_lock(:namespace, :key)"),
+        {"namespace": NAMESPACE, "key": _key("partitions.ddl")},
+    )
+
+
+def is_partitioned(db: Executor, table: str) -> Optional[bool]:
+    """True - tabela partycjonowana, False - zwykła tabela, None - brak tabeli"""
+    relkind = db.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"), {"table": table}
+    ).scalar()
+    return None if relkind is None else relkind == "p"
+
+
+def existing_partitions(db: Executor, table: str) -> Dict[date, str]:
+    rows = db.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = to_regclass(:table)"
+        ),
+        {"table": table},
+    )
+    partitions = {}
+    for (name,) in rows:
+        match = PARTITION_NAME.search(name)
+        if match:
+            partitions[date(int(match.group(1)), int(match.group(2)), 1)] = name
+    return partitions
+
+
+def _create_partition(db: Executor, table: str, column: str, month: date):
+    """Utwórz partycję miesiąca; wiersze tego miesiąca z partycji domyślnej są do niej przenoszone"""
+    name = partition_name(table, month)
+    bounds = {"start": month, "end": add_months(month, 1)}
+    default = f"{table}_default"
+    has_default_rows = db.execute(
+        text(
+            f"SELECT to_regclass(:default) IS NOT NULL AND EXISTS "
+            f"(SELECT 1 FROM {table} WHERE {column} >= :start AND {column} < :end AND tableoid = to_regclass(:default))"
+        ),
+        {**bounds, "default": default},
+    ).scalar()
+    range_sql = f"FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"
+    if not has_default_rows:
+        db.execute(text(f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} {range_sql}"))
+        return
+
+    # Partycji nie można utworzyć, gdy partycja domyślna ma wiersze z jej zakresu
+    db.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    moved = db.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {default} WHERE {column} >= :start AND {column} < :end RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ),
+        bounds,
+    ).rowcount
+    db.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {name} {range_sql}"))
+    logger.info(f"Moved {moved} rows from {default} to new partition {name}")
+
+
+def ensure_partitions(db: Executor, months: Iterable[date], tables: Optional[Iterable[str]] = None) -> int:
+    """Utwórz brakujące partycje podanych miesięcy (w bieżącej transakcji). Zwraca liczbę nowych."""
+    months = sorted({month_start(month) for month in months})
+    created = 0
+    locked = False
+    for table in tables or PARTITIONED_TABLES:
+        existing = existing_partitions(db, table)
+        for month in months:
+            if month in existing:
+                continue
+            if not locked:
+                _lock(db)
+                locked = True
+                existing = existing_partitions(db, table)
+                if month in existing:
+                    continue
+            _create_partition(db, table, PARTITIONED_TABLES[table], month)
+            existing[month] = partition_name(table, month)
+            created += 1
+    return created
+
+
+def ensure_range(db: Executor, first: Union[date, datetime], last: Union[date, datetime]) -> int:
+    """Partycje dla wszystkich miesięcy między podanymi datami"""
+    month, end = month_start(first), month_start(last)
+    months = []
+    while month <= end:
+        months.append(month)
+        month = add_months(month, 1)
+    return ensure_partitions(db, months)
+
+
+def maintain(db: Executor, today: Optional[date] = None) -> Dict[str, Any]:
+    """Partycje okna bieżącego, rozładowanie partycji domyślnej i usunięcie partycji po retencji"""
+    current = month_start(today or warsaw_now())
+    created = ensure_range(
+        db,
+        add_months(current, -settings.PARTITION_MONTHS_BEHIND),
+        add_months(current, settings.PARTITION_MONTHS_AHEAD),
+    )
+
+    for table, column in PARTITIONED_TABLES.items():
+        db.execute(text(f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT"))
+        stray = [
+            month
+            for (month,) in db.execute(
+                text(f"SELECT DISTINCT date_trunc('month', {column})::date FROM {table}_default")
+            )
+        ]
+        if stray:
+            created += ensure_partitions(db, stray, [table])
+
+    dropped = []
+    if settings.MEASUREMENT_RETENTION_MONTHS > 0:
+        cutoff = add_months(current, -settings.MEASUREMENT_RETENTION_MONTHS)
+        for table in PARTITIONED_TABLES:
+            for month, name in sorted(existing_partitions(db, table).items()):
+                if month < cutoff:
+                    _lock(db)
+                    db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+                    dropped.append(name)
+    if created or dropped:
+        logger.info(f"Partition maintenance: {created} created, dropped {dropped}")
+    return {"created": created, "dropped": dropped}
+
+
+def migrate_table(connection: Connection, table: str) -> int:
+    """Przenieś zwykłą tabelę pomiarów do tabeli partycjonowanej o tej samej nazwie (jedna transakcja)"""
+    column = PARTITIONED_TABLES[table]
+    legacy = f"{table}_legacy"
+    _lock(connection)
+    connection.execute(text(f"ALTER TABLE {table} RENAME TO {legacy}"))
+    # Nazwy indeksów są unikalne w schemacie - zwalniamy je dla nowej tabeli
+    for (index,) in connection.execute(
+        text("SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = :table"),
+        {"table": legacy},
+    ).all():
+        connection.execute(text(f'ALTER INDEX "{index}" RENAME TO "{index[:56]}_legacy"'))
+
+    Base.metadata.tables[table].create(connection)
+    first, last = connection.execute(text(f"SELECT min({column}), max({column}) FROM {legacy}")).one()
+    if first is not None:
+        ensure_range(connection, first, last)
+    columns = ", ".join(c.name for c in Base.metadata.tables[table].columns)
+    moved = connection.execute(text(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {legacy}")).rowcount
+    connection.execute(text(f"DROP TABLE {legacy}"))
+    logger.info(f"Migrated {moved} rows of {table} to monthly partitions")
+    return moved
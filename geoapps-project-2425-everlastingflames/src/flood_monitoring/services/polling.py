@@ -0,0 +1,164 @@
+"""
+Adaptacyjne odpytywanie stacji na podstawie wyuczonego rytmu publikacji IMGW
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from src.flood_monitoring.core.config import get_settings
+from flood_monitoring.models.polling import PollSchedule
+from flood_monitoring.services.timestamps import warsaw_now
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+LEARN_INTERVALS_SQL = text(
+    """
+    SELECT station_id,
+           percentile_cont(0.5) WITHIN GROUP (ORDER BY gap) AS median_gap,
+           max(measured_at) AS last_seen
+    FROM (
+        SELECT station_id,
+               measured_at,
+               EXTRACT(EPOCH FROM measured_at - lag(measured_at) OVER (
+                   PARTITION BY station_id ORDER BY measured_at
+               )) AS gap
+        FROM (
+            SELECT station_id, stan_wody_data_pomiaru AS measured_at
+            FROM stan_measurements
+            WHERE stan_wody_data_pomiaru >= :since
+            UNION
+            SELECT station_id, przeplyw_data AS measured_at
+            FROM przeplyw_measurements
+            WHERE przeplyw_data >= :since
+        ) AS measurements
+    ) AS gaps
+    GROUP BY station_id
+    """
+)
+
+
+class AdaptivePollPlanner:
+    """Uczy się interwału publikacji każdej stacji i wskazuje stacje, dla których nowe dane są prawdopodobne"""
+
+    def __init__(self):
+        self.intervals: Dict[str, float] = {}
+        self.last_seen: Dict[str, datetime] = {}
+        self.retry_after: Dict[str, datetime] = {}
+        self.hits = 0
+        self.misses = 0
+        self.learned_at: Optional[datetime] = None
+
+    def _clamp(self, seconds: float) -> float:
+        return min(max(seconds, settings.POLL_MIN_INTERVAL), settings.POLL_MAX_INTERVAL)
+
+    def learn(self, db: Session):
+        """Wyznacz interwały stacji z odstępów między kolejnymi zapisanymi pomiarami"""
+        since = warsaw_now() - timedelta(days=settings.POLL_LEARNING_DAYS)
+        for row in db.execute(LEARN_INTERVALS_SQL, {"since": since}):
+            if row.median_gap:
+                self.intervals[row.station_id] = self._clamp(float(row.median_gap))
+            if row.last_seen and (
+                row.station_id not in self.last_seen or row.last_seen > self.last_seen[row.station_id]
+            ):
+                self.last_seen[row.station_id] = row.last_seen
+        self.learned_at = warsaw_now()
+        logger.info(f"Learned update intervals for {len(self.intervals)} stations")
+
+    def interval(self, station_id: str) -> float:
+        return self.intervals.get(station_id, settings.POLL_MIN_INTERVAL)
+
+    def next_due(self, station_id: str) -> Optional[datetime]:
+        """Najbliższy moment, w którym warto odpytać stację (None - od razu)"""
+        last_seen = self.last_seen.get(station_id)
+        if last_seen is None:
+            return None
+        due = last_seen + timedelta(seconds=self.interval(station_id))
+        retry = self.retry_after.get(station_id)
+        return max(due, retry) if retry else due
+
+    def due_stations(self, now: Optional[datetime] = None) -> List[str]:
+        """Stacje, dla których nowy pomiar powinien już być opublikowany"""
+        now = now or warsaw_now()
+        known = set(self.intervals) | set(self.last_seen)
+        return [
+            station_id
+            for station_id in sorted(known)
+            if (self.next_due(station_id) or now) <= now
+        ]
+
+    def observe(self, station_ids: Iterable[str], rows: Iterable[tuple], now: Optional[datetime] = None):
+        """Zapisz wynik odpytania stacji: trafienie, gdy pojawił się nowszy pomiar"""
+        now = now or warsaw_now()
+        latest: Dict[str, datetime] = {}
+        for station_id, measured_at, _ in rows:
+            if station_id not in latest or measured_at > latest[station_id]:
+                latest[station_id] = measured_at
+
+        for station_id in station_ids:
+            measured_at = latest.get(station_id)
+            previous = self.last_seen.get(station_id)
+            if measured_at and (previous is None or measured_at > previous):
+                self.hits += 1
+                if previous is not None:
+                    gap = (measured_at - previous).total_seconds()
+                    if station_id in self.intervals:
+                        gap = 0.7 * self.intervals[station_id] + 0.3 * gap
+                    self.intervals[station_id] = self._clamp(gap)
+                self.last_seen[station_id] = measured_at
+                self.retry_after.pop(station_id, None)
+            else:
+                self.misses += 1
+                retry = max(self.interval(station_id) * settings.POLL_RETRY_FRACTION, settings.POLL_MIN_INTERVAL)
+                self.retry_after[station_id] = now + timedelta(seconds=retry)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Stan harmonogramu do podglądu i strojenia"""
+        polls = self.hits + self.misses
+        return {
+            "learned_at": self.learned_at,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / polls if polls else None,
+            "due": len(self.due_stations()),
+            "stations": {
+                station_id: {
+                    "interval_seconds": self.interval(station_id),
+                    "last_seen": self.last_seen.get(station_id),
+                    "next_due": self.next_due(station_id),
+                }
+                for station_id in sorted(set(self.intervals) | set(self.last_seen))
+            },
+        }
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {key: _jsonable(item) for key, item in value.items()}
+    return value
+
+
+def save_snapshot(db: Session, planner: AdaptivePollPlanner):
+    """Zapisz stan harmonogramu workera, żeby API mogło go pokazać bez ponownej nauki"""
+    saved_at = warsaw_now()
+    snapshot = _jsonable(planner.snapshot())
+    db.execute(
+        insert(PollSchedule)
+        .values(id=1, zapisano=saved_at, harmonogram=snapshot)
+        .on_conflict_do_update(index_elements=["id"], set_={"zapisano": saved_at, "harmonogram": snapshot})
+    )
+    db.commit()
+
+
+def load_snapshot(db: Session) -> Optional[Dict[str, Any]]:
+    """Ostatni zapisany stan harmonogramu (None, jeśli worker jeszcze go nie zapisał)"""
+    row = db.get(PollSchedule, 1)
+    if row is None:
+        return None
+    return {**row.harmonogram, "saved_at": row.zapisano}
@@ -0,0 +1,150 @@
+"""
+Godzinowe i dobowe agregaty pomiarów aktualizowane przyrostowo przy zapisie
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from src.flood_monitoring.core.config import get_settings
+from flood_monitoring.models.rollups import DailyRollup, HourlyRollup
+from flood_monitoring.services import latest
+from flood_monitoring.services.timestamps import warsaw_now
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Seria -> (tabela pomiarów, kolumna czasu, kolumna wartości, klucze odpowiedzi API)
+SERIES = {
+    "stan": ("stan_measurements", "stan_wody_data_pomiaru", "stan_wody", "stan"),
+    "przeplyw": ("przeplyw_measurements", "przeplyw_data", "przelyw", "przelyw"),
+}
+# Rozdzielczość -> (model agregatu, jednostka date_trunc)
+RESOLUTIONS = {"hour": (HourlyRollup, "hour"), "day": (DailyRollup, "day")}
+
+
+def _upsert(resolution: str, source: str) -> str:
+    """INSERT agregatów z relacji source(station_id, measured_at, value) łączący je z zapisanymi"""
+    model, unit = RESOLUTIONS[resolution]
+    table = model.__tablename__
+    return (
+        f"INSERT INTO {table} AS r (station_id, seria, okres, liczba, suma, suma_kwadratow, minimum, maksimum, "
+        f"ostatni_pomiar, ostatnia_wartosc) "
+        f"SELECT station_id, :series, date_trunc('{unit}', measured_at), count(*), sum(value), sum(value * value), "
+        f"min(value), max(value), max(measured_at), (array_agg(value ORDER BY measured_at DESC))[1] "
+        f"FROM {source} GROUP BY station_id, date_trunc('{unit}', measured_at) "
+        # Stała kolejność blokowania wierszy przy równoległych zapisach
+        f"ORDER BY station_id, date_trunc('{unit}', measured_at) "
+        f"ON CONFLICT (station_id, seria, okres) DO UPDATE SET "
+        f"liczba = r.liczba + excluded.liczba, "
+        f"suma = r.suma + excluded.suma, "
+        f"suma_kwadratow = r.suma_kwadratow + excluded.suma_kwadratow, "
+        f"minimum = least(r.minimum, excluded.minimum), "
+        f"maksimum = greatest(r.maksimum, excluded.maksimum), "
+        f"ostatnia_wartosc = CASE WHEN excluded.ostatni_pomiar >= r.ostatni_pomiar "
+        f"THEN excluded.ostatnia_wartosc ELSE r.ostatnia_wartosc END, "
+        f"ostatni_pomiar = greatest(r.ostatni_pomiar, excluded.ostatni_pomiar)"
+    )
+
+
+def rollup_statement(series: str, source: str) -> str:
+    """Jedno zapytanie: CTE `inserted` z nowymi pomiarami, aktualizacja obu rozdzielczości
+    i tabeli station_latest oraz liczba pomiarów.
+
+    Agregaty wolno zasilać wyłącznie nowo dodanymi pomiarami - ON CONFLICT DO NOTHING w źródle
+    gwarantuje, że ponowna synchronizacja tych samych danych nie zmienia liczników.
+    """
+    return (
+        f"WITH inserted AS ({source}), "
+        f"hourly AS ({_upsert('hour', 'inserted')}), "
+        f"daily AS ({_upsert('day', 'inserted')}), "
+        f"latest AS ({latest.upsert_sql(series, 'inserted')}) "
+        f"SELECT count(*) FROM inserted"
+    )
+
+
+def apply(db: Session, series: str, rows: Sequence[Sequence[Any]]):
+    """Dolicz nowo dodane pomiary (station_id, czas, wartość) do agregatów i najnowszych odczytów w bieżącej transakcji"""
+    if not rows:
+        return
+    station_ids, measured, values = zip(*rows)
+    db.execute(
+        text(
+            rollup_statement(
+                series,
+                "SELECT * FROM unnest(CAST(:station_ids AS varchar[]), CAST(:measured AS timestamp[]), "
+                "CAST(:values AS double precision[])) AS source(station_id, measured_at, value)"
+            )
+        ),
+        {"series": series, "station_ids": list(station_ids), "measured": list(measured), "values": list(values)},
+    )
+
+
+def resolution_for(days: int) -> str:
+    """Najgrubsza rozdzielczość, która nadal daje czytelny wykres dla zakresu"""
+    if days > settings.ROLLUP_DAILY_AFTER_DAYS:
+        return "day"
+    if days > settings.ROLLUP_HOURLY_AFTER_DAYS:
+        return "hour"
+    return "raw"
+
+
+def station_rollups(db: Session, station_id: str, days: int, resolution: str) -> Dict[str, List[Dict[str, Any]]]:
+    """Agregaty stacji z ostatnich X dni w formacie odpowiedzi get_station_measurements"""
+    model, _ = RESOLUTIONS[resolution]
+    start = warsaw_now() - timedelta(days=days)
+    rows = (
+        db.query(model)
+        .filter(model.station_id == station_id, model.okres >= start)
+        .order_by(model.seria, model.okres)
+        .all()
+    )
+    result: Dict[str, List[Dict[str, Any]]] = {"stan": [], "przelyw": []}
+    for row in rows:
+        _, time_key, value_key, result_key = SERIES[row.seria]
+        result[result_key].append(
+            {
+                time_key: row.okres,
+                value_key: row.suma / row.liczba,
+                "minimum": row.minimum,
+                "maksimum": row.maksimum,
+                "liczba": row.liczba,
+            }
+        )
+    return result
+
+
+def rebuild(db: Session, series: str, start: datetime, end: datetime) -> int:
+    """Przelicz agregaty serii w zakresie [start, end) od zera na podstawie surowych pomiarów.
+
+    Zakres musi zaczynać się i kończyć o północy, żeby nie przeciąć agregatów dobowych.
+    """
+    table, time_column, value_column, _ = SERIES[series]
+    bounds = {"series": series, "start": start, "end": end}
+    # Równoległy zapis pomiarów czeka z doliczeniem do agregatów do końca przeliczenia
+    db.execute(
+        text(f"LOCK TABLE {HourlyRollup.__tablename__}, {DailyRollup.__tablename__} IN SHARE ROW EXCLUSIVE MODE")
+    )
+    for model, _ in RESOLUTIONS.values():
+        db.execute(
+            text(f"DELETE FROM {model.__tablename__} WHERE seria = :series AND okres >= :start AND okres < :end"),
+            bounds,
+        )
+    counted = db.execute(
+        text(
+            rollup_statement(
+                series,
+                f"SELECT station_id, {time_column} AS measured_at, {value_column} AS value FROM {table} "
+                f"WHERE {time_column} >= :start AND {time_column} < :end"
+            )
+        ),
+        bounds,
+    ).scalar()
+    return counted or 0
+
+
+def first_measurement(db: Session, series: str) -> Optional[datetime]:
+    table, time_column, _, _ = SERIES[series]
+    return db.execute(text(f"SELECT min({time_column}) FROM {table}")).scalar()
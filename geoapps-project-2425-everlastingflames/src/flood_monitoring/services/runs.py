@@ -0,0 +1,291 @@
+"""
+Rejestr przebiegów synchronizacji: czasy etapów, liczniki, opóźnienia HTTP i błędy stacji
+"""
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from src.flood_monitoring.core.database import SessionLocal
+from flood_monitoring.models.runs import SyncRun
+from flood_monitoring.services.locks import LOCK_GROUPS, SyncAlreadyRunning, SyncLock, lock_group
+from flood_monitoring.services.timestamps import warsaw_now
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (50, 90, 99)
+
+
+def _percentile(ordered: List[float], percent: int) -> float:
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class SyncRunStats:
+    """Statystyki jednego przebiegu zbierane w pamięci.
+
+    Bieżący przebieg jest w zmiennej kontekstowej, więc zadania asyncio uruchomione w jego
+    trakcie (np. workery stacji) raportują do niego bez przekazywania obiektu. Czasy etapów
+    są sumowane - przy równoległych stacjach suma może przekroczyć czas całego przebiegu.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self.latencies: List[float] = []
+        self.http_statuses: Dict[str, int] = {}
+        self.http_errors = 0
+        self.errors: Dict[str, str] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - started
+
+    def record_http(self, seconds: float, status: Optional[int]):
+        """Zapisz czas odpowiedzi IMGW; status None oznacza błąd połączenia lub timeout"""
+        self.latencies.append(seconds)
+        if status is None:
+            self.http_errors += 1
+        else:
+            self.http_statuses[str(status)] = self.http_statuses.get(str(status), 0) + 1
+
+    def record_error(self, station_id: str, error: str):
+        self.errors[station_id] = error
+
+    def http_summary(self) -> Dict[str, Any]:
+        summary: Dict[str, Any] = {
+            "requests": len(self.latencies),
+            "errors": self.http_errors,
+            "statuses": dict(self.http_statuses),
+        }
+        if self.latencies:
+            ordered = sorted(self.latencies)
+            summary["mean_ms"] = round(1000 * sum(ordered) / len(ordered), 1)
+            for percent in PERCENTILES:
+                summary[f"p{percent}_ms"] = round(1000 * _percentile(ordered, percent), 1)
+            summary["max_ms"] = round(1000 * ordered[-1], 1)
+        return summary
+
+
+_current_run: ContextVar[Optional[SyncRunStats]] = ContextVar("current_sync_run", default=None)
+
+
+def current_run() -> Optional[SyncRunStats]:
+    return _current_run.get()
+
+
+@contextmanager
+def sync_stage(name: str) -> Iterator[None]:
+    """Zmierz etap bieżącego przebiegu (bez przebiegu nic nie robi)"""
+    stats = _current_run.get()
+    if stats is None:
+        yield
+        return
+    with stats.stage(name):
+        yield
+
+
+def row_counters(result: Dict[str, Any]) -> Dict[str, int]:
+    """Łączne liczby pobranych, dodanych i pominiętych wierszy z wyniku zadania"""
+    if "warnings" in result:
+        counters = {
+            "fetched": result["warnings"],
+            "inserted": result.get("inserted", 0),
+            "updated": result.get("updated", 0),
+            "skipped": result.get("untouched", 0),
+        }
+    elif "stan_fetched" in result:
+        fetched = result["stan_fetched"] + result["przeplyw_fetched"]
+        inserted = result["stan_inserted"] + result["przeplyw_inserted"]
+        counters = {"fetched": fetched, "inserted": inserted, "skipped": fetched - inserted}
+    else:
+        inserted, updated, unchanged = (result.get(key, 0) for key in ("inserted", "updated", "unchanged"))
+        counters = {
+            "fetched": inserted + updated + unchanged,
+            "inserted": inserted,
+            "updated": updated,
+            "skipped": unchanged,
+        }
+    if "failed" in result:
+        counters["stations_failed"] = result["failed"]
+    return counters
+
+
+class SyncRunStore:
+    """Zapis przebiegów w tabeli sync_runs"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def start(self, kind: str, trigger: str, job_id: Optional[int] = None) -> int:
+        run = SyncRun(kind=kind, trigger=trigger, job_id=job_id, status="running", rozpoczeto=warsaw_now())
+        self.db.add(run)
+        self.db.commit()
+        return run.id
+
+    def finish(
+        self,
+        run_id: int,
+        stats: SyncRunStats,
+        duration: float,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ):
+        self.db.execute(
+            update(SyncRun)
+            .where(SyncRun.id == run_id)
+            .values(
+                status="failed" if error is not None else "done",
+                zakonczono=warsaw_now(),
+                czas_trwania=round(duration, 3),
+                etapy={name: round(seconds, 3) for name, seconds in stats.stages.items()},
+                liczniki=row_counters(result) if result is not None else None,
+                http=stats.http_summary(),
+                bledy=stats.errors or None,
+                result=result,
+                error=error,
+            )
+        )
+        self.db.commit()
+
+    def get(self, run_id: int) -> Optional[SyncRun]:
+        return self.db.get(SyncRun, run_id)
+
+    @staticmethod
+    def _group_kinds(kind: str) -> List[str]:
+        group = lock_group(kind)
+        return [name for name, name_group in LOCK_GROUPS.items() if name_group == group] or [kind]
+
+    def fail_abandoned(self, kind: str) -> int:
+        """Oznacz jako przerwane przebiegi grupy, które zostały w stanie running po awarii procesu.
+
+        Wywoływane z trzymaną blokadą grupy - żaden inny przebieg z grupy nie może wtedy trwać.
+        """
+        count = self.db.execute(
+            update(SyncRun)
+            .where(SyncRun.kind.in_(self._group_kinds(kind)), SyncRun.status == "running")
+            .values(status="failed", zakonczono=warsaw_now(), error="interrupted: process stopped before finishing")
+        ).rowcount
+        self.db.commit()
+        if count:
+            logger.warning(f"Marked {count} abandoned sync runs as failed")
+        return count
+
+    def active(self, kind: str) -> Optional[int]:
+        """Najnowszy trwający przebieg z grupy blokady zadania"""
+        return self.db.execute(
+            select(SyncRun.id)
+            .where(SyncRun.kind.in_(self._group_kinds(kind)), SyncRun.status == "running")
+            .order_by(SyncRun.id.desc())
+            .limit(1)
+        ).scalar_one_or_none()
+
+    def recent(self, limit: int = 50, kind: Optional[str] = None, status: Optional[str] = None) -> List[SyncRun]:
+        query = select(SyncRun).order_by(SyncRun.id.desc()).limit(limit)
+        if kind is not None:
+            query = query.where(SyncRun.kind == kind)
+        if status is not None:
+            query = query.where(SyncRun.status == status)
+        return list(self.db.execute(query).scalars())
+
+
+def _start_run(kind: str, trigger: str, job_id: Optional[int]) -> int:
+    db = SessionLocal()
+    try:
+        return SyncRunStore(db).start(kind, trigger, job_id)
+    finally:
+        db.close()
+
+
+def _active_run(kind: str) -> Optional[int]:
+    db = SessionLocal()
+    try:
+        return SyncRunStore(db).active(kind)
+    finally:
+        db.close()
+
+
+def _fail_abandoned(kind: str) -> int:
+    db = SessionLocal()
+    try:
+        return SyncRunStore(db).fail_abandoned(kind)
+    finally:
+        db.close()
+
+
+def _finish_run(run_id: int, stats: SyncRunStats, duration: float, result, error):
+    db = SessionLocal()
+    try:
+        SyncRunStore(db).finish(run_id, stats, duration, result, error)
+    finally:
+        db.close()
+
+
+async def tracked_run(
+    kind: str,
+    trigger: str,
+    run: Callable[[], Awaitable[Dict[str, Any]]],
+    job_id: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Wykonaj przebieg synchronizacji i zapisz jego statystyki. Wynik zawiera run_id.
+
+    Przebieg trzyma blokadę doradczą swojej grupy zadań, więc w danej chwili wykonuje go tylko
+    jeden proces; pozostałe dostają SyncAlreadyRunning z identyfikatorem trwającego przebiegu.
+    Błąd zapisu statystyk nie przerywa synchronizacji; błąd przebiegu jest zapisywany i zgłaszany dalej.
+    """
+    lock = SyncLock(kind)
+    if not await asyncio.to_thread(lock.try_lock):
+        raise SyncAlreadyRunning(kind, await asyncio.to_thread(_active_run, kind))
+    try:
+        try:
+            await asyncio.to_thread(_fail_abandoned, kind)
+        except Exception as e:
+            logger.error(f"Failed to clean up abandoned {kind} sync runs: {str(e)}")
+        return await _tracked(kind, trigger, run, job_id)
+    finally:
+        await asyncio.to_thread(lock.unlock)
+
+
+async def _tracked(
+    kind: str,
+    trigger: str,
+    run: Callable[[], Awaitable[Dict[str, Any]]],
+    job_id: Optional[int],
+) -> Dict[str, Any]:
+    try:
+        run_id: Optional[int] = await asyncio.to_thread(_start_run, kind, trigger, job_id)
+    except Exception as e:
+        logger.error(f"Failed to record start of {kind} sync run: {str(e)}")
+        run_id = None
+
+    stats = SyncRunStats()
+    token = _current_run.set(stats)
+    started = time.perf_counter()
+    result = error = None
+    try:
+        result = await run()
+        return {**result, "run_id": run_id} if run_id is not None else result
+    except asyncio.CancelledError:
+        # Zatrzymanie workera lub harmonogramu - przebieg nie został dokończony
+        error = "cancelled"
+        raise
+    except Exception as e:
+        error = str(e)
+        raise
+    finally:
+        _current_run.reset(token)
+        duration = time.perf_counter() - started
+        if run_id is not None:
+            try:
+                await asyncio.to_thread(_finish_run, run_id, stats, duration, result, error)
+            except Exception as e:
+                logger.error(f"Failed to record sync run {run_id}: {str(e)}")
+        logger.info(f"Sync run {run_id} ({kind}, {trigger}) took {duration:.1f}s, http: {stats.http_summary()}")
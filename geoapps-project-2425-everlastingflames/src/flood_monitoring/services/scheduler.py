@@ -0,0 +1,169 @@
+"""
+Okresowa synchronizacja danych IMGW w procesie aplikacji
+"""
+import asyncio
+import logging
+import random
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from src.flood_monitoring.core.config import get_settings
+from src.flood_monitoring.core.database import SessionLocal
+from flood_monitoring.services.http_client import IMGWHttpClient
+from flood_monitoring.services import partitions
+from flood_monitoring.services.locks import SyncAlreadyRunning
+from flood_monitoring.services.polling import AdaptivePollPlanner, save_snapshot
+from flood_monitoring.services.runs import sync_stage, tracked_run
+from flood_monitoring.services.sync_runner import run_sync_job
+from flood_monitoring.services.timestamps import warsaw_now
+from flood_monitoring.services.watermarks import MeasurementWatermarks
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class SyncScheduler:
+    """Harmonogram zadań synchronizacji z losowym opóźnieniem i pomijaniem nakładających się przebiegów"""
+
+    def __init__(
+        self,
+        http_client: IMGWHttpClient,
+        poll_planner: Optional[AdaptivePollPlanner] = None,
+        watermarks: Optional[MeasurementWatermarks] = None,
+    ):
+        self.http_client = http_client
+        self.poll_planner = poll_planner
+        self.watermarks = watermarks
+        self.intervals = {
+            "stations": settings.SYNC_STATIONS_INTERVAL,
+            "measurements": settings.SYNC_MEASUREMENTS_INTERVAL,
+            "warnings": settings.SYNC_WARNINGS_INTERVAL,
+            "partitions": settings.PARTITION_MAINTENANCE_INTERVAL,
+        }
+        self.last_runs: Dict[str, Dict[str, Any]] = {}
+        self._running = set()
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        """Uruchom pętle zadań o dodatnim interwale"""
+        for kind, interval in self.intervals.items():
+            if interval > 0:
+                self._tasks.append(asyncio.create_task(self._loop(kind, interval)))
+        logger.info(f"Sync scheduler started: {self.intervals}")
+
+    async def stop(self):
+        """Zatrzymaj wszystkie pętle zadań"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Sync scheduler stopped")
+
+    def _jitter(self) -> float:
+        return random.uniform(0, settings.SYNC_JITTER)
+
+    async def _loop(self, kind: str, interval: int):
+        await asyncio.sleep(self._jitter())
+        while True:
+            await self.run_job(kind)
+            await asyncio.sleep(interval + self._jitter())
+
+    async def run_job(self, kind: str) -> bool:
+        """Uruchom zadanie, chyba że poprzedni przebieg jeszcze trwa. Zwraca False przy pominięciu."""
+        if kind in self._running:
+            logger.warning(f"Scheduled {kind} sync skipped: previous run still in progress")
+            return False
+
+        self._running.add(kind)
+        started = datetime.now()
+        try:
+            if kind == "partitions":
+                result = await tracked_run(kind, "schedule", self._maintain_partitions)
+            elif kind == "measurements" and self.poll_planner is not None:
+                result = await tracked_run(kind, "schedule", self._sync_due_measurements)
+            else:
+                result = await tracked_run(
+                    kind,
+                    "schedule",
+                    lambda: run_sync_job(
+                        kind, self.http_client, poll_planner=self.poll_planner, watermarks=self.watermarks
+                    ),
+                )
+            self.last_runs[kind] = {"started": started, "finished": datetime.now(), "result": result}
+            logger.info(f"Scheduled {kind} sync finished in {(datetime.now() - started).total_seconds():.1f}s")
+        except SyncAlreadyRunning as e:
+            self.last_runs[kind] = {"started": started, "finished": datetime.now(), "skipped": e.run_id}
+            logger.warning(f"Scheduled {kind} sync skipped: {str(e)} in another process")
+        except Exception as e:
+            self.last_runs[kind] = {"started": started, "finished": datetime.now(), "error": str(e)}
+            logger.error(f"Scheduled {kind} sync failed: {str(e)}")
+        finally:
+            self._running.discard(kind)
+        if kind == "measurements" and self.poll_planner is not None:
+            try:
+                await asyncio.to_thread(self._save_schedule, self.poll_planner)
+            except Exception as e:
+                logger.error(f"Failed to save poll schedule: {str(e)}")
+        return True
+
+    @staticmethod
+    def _maintain(db_session) -> Dict[str, Any]:
+        try:
+            result = partitions.maintain(db_session)
+            db_session.commit()
+            return result
+        except Exception:
+            db_session.rollback()
+            raise
+        finally:
+            db_session.close()
+
+    async def _maintain_partitions(self) -> Dict[str, Any]:
+        """Partycje na kolejne miesiące i usunięcie partycji starszych niż okres retencji"""
+        with sync_stage("partitions"):
+            return await asyncio.to_thread(self._maintain, SessionLocal())
+
+    @staticmethod
+    def _save_schedule(planner: AdaptivePollPlanner):
+        db = SessionLocal()
+        try:
+            save_snapshot(db, planner)
+        finally:
+            db.close()
+
+    @staticmethod
+    def _learn(planner: AdaptivePollPlanner):
+        db = SessionLocal()
+        try:
+            planner.learn(db)
+        finally:
+            db.close()
+
+    async def _sync_due_measurements(self) -> Dict[str, Any]:
+        """Odpytaj tylko stacje, dla których spodziewamy się nowych danych"""
+        planner = self.poll_planner
+        if planner.learned_at is None or (
+            (warsaw_now() - planner.learned_at).total_seconds() > settings.POLL_RELEARN_INTERVAL
+        ):
+            with sync_stage("learn"):
+                await asyncio.to_thread(self._learn, planner)
+
+        known = len(set(planner.intervals) | set(planner.last_seen))
+        due = planner.due_stations()
+        if known and not due:
+            logger.info("No stations due for polling, measurements sync skipped")
+            return {"due": 0}
+
+        if not known or len(due) >= settings.POLL_BULK_THRESHOLD * known:
+            return {
+                "due": len(due),
+                **await run_sync_job(
+                    "measurements", self.http_client, poll_planner=planner, watermarks=self.watermarks
+                ),
+            }
+        return {
+            "due": len(due),
+            **await run_sync_job(
+                "all", self.http_client, station_ids=due, poll_planner=planner, watermarks=self.watermarks
+            ),
+        }
@@ -0,0 +1,137 @@
+"""
+Równoległa synchronizacja stacji po ID
+"""
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from src.flood_monitoring.core.config import get_settings
+from src.flood_monitoring.core.database import SessionLocal
+from flood_monitoring.services.database import DatabaseService
+from flood_monitoring.services.http_client import IMGWHttpClient
+from flood_monitoring.services.imgw import IMGWService
+from flood_monitoring.services.polling import AdaptivePollPlanner
+from flood_monitoring.services.runs import current_run, sync_stage
+from flood_monitoring.services.watermarks import MeasurementWatermarks
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+COUNTERS = ("stan_fetched", "stan_inserted", "przeplyw_fetched", "przeplyw_inserted", "unchanged")
+
+
+class StationSyncRunner:
+    """Pula workerów pobierających dane stacji.
+
+    Każdy worker otwiera nową sesję bazy co session_batch stacji, więc połączenie wraca do puli,
+    a stan sesji nie rośnie przez cały przebieg niezależnie od liczby stacji.
+    """
+
+    def __init__(
+        self,
+        http_client: IMGWHttpClient,
+        session_factory: Callable[[], Session] = SessionLocal,
+        concurrency: Optional[int] = None,
+        poll_planner: Optional[AdaptivePollPlanner] = None,
+        watermarks: Optional[MeasurementWatermarks] = None,
+        session_batch: Optional[int] = None,
+    ):
+        self.http_client = http_client
+        self.session_factory = session_factory
+        self.concurrency = max(1, concurrency or settings.SYNC_CONCURRENCY)
+        self.session_batch = max(1, session_batch or settings.SYNC_SESSION_BATCH)
+        self.poll_planner = poll_planner
+        self.watermarks = watermarks
+
+    async def run_all(self) -> Dict[str, Any]:
+        """Zaktualizuj listę stacji z IMGW i zsynchronizuj wszystkie stacje po ID"""
+        db = self.session_factory()
+        try:
+            stations = await IMGWService(DatabaseService(db), self.http_client).get_stations()
+        finally:
+            db.close()
+        return await self.run([station["id_stacji"] for station in stations])
+
+    async def run(self, station_ids: List[str]) -> Dict[str, Any]:
+        """Zsynchronizuj podane stacje. Błędy pojedynczych stacji nie przerywają przebiegu."""
+        queue: asyncio.Queue = asyncio.Queue()
+        for station_id in dict.fromkeys(station_ids):
+            queue.put_nowait(station_id)
+
+        result: Dict[str, Any] = {
+            "stations": queue.qsize(),
+            "succeeded": 0,
+            "failed": 0,
+            **{counter: 0 for counter in COUNTERS},
+            "errors": {},
+        }
+        workers = min(self.concurrency, queue.qsize())
+        await asyncio.gather(*(self._worker(queue, result) for _ in range(workers)))
+
+        logger.info(
+            f"Parallel station sync finished: {result['succeeded']}/{result['stations']} stations, "
+            f"{result['stan_inserted']} stan, {result['przeplyw_inserted']} przeplyw, "
+            f"{result['unchanged']} unchanged, {result['failed']} failed (concurrency={workers})"
+        )
+        return result
+
+    async def _worker(self, queue: asyncio.Queue, result: Dict[str, Any]):
+        stats = current_run()
+        while not queue.empty():
+            db = self.session_factory()
+            try:
+                service = IMGWService(DatabaseService(db), self.http_client, self.poll_planner, self.watermarks)
+                for _ in range(self.session_batch):
+                    if queue.empty():
+                        break
+                    station_id = queue.get_nowait()
+                    try:
+                        station_result = await service.get_station_data(station_id)
+                    except Exception as e:
+                        await asyncio.to_thread(db.rollback)
+                        logger.error(f"Blad synchronizacji stacji {station_id}: {str(e)}")
+                        result["failed"] += 1
+                        result["errors"][station_id] = str(e)
+                        if stats is not None:
+                            stats.record_error(station_id, str(e))
+                        continue
+                    result["succeeded"] += 1
+                    for counter in COUNTERS:
+                        result[counter] += station_result[counter]
+            finally:
+                await asyncio.to_thread(db.close)
+
+
+async def run_sync_job(
+    kind: str,
+    http_client: IMGWHttpClient,
+    session_factory: Callable[[], Session] = SessionLocal,
+    station_ids: Optional[List[str]] = None,
+    concurrency: Optional[int] = None,
+    poll_planner: Optional[AdaptivePollPlanner] = None,
+    watermarks: Optional[MeasurementWatermarks] = None,
+) -> Dict[str, Any]:
+    """Uruchom zadanie synchronizacji poza żądaniem HTTP, z własną sesją bazy"""
+    if kind == "all":
+        runner = StationSyncRunner(http_client, session_factory, concurrency, poll_planner, watermarks)
+        return await (runner.run(station_ids) if station_ids else runner.run_all())
+
+    db = session_factory()
+    try:
+        service = IMGWService(DatabaseService(db), http_client, poll_planner, watermarks)
+        if kind == "stations":
+            with sync_stage("fetch"):
+                payload = await service.fetch_hydro_feed()
+            with sync_stage("parse"):
+                feed = service.parse_hydro_feed(payload)
+            with sync_stage("stations"):
+                return await asyncio.to_thread(service.db_service.sync_stations, feed["stations"])
+        if kind == "measurements":
+            return await service.sync_hydro_feed()
+        if kind == "warnings":
+            return await service.sync_warnings()
+        raise ValueError(f"Unknown sync job: {kind}")
+    finally:
+        db.close()
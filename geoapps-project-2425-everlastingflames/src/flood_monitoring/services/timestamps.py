@@ -0,0 +1,103 @@
+"""
+Parsowanie znaczników czasu IMGW
+"""
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+from zoneinfo import ZoneInfo
+
+WARSAW = ZoneInfo("Europe/Warsaw")
+
+FALLBACK_FORMATS = (
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S.%fZ",
+    "%d.%m.%Y %H:%M:%S",
+    "%d.%m.%Y %H:%M",
+)
+
+
+def warsaw_now() -> datetime:
+    """Bieżący czas lokalny Europe/Warsaw (bez strefy, jak kolumny w bazie)"""
+    return datetime.now(WARSAW).replace(tzinfo=None)
+
+
+def _to_warsaw(parsed: datetime) -> datetime:
+    if parsed.tzinfo is None:
+        return parsed
+    return parsed.astimezone(WARSAW).replace(tzinfo=None)
+
+
+def _iso(value: str) -> datetime:
+    return _to_warsaw(datetime.fromisoformat(value))
+
+
+def _strptime(fmt: str) -> Callable[[str], datetime]:
+    def parse(value: str) -> datetime:
+        parsed = datetime.strptime(value, fmt)
+        if fmt.endswith("Z"):
+            parsed = parsed.replace(tzinfo=ZoneInfo("UTC"))
+        return _to_warsaw(parsed)
+
+    return parse
+
+
+CANDIDATES = [_iso] + [_strptime(fmt) for fmt in FALLBACK_FORMATS]
+
+
+class IMGWTimestampParser:
+    """Parser znaczników czasu jednego pobrania danych IMGW.
+
+    Format jest wykrywany przy pierwszej wartości i używany dalej (ponowne wykrycie
+    tylko, gdy przestanie pasować). Czas bez strefy traktujemy jako lokalny
+    Europe/Warsaw, czas ze strefą (np. "Z") przeliczamy na Europe/Warsaw. Powtarzające
+    się napisy parsowane są raz. Wynik jest bez strefy, zgodnie z kolumnami w bazie.
+    """
+
+    def __init__(self, allow_future: bool = False, now: Optional[datetime] = None):
+        self.allow_future = allow_future
+        self.now = now or warsaw_now()
+        self.invalid = 0
+        self.future = 0
+        self._parse: Optional[Callable[[str], datetime]] = None
+        self._cache: Dict[str, Optional[datetime]] = {}
+
+    def _detect(self, value: str) -> Optional[datetime]:
+        for candidate in CANDIDATES:
+            try:
+                parsed = candidate(value)
+            except ValueError:
+                continue
+            self._parse = candidate
+            return parsed
+        return None
+
+    def _parse_uncached(self, value: str) -> Optional[datetime]:
+        parsed = None
+        if self._parse is not None:
+            try:
+                parsed = self._parse(value)
+            except ValueError:
+                parsed = None
+        if parsed is None:
+            parsed = self._detect(value)
+        if parsed is None:
+            self.invalid += 1
+            return None
+        if not self.allow_future and parsed > self.now:
+            self.future += 1
+            return None
+        return parsed
+
+    def parse(self, value: Optional[str]) -> Optional[datetime]:
+        """Sparsuj jedną wartość; None dla pustych, błędnych i (domyślnie) przyszłych dat"""
+        if not value:
+            return None
+        try:
+            return self._cache[value]
+        except KeyError:
+            parsed = self._cache[value] = self._parse_uncached(value)
+            return parsed
+
+    def parse_column(self, values: Iterable[Optional[str]]) -> List[Optional[datetime]]:
+        """Sparsuj całą kolumnę wartości"""
+        parse = self.parse
+        return [parse(value) for value in values]
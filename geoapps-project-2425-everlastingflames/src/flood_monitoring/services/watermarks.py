@@ -0,0 +1,63 @@
+"""
+Pamięć podręczna ostatnich zapisanych pomiarów stacji
+"""
+import logging
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from flood_monitoring.models.latest import StationLatest
+from flood_monitoring.models.measurements import PrzeplywMeasurement, StanMeasurement
+
+logger = logging.getLogger(__name__)
+
+
+class MeasurementWatermarks:
+    """Najnowszy zapisany znacznik czasu stanu i przepływu dla każdej stacji.
+
+    Znacznik przesuwa się tylko na pomiary, które na pewno są już w bazie, więc
+    przy kilku procesach zapisujących równolegle może być co najwyżej zaniżony -
+    wtedy duplikaty odrzuca ograniczenie unikalności w bazie. Odczyty starsze od
+    znacznika są pomijane, dlatego cache służy tylko bieżącej synchronizacji,
+    a nie imporcie danych historycznych.
+    """
+
+    def __init__(self):
+        self.series: Dict[str, Dict[str, datetime]] = {"stan": {}, "przeplyw": {}}
+
+    def warm(self, db: Session):
+        """Wczytaj znaczniki z tabeli station_latest (jeden wiersz na stację)"""
+        latest = db.query(
+            StationLatest.station_id, StationLatest.stan_wody_data_pomiaru, StationLatest.przeplyw_data
+        ).all()
+        if latest:
+            self.series["stan"] = {row[0]: row[1] for row in latest if row[1] is not None}
+            self.series["przeplyw"] = {row[0]: row[2] for row in latest if row[2] is not None}
+        else:
+            # Pusta station_latest (baza przed pierwszym init_db z tą tabelą) - agregat po całej historii
+            for series, station_column, time_column in (
+                ("stan", StanMeasurement.station_id, StanMeasurement.stan_wody_data_pomiaru),
+                ("przeplyw", PrzeplywMeasurement.station_id, PrzeplywMeasurement.przeplyw_data),
+            ):
+                rows = db.query(station_column, func.max(time_column)).group_by(station_column).all()
+                self.series[series] = {station_id: measured_at for station_id, measured_at in rows}
+        logger.info(
+            f"Watermarks warmed: {len(self.series['stan'])} stan, {len(self.series['przeplyw'])} przeplyw stations"
+        )
+
+    def filter_new(self, series: str, rows: List[tuple]) -> Tuple[List[tuple], int]:
+        """Odrzuć pomiary nie nowsze niż znacznik. Zwraca (nowe, liczba odrzuconych)."""
+        marks = self.series[series]
+        new_rows = [
+            row for row in rows if row[0] not in marks or row[1] > marks[row[0]]
+        ]
+        return new_rows, len(rows) - len(new_rows)
+
+    def advance(self, series: str, rows: List[tuple]):
+        """Przesuń znaczniki po udanym zapisie pomiarów"""
+        marks = self.series[series]
+        for station_id, measured_at, _ in rows:
+            if station_id not in marks or measured_at > marks[station_id]:
+                marks[station_id] = measured_at
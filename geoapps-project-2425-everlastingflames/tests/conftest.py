@@ -0,0 +1,62 @@
+"""
+Wspólna konfiguracja testów: ścieżki importu jak w benchmarkach i testowa baza Postgres
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+for path in (ROOT, ROOT / "src"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+# Testy oznaczone `db` pracują na TEST_DATABASE_URL; ustawione przed pierwszym odczytem konfiguracji,
+# żeby silnik aplikacji nigdy nie wskazywał bazy z DATABASE_URL
+if os.environ.get("TEST_DATABASE_URL"):
+    os.environ["DATABASE_URL"] = os.environ["TEST_DATABASE_URL"]
+
+
+@pytest.fixture(scope="session")
+def database_url() -> str:
+    """Osobna baza testowa z TEST_DATABASE_URL; bez niej testy oznaczone `db` są pomijane"""
+    url = os.environ.get("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL not set")
+    import psycopg2
+
+    try:
+        psycopg2.connect(url, connect_timeout=3).close()
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"test database unavailable: {e}")
+    return url
+
+
+@pytest.fixture(scope="session")
+def db_engine(database_url):
+    """Schemat aplikacji w bazie testowej, tworzony przez init_db jak przy wdrożeniu"""
+    from src.flood_monitoring.core.database import engine
+    from flood_monitoring.scripts.init_db import init_db
+
+    if not init_db():
+        pytest.fail("init_db failed on the test database")
+    return engine
+
+
+@pytest.fixture
+def db(db_engine):
+    """Sesja na pustych tabelach; dane testu są usuwane po jego zakończeniu"""
+    from sqlalchemy import text
+
+    from src.flood_monitoring.core.database import Base, SessionLocal
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+        tables = ", ".join(table.name for table in Base.metadata.sorted_tables)
+        with db_engine.begin() as connection:
+            connection.execute(text(f"TRUNCATE {tables} CASCADE"))
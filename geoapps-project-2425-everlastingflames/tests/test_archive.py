@@ -0,0 +1,47 @@
+import gzip
+import os
+from datetime import date, datetime
+
+from flood_monitoring.services.archive import PayloadArchive
+
+
+def test_write_and_read(tmp_path):
+    archive = PayloadArchive(str(tmp_path))
+    fetched_at = datetime(2025, 1, 15, 12, 5)
+    path = archive.write("hydro", "https://imgw/hydro", b'[{"id_stacji":"150160180","stan_wody":"210"}]', fetched_at)
+    assert path == os.path.join(str(tmp_path), "hydro", "2025-01-15", "12.jsonl.gz")
+
+    [(read_at, url, line)] = list(archive.read("hydro"))
+    assert (read_at, url) == (fetched_at, "https://imgw/hydro")
+    assert archive.payload(line) == [{"id_stacji": "150160180", "stan_wody": "210"}]
+
+
+def test_multiline_body_stored_as_one_line(tmp_path):
+    archive = PayloadArchive(str(tmp_path))
+    archive.write("warnings", "u", '[\n  {"opis": "Wisła"}\n]'.encode("utf-8"), datetime(2025, 1, 15, 12, 0))
+    archive.write("warnings", "u", b"[]", datetime(2025, 1, 15, 12, 30))
+    payloads = [archive.payload(line) for _, _, line in archive.read("warnings")]
+    assert payloads == [[{"opis": "Wisła"}], []]
+
+
+def test_files_in_order_and_filtered_by_day(tmp_path):
+    archive = PayloadArchive(str(tmp_path))
+    for fetched_at in (datetime(2025, 1, 16, 9), datetime(2025, 1, 15, 23), datetime(2025, 1, 15, 8)):
+        archive.write("hydro", "u", b"[]", fetched_at)
+    os.makedirs(tmp_path / "hydro" / "notatki")
+
+    times = [fetched_at for fetched_at, _, _ in archive.read("hydro")]
+    assert times == [datetime(2025, 1, 15, 8), datetime(2025, 1, 15, 23), datetime(2025, 1, 16, 9)]
+    assert len(archive.files("hydro", since=date(2025, 1, 16))) == 1
+    assert len(archive.files("hydro", until=date(2025, 1, 15))) == 2
+    assert archive.files("station") == []
+
+
+def test_truncated_member_keeps_earlier_lines(tmp_path):
+    archive = PayloadArchive(str(tmp_path))
+    path = archive.write("hydro", "u", b"[1]", datetime(2025, 1, 15, 12, 0))
+    archive.write("hydro", "u", b"[2]", datetime(2025, 1, 15, 12, 10))
+    with open(path, "ab") as archive_file:
+        archive_file.write(gzip.compress(b'{"fetched_at":"2025-01-15T12:20:00","url":"u","payload":[3]}\n')[:20])
+
+    assert [archive.payload(line) for _, _, line in archive.read("hydro")] == [[1], [2]]
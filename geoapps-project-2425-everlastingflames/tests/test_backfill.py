@@ -0,0 +1,86 @@
+import io
+import zipfile
+from datetime import datetime
+
+import pytest
+
+from flood_monitoring.services import backfill
+from flood_monitoring.services.backfill import HydroArchiveParser, detect_encoding, iter_csv_streams
+
+
+def _row(hydro_year, month_index, day, stan="210", przeplyw="35,5", calendar_month=None):
+    row = ["150160180", "KRAKÓW", "Wisła", str(hydro_year), str(month_index), str(day), stan, przeplyw, "4.2"]
+    if calendar_month is not None:
+        row.append(str(calendar_month))
+    return row
+
+
+@pytest.mark.parametrize(
+    "month_index, expected",
+    [
+        # Rok hydrologiczny 2025: listopad 2024 - październik 2025
+        (1, datetime(2024, 11, 3, 7, 0)),
+        (2, datetime(2024, 12, 3, 7, 0)),
+        (3, datetime(2025, 1, 3, 7, 0)),
+        (9, datetime(2025, 7, 3, 8, 0)),
+        (12, datetime(2025, 10, 3, 8, 0)),
+    ],
+)
+def test_hydrological_month_mapping(month_index, expected):
+    parsed = HydroArchiveParser().parse(_row(2025, month_index, 3))
+    assert parsed == ("150160180", expected, 210.0, 35.5)
+
+
+def test_calendar_month_column_wins():
+    parsed = HydroArchiveParser().parse(_row(2025, 1, 3, calendar_month=11))
+    assert parsed[1] == datetime(2024, 11, 3, 7, 0)
+
+
+def test_missing_values():
+    parsed = HydroArchiveParser().parse(_row(2025, 3, 3, stan="9999", przeplyw="99999.999"))
+    assert parsed[2:] == (None, None)
+    assert HydroArchiveParser().parse(_row(2025, 3, 3, stan="", przeplyw=" "))[2:] == (None, None)
+
+
+def test_station_code_normalized():
+    row = _row(2025, 3, 3)
+    row[0] = ' "150160180" '
+    assert HydroArchiveParser().parse(row)[0] == "150160180"
+    row[0] = "1234"
+    assert HydroArchiveParser().parse(row)[0] == "000001234"
+
+
+def test_invalid_rows_counted():
+    parser = HydroArchiveParser()
+    assert parser.parse(["Kod stacji", "Nazwa", "Rzeka", "Rok", "Miesiąc", "Dzień", "Stan", "Przepływ", "Temp"]) is None
+    assert parser.parse(_row(2025, 4, 30)) is None  # 30 lutego
+    assert parser.parse(["150160180", "KRAKÓW"]) is None
+    assert parser.invalid == 3
+
+
+def test_detect_encoding():
+    assert detect_encoding(io.BytesIO("Wisła,Kraków".encode("utf-8"))) == "utf-8-sig"
+    assert detect_encoding(io.BytesIO("Wisła,Kraków".encode("cp1250"))) == "cp1250"
+    assert detect_encoding(io.BytesIO(b"")) == "utf-8-sig"
+
+
+def test_detect_encoding_reads_past_first_chunk(monkeypatch):
+    monkeypatch.setattr(backfill, "READ_CHUNK", 16)
+    # Polskie znaki dopiero po kilku porcjach ASCII
+    assert detect_encoding(io.BytesIO(b"a" * 100 + "Łódź".encode("cp1250"))) == "cp1250"
+    # Znak UTF-8 rozcięty granicą porcji
+    assert detect_encoding(io.BytesIO(b"a" * 15 + "ł".encode("utf-8") + b"a" * 20)) == "utf-8-sig"
+
+
+def test_iter_csv_streams_from_zip(tmp_path):
+    path = tmp_path / "codz_2025_01.zip"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("codz_2025_01.csv", ("x" * 100_000 + "\nŁódź\n").encode("cp1250"))
+        archive.writestr("zjaw_2025_01.csv", b"pominiety")
+        archive.writestr("info.txt", b"opis")
+
+    streams = [(name, stream.read()) for name, stream in iter_csv_streams(str(path))]
+    assert len(streams) == 1
+    name, content = streams[0]
+    assert name == "codz_2025_01.csv"
+    assert content.endswith("\nŁódź\n")
@@ -0,0 +1,93 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+
+from flood_monitoring.models.measurements import StanMeasurement
+from flood_monitoring.scripts.init_db import compact_measurement_keys, init_db
+from flood_monitoring.services.database import DatabaseService
+
+LEGACY_LAYOUT = [
+    "ALTER TABLE stan_measurements DROP CONSTRAINT stan_measurements_pkey",
+    "ALTER TABLE stan_measurements ADD COLUMN id VARCHAR NOT NULL",
+    "ALTER TABLE stan_measurements ADD CONSTRAINT stan_measurements_pkey PRIMARY KEY (id, stan_wody_data_pomiaru)",
+    "ALTER TABLE stan_measurements ADD CONSTRAINT uix_station_stan_time UNIQUE (station_id, stan_wody_data_pomiaru)",
+    "CREATE INDEX ix_stan_station_id ON stan_measurements (station_id)",
+    "CREATE INDEX ix_stan_station_date ON stan_measurements (station_id, stan_wody_data_pomiaru)",
+]
+READINGS = {datetime(2025, 1, 15, 10, 0): 210.0, datetime(2025, 1, 15, 11, 0): 215.0}
+
+
+def _has_id_column(connection) -> bool:
+    return bool(
+        connection.execute(
+            text("SELECT 1 FROM information_schema.columns WHERE table_name = 'stan_measurements' AND column_name = 'id'")
+        ).scalar()
+    )
+
+
+@pytest.fixture
+def legacy_table(db, db_engine):
+    """stan_measurements w układzie sprzed zmiany klucza, z pomiarami stacji 150160180"""
+    DatabaseService(db).sync_stations(
+        [{"id_stacji": "150160180", "stacja": "KRAKÓW-BIELANY", "rzeka": "Wisła",
+          "wojewodztwo": "małopolskie", "lat": 50.0397, "lon": 19.8261}]
+    )
+    with db_engine.begin() as connection:
+        for statement in LEGACY_LAYOUT:
+            connection.execute(text(statement))
+        for measured_at, value in READINGS.items():
+            connection.execute(
+                text(
+                    "INSERT INTO stan_measurements (id, station_id, stan_wody_data_pomiaru, stan_wody) "
+                    "VALUES (:id, '150160180', :at, :value)"
+                ),
+                {"id": f"150160180_{measured_at:%Y%m%d%H%M}", "at": measured_at, "value": value},
+            )
+    try:
+        yield
+    finally:
+        with db_engine.begin() as connection:
+            legacy = _has_id_column(connection)
+            if legacy:
+                connection.execute(text("DROP TABLE stan_measurements CASCADE"))
+        if legacy and not init_db():
+            pytest.fail("could not restore stan_measurements after a failed migration")
+
+
+@pytest.mark.db
+def test_compact_keys_migrates_legacy_table(db, db_engine, legacy_table):
+    compact_measurement_keys()
+
+    with db_engine.connect() as connection:
+        assert not _has_id_column(connection)
+        key = connection.execute(
+            text(
+                "SELECT array_agg(a.attname ORDER BY k.ord) FROM pg_constraint c "
+                "CROSS JOIN unnest(c.conkey) WITH ORDINALITY AS k(attnum, ord) "
+                "JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = k.attnum "
+                "WHERE c.conrelid = 'stan_measurements'::regclass AND c.contype = 'p'"
+            )
+        ).scalar()
+        assert key == ["station_id", "stan_wody_data_pomiaru"]
+        indexes = set(
+            connection.execute(text("SELECT indexname FROM pg_indexes WHERE tablename = 'stan_measurements'")).scalars()
+        )
+        assert indexes == {"stan_measurements_pkey", "ix_stan_data_pomiaru"}
+        assert connection.execute(
+            text("SELECT count(*) FROM pg_constraint WHERE conname = 'uix_station_stan_time'")
+        ).scalar() == 0
+        leftovers = connection.execute(text("SELECT count(*) FROM pg_class WHERE relname LIKE '%\\_pk\\_new'")).scalar()
+        assert leftovers == 0
+
+    rows = dict(db.query(StanMeasurement.stan_wody_data_pomiaru, StanMeasurement.stan_wody))
+    assert rows == READINGS
+    # Ingest opiera ON CONFLICT na nowym kluczu głównym
+    duplicate = insert(StanMeasurement.__table__).values(
+        station_id="150160180", stan_wody_data_pomiaru=datetime(2025, 1, 15, 10, 0), stan_wody=999.0
+    ).on_conflict_do_nothing(index_elements=["station_id", "stan_wody_data_pomiaru"])
+    assert db.execute(duplicate).rowcount == 0
+
+    # Ponowne uruchomienie przy nowym układzie niczego nie zmienia
+    compact_measurement_keys()
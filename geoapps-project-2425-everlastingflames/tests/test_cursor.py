@@ -0,0 +1,41 @@
+import base64
+import json
+from datetime import datetime
+
+import pytest
+
+from flood_monitoring.services.database import _decode_cursor, _encode_cursor
+
+
+def _raw(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii")
+
+
+def test_round_trip():
+    state = {
+        "since": datetime(2025, 1, 1, 0, 0),
+        "stan": datetime(2025, 1, 3, 14, 20),
+        "przelyw": None,
+    }
+    cursor = _encode_cursor(state)
+    assert cursor.isascii() and "/" not in cursor and "+" not in cursor
+    assert _decode_cursor(cursor) == state
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "",
+        "%%%",
+        "zażółć",
+        base64.urlsafe_b64encode(b"not json").decode("ascii"),
+        _raw(["since"]),
+        _raw({"since": "yesterday"}),
+        _raw({"since": 12}),
+        _raw({"stan": "2025-01-03T14:20:00"}),
+        _raw({"since": None, "stan": None}),
+    ],
+)
+def test_malformed_cursor(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        _decode_cursor(cursor)
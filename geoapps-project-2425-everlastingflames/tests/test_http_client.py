@@ -0,0 +1,122 @@
+import asyncio
+import json
+
+from aiohttp import web
+
+from flood_monitoring.services.archive import PayloadArchive
+from flood_monitoring.services.http_client import IMGWHttpClient
+
+LAST_MODIFIED = "Wed, 15 Jan 2025 12:00:00 GMT"
+
+
+class FeedServer:
+    """Serwer jednej listy: odpowiada 304 na aktualny ETag, chyba że ignore_validators"""
+
+    def __init__(self):
+        self.payload = [{"id_stacji": "150160180", "stan_wody": "210"}]
+        self.etag = '"v1"'
+        self.ignore_validators = False
+        self.requests = []
+
+    async def handle(self, request):
+        self.requests.append(dict(request.headers))
+        if not self.ignore_validators and request.headers.get("If-None-Match") == self.etag:
+            return web.Response(status=304)
+        return web.Response(
+            body=json.dumps(self.payload).encode("utf-8"),
+            content_type="application/json",
+            headers={"ETag": self.etag, "Last-Modified": LAST_MODIFIED},
+        )
+
+    def sent(self, index):
+        headers = self.requests[index]
+        return headers.get("If-None-Match"), headers.get("If-Modified-Since")
+
+
+def run_against_feed(scenario, archive=None):
+    async def main():
+        server = FeedServer()
+        app = web.Application()
+        app.router.add_get("/hydro", server.handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = runner.addresses[0][:2]
+        try:
+            async with IMGWHttpClient(archive) as client:
+                await scenario(client, f"http://{host}:{port}/hydro", server)
+        finally:
+            await runner.cleanup()
+        return server
+
+    return asyncio.run(main())
+
+
+def test_validators_reused_after_confirm():
+    async def scenario(client, url, server):
+        assert await client.get_json(url, conditional=True) == (200, server.payload)
+        client.confirm(url)
+        assert await client.get_json(url, conditional=True) == (304, None)
+
+    server = run_against_feed(scenario)
+    assert server.sent(0) == (None, None)
+    assert server.sent(1) == ('"v1"', LAST_MODIFIED)
+
+
+def test_validators_not_saved_without_confirm():
+    async def scenario(client, url, server):
+        await client.get_json(url, conditional=True)
+        # Przetwarzanie nie powiodło się - ta sama treść musi wrócić przy kolejnej próbie
+        assert await client.get_json(url, conditional=True) == (200, server.payload)
+
+    server = run_against_feed(scenario)
+    assert server.sent(1) == (None, None)
+
+
+def test_identical_body_treated_as_not_modified():
+    async def scenario(client, url, server):
+        server.ignore_validators = True
+        await client.get_json(url, conditional=True)
+        client.confirm(url)
+        assert await client.get_json(url, conditional=True) == (304, None)
+        server.payload = [{"id_stacji": "150160180", "stan_wody": "215"}]
+        assert await client.get_json(url, conditional=True) == (200, server.payload)
+
+    run_against_feed(scenario)
+
+
+def test_new_version_replaces_validators_after_confirm():
+    async def scenario(client, url, server):
+        await client.get_json(url, conditional=True)
+        client.confirm(url)
+        server.payload, server.etag = [], '"v2"'
+        assert await client.get_json(url, conditional=True) == (200, [])
+        client.confirm(url)
+        assert await client.get_json(url, conditional=True) == (304, None)
+
+    server = run_against_feed(scenario)
+    assert [server.sent(index)[0] for index in range(3)] == [None, '"v1"', '"v2"']
+
+
+def test_unconditional_request_sends_no_validators():
+    async def scenario(client, url, server):
+        await client.get_json(url, conditional=True)
+        client.confirm(url)
+        assert await client.get_json(url) == (200, server.payload)
+
+    server = run_against_feed(scenario)
+    assert server.sent(1) == (None, None)
+
+
+def test_only_new_content_archived(tmp_path):
+    archive = PayloadArchive(str(tmp_path))
+
+    async def scenario(client, url, server):
+        server.ignore_validators = True
+        await client.get_json(url, conditional=True, archive_kind="hydro")
+        client.confirm(url)
+        await client.get_json(url, conditional=True, archive_kind="hydro")
+
+    run_against_feed(scenario, archive)
+    assert len(list(archive.read("hydro"))) == 1
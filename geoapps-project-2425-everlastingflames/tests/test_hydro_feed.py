@@ -0,0 +1,77 @@
+from datetime import datetime
+
+from flood_monitoring.services.imgw import IMGWService
+
+
+def _item(**fields):
+    item = {
+        "id_stacji": "150160180",
+        "stacja": "KRAKÓW-BIELANY",
+        "rzeka": "Wisła",
+        "wojewodztwo": "małopolskie",
+        "lat": "50.0397",
+        "lon": "19.8261",
+        "stan_wody": "210",
+        "stan_wody_data_pomiaru": "2025-01-15 12:00:00",
+        "przelyw": "35.5",
+        "przeplyw_data": "2025-01-15 11:00:00",
+    }
+    item.update(fields)
+    return item
+
+
+def parse(*items):
+    return IMGWService(db_service=None, http_client=None).parse_hydro_feed(list(items))
+
+
+def test_station_and_both_series():
+    feed = parse(_item())
+    assert feed["stations"] == [
+        {
+            "id_stacji": "150160180",
+            "stacja": "KRAKÓW-BIELANY",
+            "lat": 50.0397,
+            "lon": 19.8261,
+            "rzeka": "Wisła",
+            "wojewodztwo": "małopolskie",
+        }
+    ]
+    assert feed["stan"] == [("150160180", datetime(2025, 1, 15, 12, 0), 210.0)]
+    assert feed["przeplyw"] == [("150160180", datetime(2025, 1, 15, 11, 0), 35.5)]
+
+
+def test_missing_station_id_skipped():
+    feed = parse(_item(id_stacji=None), _item(id_stacji=""), {"stacja": "BEZ ID"})
+    assert feed == {"stations": [], "stan": [], "przeplyw": []}
+
+
+def test_bad_coordinates_skip_station_and_readings():
+    feed = parse(_item(id_stacji="1", lat="brak"), _item(id_stacji="2", lon=None), _item(id_stacji="3"))
+    assert [station["id_stacji"] for station in feed["stations"]] == ["3"]
+    assert [row[0] for row in feed["stan"]] == ["3"]
+
+
+def test_voivodeship_key_with_diacritics():
+    item = _item()
+    del item["wojewodztwo"]
+    item["województwo"] = "śląskie"
+    assert parse(item)["stations"][0]["wojewodztwo"] == "śląskie"
+    assert parse(_item(wojewodztwo=None))["stations"][0]["wojewodztwo"] is None
+
+
+def test_null_or_invalid_flow_dropped():
+    feed = parse(_item(id_stacji="1", przelyw=None), _item(id_stacji="2", przelyw="-"), _item(id_stacji="3", przelyw=[]))
+    assert feed["przeplyw"] == []
+    assert [row[0] for row in feed["stan"]] == ["1", "2", "3"]
+    assert len(feed["stations"]) == 3
+
+
+def test_invalid_and_future_timestamps_dropped():
+    feed = parse(
+        _item(id_stacji="1", stan_wody_data_pomiaru="wczoraj"),
+        _item(id_stacji="2", stan_wody_data_pomiaru="2999-01-01 00:00:00"),
+        _item(id_stacji="3", stan_wody_data_pomiaru=None),
+        _item(id_stacji="4"),
+    )
+    assert [row[0] for row in feed["stan"]] == ["4"]
+    assert [row[0] for row in feed["przeplyw"]] == ["1", "2", "3", "4"]
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from flood_monitoring.scripts import ingest_worker
+
+
+class FlakyFinish:
+    """finish_job, który zawodzi przy pierwszych `failures` wywołaniach"""
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.recorded = []
+
+    def __call__(self, job_id, result=None, error=None):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("database unavailable")
+        self.recorded.append((job_id, result, error))
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    async def tracked_run(kind, trigger, run, job_id=None):
+        if kind == "broken":
+            raise RuntimeError("IMGW down")
+        return {"kind": kind}
+
+    monkeypatch.setattr(ingest_worker, "tracked_run", tracked_run)
+    return ingest_worker.IngestWorker()
+
+
+def test_failed_finish_kept_for_retry(worker, monkeypatch):
+    finish = FlakyFinish(failures=1)
+    monkeypatch.setattr(ingest_worker, "finish_job", finish)
+
+    asyncio.run(worker.execute(4, "stations", {}))
+    assert finish.recorded == []
+    assert worker.unfinished == {4: {"result": {"kind": "stations"}}}
+
+    asyncio.run(worker.retry_unfinished())
+    assert finish.recorded == [(4, {"kind": "stations"}, None)]
+    assert worker.unfinished == {}
+
+
+def test_failed_finish_of_failed_job_keeps_error(worker, monkeypatch):
+    finish = FlakyFinish(failures=2)
+    monkeypatch.setattr(ingest_worker, "finish_job", finish)
+
+    asyncio.run(worker.execute(5, "broken", {}))
+    asyncio.run(worker.retry_unfinished())
+    assert worker.unfinished == {5: {"error": "IMGW down"}}
+
+    asyncio.run(worker.retry_unfinished())
+    assert finish.recorded == [(5, None, "IMGW down")]
+
+
+def test_loop_survives_database_errors(worker, monkeypatch):
+    finish = FlakyFinish(failures=1)
+    claims = [ConnectionError("database unavailable"), (6, "measurements", {}), None]
+
+    def claim_job(name):
+        claim = claims.pop(0) if claims else None
+        if isinstance(claim, Exception):
+            raise claim
+        if not claims:
+            worker.stop()
+        return claim
+
+    monkeypatch.setattr(ingest_worker, "finish_job", finish)
+    monkeypatch.setattr(ingest_worker, "claim_job", claim_job)
+    monkeypatch.setattr(ingest_worker, "requeue_interrupted", lambda: 0)
+    monkeypatch.setattr(ingest_worker.settings, "SYNC_SCHEDULER_ENABLED", False)
+    monkeypatch.setattr(ingest_worker.settings, "SYNC_WORKER_POLL_INTERVAL", 0)
+    monkeypatch.setattr(worker, "watermarks", None)
+    monkeypatch.setattr(worker.presence, "try_lock", lambda: True)
+    monkeypatch.setattr(worker.presence, "unlock", lambda: None)
+
+    asyncio.run(worker.run())
+    assert finish.recorded == [(6, {"kind": "measurements"}, None)]
+    assert worker.unfinished == {}
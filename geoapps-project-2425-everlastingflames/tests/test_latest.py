@@ -0,0 +1,68 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+
+from flood_monitoring.services import latest
+from flood_monitoring.services.database import DatabaseService
+
+KRAKOW = "150160180"
+TRYBSZ = "150190340"
+
+
+@pytest.fixture
+def service(db):
+    service = DatabaseService(db)
+    service.sync_stations(
+        [
+            {"id_stacji": KRAKOW, "stacja": "KRAKÓW-BIELANY", "rzeka": "Wisła",
+             "wojewodztwo": "małopolskie", "lat": 50.0397, "lon": 19.8261},
+            {"id_stacji": TRYBSZ, "stacja": "TRYBSZ", "rzeka": "Białka",
+             "wojewodztwo": "małopolskie", "lat": 49.4056, "lon": 20.1769},
+        ]
+    )
+    return service
+
+
+@pytest.mark.db
+def test_older_reading_does_not_overwrite_newer(db, service):
+    service.add_stan_measurements([(KRAKOW, datetime(2025, 1, 15, 12, 0), 210.0)])
+    service.add_stan_measurements(
+        [(KRAKOW, datetime(2025, 1, 15, 11, 0), 190.0), (TRYBSZ, datetime(2025, 1, 15, 9, 0), 95.0)]
+    )
+    service.add_przeplyw_measurements([(KRAKOW, datetime(2025, 1, 15, 11, 0), 35.5)])
+    service.add_stan_measurements([(KRAKOW, datetime(2025, 1, 15, 13, 0), 215.0)])
+
+    db.expire_all()
+    assert service.get_latest_measurements_for_all_stations() == {
+        KRAKOW: {
+            "stan_wody": 215.0,
+            "stan_wody_data_pomiaru": datetime(2025, 1, 15, 13, 0),
+            "przeplyw": 35.5,
+            "przeplyw_data": datetime(2025, 1, 15, 11, 0),
+        },
+        TRYBSZ: {"stan_wody": 95.0, "stan_wody_data_pomiaru": datetime(2025, 1, 15, 9, 0)},
+    }
+    assert latest.check(db) == {"stan": [], "przeplyw": []}
+
+
+@pytest.mark.db
+def test_check_reports_drift_and_rebuild_repairs(db, service):
+    service.add_stan_measurements([(KRAKOW, datetime(2025, 1, 15, 12, 0), 210.0)])
+    service.add_przeplyw_measurements([(TRYBSZ, datetime(2025, 1, 15, 9, 0), 4.2)])
+    expected = service.get_latest_measurements_for_all_stations()
+
+    db.execute(text("UPDATE station_latest SET stan_wody = 1.0 WHERE station_id = :id"), {"id": KRAKOW})
+    db.execute(text("DELETE FROM station_latest WHERE station_id = :id"), {"id": TRYBSZ})
+    db.commit()
+    mismatches = latest.check(db)
+    assert [(row["station_id"], row["expected_value"], row["stored_value"]) for row in mismatches["stan"]] == [
+        (KRAKOW, 210.0, 1.0)
+    ]
+    assert [(row["station_id"], row["stored_at"]) for row in mismatches["przeplyw"]] == [(TRYBSZ, None)]
+
+    assert latest.rebuild(db) == 2
+    db.commit()
+    db.expire_all()
+    assert latest.check(db) == {"stan": [], "przeplyw": []}
+    assert service.get_latest_measurements_for_all_stations() == expected
@@ -0,0 +1,75 @@
+import pytest
+
+from flood_monitoring.models.runs import SyncRun
+from flood_monitoring.services.locks import SyncLock, WorkerLock, is_locked, worker_alive
+from flood_monitoring.services.runs import SyncRunStore
+
+
+@pytest.fixture
+def held(db_engine):
+    """Blokady zwalniane po teście, także gdy asercja zawiedzie"""
+    locks = []
+
+    def hold(lock):
+        locks.append(lock)
+        return lock
+
+    yield hold
+    for lock in locks:
+        lock.unlock()
+
+
+@pytest.mark.db
+def test_lock_excludes_other_connections(db, held):
+    first = held(SyncLock("warnings"))
+    second = held(SyncLock("warnings"))
+
+    assert first.try_lock()
+    assert not second.try_lock()
+    assert is_locked(db, "warnings")
+
+    first.unlock()
+    assert not is_locked(db, "warnings")
+    assert second.try_lock()
+
+
+@pytest.mark.db
+def test_station_writing_kinds_share_one_lock(db, held):
+    assert held(SyncLock("measurements")).try_lock()
+
+    assert not held(SyncLock("stations")).try_lock()
+    assert not held(SyncLock("all")).try_lock()
+    assert is_locked(db, "all")
+    assert held(SyncLock("warnings")).try_lock()
+
+
+@pytest.mark.db
+def test_worker_presence(db, held):
+    worker = held(WorkerLock("host:101"))
+    assert not worker_alive(db, "host:101")
+
+    assert worker.try_lock()
+    assert worker_alive(db, "host:101")
+    assert not worker_alive(db, "host:102")
+    assert not held(WorkerLock("host:101")).try_lock()
+    # Przestrzenie kluczy są rozdzielne - obecność workera nie blokuje synchronizacji
+    assert not is_locked(db, "host:101")
+
+    worker.unlock()
+    assert not worker_alive(db, "host:101")
+
+
+@pytest.mark.db
+def test_abandoned_runs_of_group_failed(db):
+    store = SyncRunStore(db)
+    abandoned = [store.start(kind, "scheduler") for kind in ("stations", "all")]
+    other = store.start("warnings", "scheduler")
+
+    assert store.active("measurements") == abandoned[-1]
+    assert store.fail_abandoned("measurements") == 2
+    assert store.active("measurements") is None
+    assert store.active("warnings") == other
+
+    db.expire_all()
+    statuses = {run.id: run.status for run in db.query(SyncRun)}
+    assert statuses == {abandoned[0]: "failed", abandoned[1]: "failed", other: "running"}
@@ -0,0 +1,26 @@
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT
+
+
+@pytest.mark.db
+def test_memory_stays_flat(db, database_url):
+    """Skrócony bench_memory.py - w osobnym procesie, żeby mierzyć pamięć bez reszty testów.
+
+    Fikstura db czyści po benchmarku tabele, do których zapisał stacje i pomiary.
+    """
+    result = subprocess.run(
+        [
+            sys.executable, str(ROOT / "benchmarks" / "bench_memory.py"),
+            "--database-url", database_url,
+            "--stations", "300", "--rounds", "3", "--backfill-rows", "20000", "--flush-rows", "5000",
+        ],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        timeout=900,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
@@ -0,0 +1,94 @@
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import text
+
+from flood_monitoring.services import partitions
+from flood_monitoring.services.partitions import add_months, existing_partitions, maintain, month_start
+
+TODAY = date(2031, 6, 15)
+
+
+def test_month_arithmetic():
+    assert month_start(datetime(2025, 1, 31, 23, 59)) == date(2025, 1, 1)
+    assert add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+    assert add_months(date(2024, 11, 1), 14) == date(2026, 1, 1)
+    assert partitions.partition_name("stan_measurements", date(2025, 3, 1)) == "stan_measurements_p202503"
+
+
+@pytest.fixture
+def connection(db_engine, monkeypatch):
+    """Połączenie w transakcji wycofywanej po teście - partycje z odległych miesięcy nie zostają w bazie"""
+    monkeypatch.setattr(partitions.settings, "PARTITION_MONTHS_BEHIND", 1)
+    monkeypatch.setattr(partitions.settings, "PARTITION_MONTHS_AHEAD", 2)
+    monkeypatch.setattr(partitions.settings, "MEASUREMENT_RETENTION_MONTHS", 0)
+    with db_engine.connect() as connection:
+        transaction = connection.begin()
+        try:
+            connection.execute(
+                text(
+                    "INSERT INTO stations (id_stacji, stacja, lat, lon, geom, wojewodztwo) "
+                    "VALUES ('150160180', 'KRAKÓW-BIELANY', 50.0397, 19.8261, "
+                    "ST_SetSRID(ST_MakePoint(19.8261, 50.0397), 4326), 'małopolskie')"
+                )
+            )
+            yield connection
+        finally:
+            transaction.rollback()
+
+
+def _insert_stan(connection, measured_at):
+    connection.execute(
+        text("INSERT INTO stan_measurements (station_id, stan_wody_data_pomiaru, stan_wody) VALUES ('150160180', :at, 210)"),
+        {"at": measured_at},
+    )
+
+
+def _partition_of(connection, measured_at):
+    return connection.execute(
+        text("SELECT tableoid::regclass::text FROM stan_measurements WHERE stan_wody_data_pomiaru = :at"),
+        {"at": measured_at},
+    ).scalar_one()
+
+
+@pytest.mark.db
+def test_maintain_creates_window(connection):
+    result = maintain(connection, today=TODAY)
+
+    window = [date(2031, 5, 1), date(2031, 6, 1), date(2031, 7, 1), date(2031, 8, 1)]
+    assert result["created"] == 2 * len(window)
+    assert result["dropped"] == []
+    for table in partitions.PARTITIONED_TABLES:
+        assert set(window) <= set(existing_partitions(connection, table))
+
+    assert maintain(connection, today=TODAY) == {"created": 0, "dropped": []}
+    _insert_stan(connection, datetime(2031, 7, 3, 6, 0))
+    assert _partition_of(connection, datetime(2031, 7, 3, 6, 0)) == "stan_measurements_p203107"
+
+
+@pytest.mark.db
+def test_maintain_moves_rows_out_of_default(connection):
+    maintain(connection, today=TODAY)
+    stray = datetime(2031, 12, 24, 18, 0)
+    _insert_stan(connection, stray)
+    assert _partition_of(connection, stray) == "stan_measurements_default"
+
+    maintain(connection, today=TODAY)
+    assert _partition_of(connection, stray) == "stan_measurements_p203112"
+    assert connection.execute(text("SELECT count(*) FROM stan_measurements_default")).scalar() == 0
+
+
+@pytest.mark.db
+def test_retention_drops_old_partitions(connection, monkeypatch):
+    maintain(connection, today=TODAY)
+    _insert_stan(connection, datetime(2031, 5, 10, 6, 0))
+    _insert_stan(connection, datetime(2031, 6, 10, 6, 0))
+
+    monkeypatch.setattr(partitions.settings, "MEASUREMENT_RETENTION_MONTHS", 1)
+    result = maintain(connection, today=date(2031, 7, 1))
+
+    assert "stan_measurements_p203105" in result["dropped"]
+    assert "przeplyw_measurements_p203105" in result["dropped"]
+    assert not any(name.endswith(("_p203106", "_p203107")) for name in result["dropped"])
+    remaining = connection.execute(text("SELECT stan_wody_data_pomiaru FROM stan_measurements")).scalars().all()
+    assert remaining == [datetime(2031, 6, 10, 6, 0)]
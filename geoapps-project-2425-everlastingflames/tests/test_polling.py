@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from flood_monitoring.services import polling
+from flood_monitoring.services.polling import AdaptivePollPlanner
+
+T0 = datetime(2025, 1, 15, 12, 0)
+
+
+@pytest.fixture(autouse=True)
+def poll_settings(monkeypatch):
+    monkeypatch.setattr(polling.settings, "POLL_MIN_INTERVAL", 600)
+    monkeypatch.setattr(polling.settings, "POLL_MAX_INTERVAL", 86400)
+    monkeypatch.setattr(polling.settings, "POLL_RETRY_FRACTION", 0.25)
+
+
+def _at(minutes: int) -> datetime:
+    return T0 + timedelta(minutes=minutes)
+
+
+def test_first_hit_records_last_seen_without_interval():
+    planner = AdaptivePollPlanner()
+    planner.observe(["A"], [("A", T0, 100.0)], now=T0)
+    assert planner.hits == 1
+    assert planner.last_seen == {"A": T0}
+    assert planner.intervals == {}
+
+
+def test_hits_learn_interval_with_moving_average():
+    planner = AdaptivePollPlanner()
+    planner.observe(["A"], [("A", _at(0), 100.0)], now=_at(0))
+    planner.observe(["A"], [("A", _at(60), 101.0)], now=_at(61))
+    assert planner.intervals["A"] == 3600
+    planner.observe(["A"], [("A", _at(90), 102.0)], now=_at(91))
+    assert planner.intervals["A"] == pytest.approx(0.7 * 3600 + 0.3 * 1800)
+
+
+def test_latest_row_of_station_counts():
+    planner = AdaptivePollPlanner()
+    planner.observe(["A"], [("A", _at(10), 1.0), ("A", _at(30), 2.0), ("A", _at(20), 3.0)], now=_at(30))
+    assert planner.last_seen["A"] == _at(30)
+
+
+def test_interval_clamped():
+    planner = AdaptivePollPlanner()
+    planner.observe(["A", "B"], [("A", _at(0), 1.0), ("B", _at(0), 1.0)], now=_at(0))
+    planner.observe(["A"], [("A", _at(1), 1.0)], now=_at(1))
+    planner.observe(["B"], [("B", _at(3 * 24 * 60), 1.0)], now=_at(3 * 24 * 60))
+    assert planner.intervals == {"A": 600, "B": 86400}
+
+
+def test_miss_schedules_retry_and_hit_clears_it():
+    planner = AdaptivePollPlanner()
+    planner.intervals["A"] = 7200
+    planner.last_seen["A"] = _at(0)
+    planner.observe(["A"], [("A", _at(0), 100.0)], now=_at(120))
+    assert planner.misses == 1
+    assert planner.retry_after["A"] == _at(120 + 30)
+
+    planner.observe(["A"], [("A", _at(140), 101.0)], now=_at(150))
+    assert "A" not in planner.retry_after
+
+
+def test_miss_retry_not_shorter_than_minimum():
+    planner = AdaptivePollPlanner()
+    planner.observe(["A"], [], now=_at(0))
+    assert planner.retry_after["A"] == _at(10)
+
+
+def test_due_stations():
+    planner = AdaptivePollPlanner()
+    planner.intervals.update({"A": 3600, "B": 3600, "C": 3600})
+    planner.last_seen.update({"A": _at(0), "B": _at(30)})
+    # C nie ma jeszcze pomiaru - odpytywana od razu
+    assert planner.due_stations(now=_at(59)) == ["C"]
+    assert planner.due_stations(now=_at(60)) == ["A", "C"]
+    assert planner.due_stations(now=_at(90)) == ["A", "B", "C"]
+
+
+def test_retry_postpones_due_station():
+    planner = AdaptivePollPlanner()
+    planner.intervals["A"] = 3600
+    planner.last_seen["A"] = _at(0)
+    planner.retry_after["A"] = _at(75)
+    assert planner.due_stations(now=_at(70)) == []
+    assert planner.due_stations(now=_at(75)) == ["A"]
@@ -0,0 +1,85 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from flood_monitoring.models.measurements import StanMeasurement
+from flood_monitoring.models.station import Station
+from flood_monitoring.scripts.replay_archive import replay_measurements
+from flood_monitoring.services.archive import PayloadArchive
+from flood_monitoring.services.database import DatabaseService
+from flood_monitoring.services.imgw import IMGWService
+
+
+def _item(id_stacji, stacja, lat, lon, stan_wody, measured_at):
+    return {
+        "id_stacji": id_stacji,
+        "stacja": stacja,
+        "rzeka": "Wisła",
+        "wojewodztwo": "małopolskie",
+        "lat": lat,
+        "lon": lon,
+        "stan_wody": stan_wody,
+        "stan_wody_data_pomiaru": measured_at,
+        "przelyw": None,
+        "przeplyw_data": None,
+    }
+
+
+class RecordingDatabaseService:
+    def __init__(self):
+        self.station_calls = []
+
+    def sync_stations(self, stations, update_existing=True):
+        self.station_calls.append(([station["id_stacji"] for station in stations], update_existing))
+
+    def add_stan_measurements(self, rows):
+        return len(rows), 0
+
+    def add_przeplyw_measurements(self, rows):
+        return len(rows), 0
+
+
+def _archive(tmp_path, *snapshots):
+    archive = PayloadArchive(str(tmp_path))
+    for hour, items in enumerate(snapshots):
+        archive.write("hydro", "https://imgw/hydro", json.dumps(items).encode(), datetime(2025, 1, 15, 10 + hour))
+    return archive
+
+
+def test_replay_only_adds_missing_stations(tmp_path):
+    archive = _archive(
+        tmp_path,
+        [_item("150160180", "KRAKÓW-BIELANY", "50.0397", "19.8261", "210", "2025-01-15 10:00:00")],
+        [_item("150160180", "KRAKÓW-BIELANY", "50.0397", "19.8261", "215", "2025-01-15 11:00:00")],
+    )
+    db_service = RecordingDatabaseService()
+    counts = replay_measurements(archive, IMGWService(db_service, http_client=None), "hydro", None, None, 1000)
+
+    assert db_service.station_calls == [(["150160180"], False)]
+    assert counts["inserted"] == 2
+
+
+@pytest.mark.db
+def test_replay_keeps_current_station_metadata(db, tmp_path):
+    service = DatabaseService(db)
+    service.sync_stations(
+        [{"id_stacji": "150160180", "stacja": "KRAKÓW-BIELANY", "rzeka": "Wisła",
+          "wojewodztwo": "małopolskie", "lat": 50.0397, "lon": 19.8261}]
+    )
+    archive = _archive(
+        tmp_path,
+        [
+            _item("150160180", "KRAKÓW", "50.1", "19.9", "210", "2025-01-15 10:00:00"),
+            _item("150190340", "TRYBSZ", "49.4056", "20.1769", "95", "2025-01-15 10:00:00"),
+        ],
+    )
+    replay_measurements(archive, IMGWService(service, http_client=None), "hydro", None, None, 1000)
+
+    db.expire_all()
+    stations = {station.id_stacji: (station.stacja, station.lat, station.lon) for station in db.query(Station)}
+    assert stations == {
+        "150160180": ("KRAKÓW-BIELANY", 50.0397, 19.8261),
+        "150190340": ("TRYBSZ", 49.4056, 20.1769),
+    }
+    assert db.query(StanMeasurement).count() == 2
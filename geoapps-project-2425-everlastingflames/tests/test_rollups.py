@@ -0,0 +1,89 @@
+from datetime import datetime
+
+import pytest
+
+from flood_monitoring.models.rollups import DailyRollup, HourlyRollup
+from flood_monitoring.services import rollups
+from flood_monitoring.services.database import DatabaseService
+
+STATION = "150160180"
+DAY = datetime(2025, 1, 15)
+
+
+def _all(db, model):
+    db.expire_all()
+    return {
+        (row.seria, row.okres): (row.liczba, row.suma, row.suma_kwadratow, row.minimum, row.maksimum,
+                                 row.ostatni_pomiar, row.ostatnia_wartosc)
+        for row in db.query(model).filter(model.station_id == STATION)
+    }
+
+
+def _rollup(db, model, seria, okres):
+    return _all(db, model)[(seria, okres)]
+
+
+@pytest.fixture
+def service(db):
+    service = DatabaseService(db)
+    service.sync_stations(
+        [{"id_stacji": STATION, "stacja": "KRAKÓW-BIELANY", "rzeka": "Wisła",
+          "wojewodztwo": "małopolskie", "lat": 50.0397, "lon": 19.8261}]
+    )
+    return service
+
+
+def test_resolution_for(monkeypatch):
+    monkeypatch.setattr(rollups.settings, "ROLLUP_HOURLY_AFTER_DAYS", 3)
+    monkeypatch.setattr(rollups.settings, "ROLLUP_DAILY_AFTER_DAYS", 30)
+    assert rollups.resolution_for(1) == "raw"
+    assert rollups.resolution_for(7) == "hour"
+    assert rollups.resolution_for(90) == "day"
+
+
+@pytest.mark.db
+def test_rollups_count_only_new_rows(db, service):
+    service.add_stan_measurements(
+        [(STATION, datetime(2025, 1, 15, 10, 0), 210.0), (STATION, datetime(2025, 1, 15, 10, 30), 220.0)]
+    )
+    # Powtórzony odczyt jest pomijany, spóźniony starszy odczyt nie zmienia ostatniej wartości
+    inserted, skipped = service.add_stan_measurements(
+        [
+            (STATION, datetime(2025, 1, 15, 10, 30), 220.0),
+            (STATION, datetime(2025, 1, 15, 10, 10), 180.0),
+            (STATION, datetime(2025, 1, 15, 11, 15), 200.0),
+        ]
+    )
+    assert (inserted, skipped) == (2, 1)
+    service.add_przeplyw_measurements([(STATION, datetime(2025, 1, 15, 10, 0), 35.5)])
+
+    assert _rollup(db, HourlyRollup, "stan", datetime(2025, 1, 15, 10)) == (
+        3, 610.0, 210.0 ** 2 + 220.0 ** 2 + 180.0 ** 2, 180.0, 220.0, datetime(2025, 1, 15, 10, 30), 220.0,
+    )
+    assert _rollup(db, HourlyRollup, "stan", datetime(2025, 1, 15, 11)) == (
+        1, 200.0, 40000.0, 200.0, 200.0, datetime(2025, 1, 15, 11, 15), 200.0,
+    )
+    assert _rollup(db, DailyRollup, "stan", DAY) == (
+        4, 810.0, 210.0 ** 2 + 220.0 ** 2 + 180.0 ** 2 + 200.0 ** 2, 180.0, 220.0, datetime(2025, 1, 15, 11, 15), 200.0,
+    )
+    assert _rollup(db, DailyRollup, "przeplyw", DAY)[:2] == (1, 35.5)
+
+
+@pytest.mark.db
+def test_rebuild_matches_incremental(db, service):
+    service.add_stan_measurements([(STATION, datetime(2025, 1, 15, hour, 0), 200.0 + hour) for hour in range(0, 24, 3)])
+    service.add_stan_measurements([(STATION, datetime(2025, 1, 15, hour, 30), 150.0 + hour) for hour in range(1, 24, 5)])
+    service.add_stan_measurements([(STATION, datetime(2025, 1, 16, 2, 0), 190.0)])
+    hourly, daily = _all(db, HourlyRollup), _all(db, DailyRollup)
+
+    assert rollups.rebuild(db, "stan", DAY, datetime(2025, 1, 16)) == 13
+    db.commit()
+    assert _all(db, HourlyRollup) == hourly
+    assert _all(db, DailyRollup) == daily
+
+    # Przeliczenie naprawia rozjechane agregaty i nie rusza dni spoza zakresu
+    db.query(DailyRollup).filter(DailyRollup.okres == DAY).update({"liczba": 1, "suma": 0.0})
+    db.commit()
+    rollups.rebuild(db, "stan", DAY, datetime(2025, 1, 16))
+    db.commit()
+    assert _all(db, DailyRollup) == daily
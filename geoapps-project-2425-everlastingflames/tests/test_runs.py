@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from flood_monitoring.services import runs
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    finished = []
+    monkeypatch.setattr(runs, "_start_run", lambda kind, trigger, job_id: 7)
+    monkeypatch.setattr(
+        runs, "_finish_run",
+        lambda run_id, stats, duration, result, error: finished.append((run_id, result, error)),
+    )
+    return finished
+
+
+def test_finished_run_recorded_with_result(recorded):
+    async def run():
+        return {"stations": 3}
+
+    result = asyncio.run(runs._tracked("stations", "manual", run, None))
+    assert result == {"stations": 3, "run_id": 7}
+    assert recorded == [(7, {"stations": 3}, None)]
+
+
+def test_failed_run_recorded_with_error(recorded):
+    async def run():
+        raise RuntimeError("IMGW down")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(runs._tracked("stations", "manual", run, None))
+    assert recorded == [(7, None, "IMGW down")]
+
+
+def test_cancelled_run_recorded_as_failed(recorded):
+    async def main():
+        started = asyncio.Event()
+
+        async def run():
+            started.set()
+            await asyncio.sleep(3600)
+
+        task = asyncio.create_task(runs._tracked("measurements", "scheduler", run, None))
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert recorded == [(7, None, "cancelled")]
@@ -0,0 +1,120 @@
+import asyncio
+import json
+import socket
+import threading
+
+import pytest
+from aiohttp import web
+
+from flood_monitoring.scripts import sync
+from flood_monitoring.services import imgw, runs
+
+HYDRO = [
+    {
+        "id_stacji": "150160180",
+        "stacja": "KRAKÓW-BIELANY",
+        "rzeka": "Wisła",
+        "województwo": "małopolskie",
+        "lat": "50.0397",
+        "lon": "19.8261",
+        "stan_wody": "210",
+        "stan_wody_data_pomiaru": "2025-01-15 12:00:00",
+        "przelyw": None,
+        "przeplyw_data": None,
+    }
+]
+
+
+def test_default_kinds():
+    args = sync.parse_args([])
+    assert args.kinds == ["stations", "measurements", "warnings"]
+    assert (args.station_ids, args.dry_run, args.json, args.quiet) == (None, False, False, False)
+
+
+def test_kinds_and_stations():
+    args = sync.parse_args(["measurements", "warnings", "--station", "1", "--station", "2", "--concurrency", "4"])
+    assert args.kinds == ["measurements", "warnings"]
+    assert args.station_ids == ["1", "2"]
+    assert args.concurrency == 4
+
+
+@pytest.mark.parametrize("argv", [["measurments"], ["--concurrency", "many"], ["--unknown"]])
+def test_invalid_arguments_exit_with_2(argv):
+    with pytest.raises(SystemExit) as exited:
+        sync.parse_args(argv)
+    assert exited.value.code == 2
+
+
+@pytest.mark.parametrize(
+    "statuses, code",
+    [
+        ([], sync.EXIT_OK),
+        (["done", "done"], sync.EXIT_OK),
+        (["done", "partial"], sync.EXIT_PARTIAL),
+        (["done", "busy"], sync.EXIT_BUSY),
+        (["partial", "busy"], sync.EXIT_PARTIAL),
+        (["busy", "partial", "failed"], sync.EXIT_FAILED),
+    ],
+)
+def test_exit_code(statuses, code):
+    report = {"tasks": {f"task{index}": {"status": status} for index, status in enumerate(statuses)}}
+    assert sync.exit_code(report) == code
+
+
+@pytest.fixture
+def fake_imgw(monkeypatch):
+    """Lista hydro, /id/{id} (tylko stacja z listy) i pusta lista ostrzeżeń na lokalnym porcie"""
+
+    async def hydro(request):
+        return web.json_response(HYDRO)
+
+    async def station(request):
+        if request.match_info["station_id"] != HYDRO[0]["id_stacji"]:
+            return web.Response(status=404)
+        return web.json_response(HYDRO)
+
+    async def warnings(request):
+        return web.json_response([])
+
+    app = web.Application()
+    app.router.add_get("/hydro", hydro)
+    app.router.add_get("/hydro/id/{station_id}", station)
+    app.router.add_get("/warnings", warnings)
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(app)
+    loop.run_until_complete(runner.setup())
+    loop.run_until_complete(web.TCPSite(runner, "127.0.0.1", port).start())
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    monkeypatch.setattr(imgw.settings, "IMGW_API_URL", f"http://127.0.0.1:{port}/hydro")
+    monkeypatch.setattr(imgw.settings, "IMGW_WARNINGS_URL", f"http://127.0.0.1:{port}/warnings")
+
+    def no_database(*args, **kwargs):
+        raise AssertionError("dry run must not touch the database")
+
+    monkeypatch.setattr(runs, "tracked_run", no_database)
+    yield
+    asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+
+
+def test_dry_run_json_on_stdout(fake_imgw, capsys):
+    assert sync.main(["--dry-run", "--json"]) == sync.EXIT_OK
+    report = json.loads(capsys.readouterr().out)
+    assert report["dry_run"] is True
+    assert report["exit_code"] == 0
+    assert report["tasks"]["measurements"]["result"] == {"stations": 1, "stan_fetched": 1, "przeplyw_fetched": 0}
+    assert report["tasks"]["warnings"]["result"] == {"warnings": 0}
+
+
+def test_dry_run_missing_station_is_partial(fake_imgw, capsys):
+    assert sync.main(["measurements", "--station", "150160180", "--station", "1", "--dry-run", "--json"]) == 3
+    task = json.loads(capsys.readouterr().out)["tasks"]["all"]
+    assert task["status"] == "partial"
+    assert list(task["result"]["errors"]) == ["1"]
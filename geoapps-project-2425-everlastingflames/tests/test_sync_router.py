@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from flood_monitoring.api.dependencies import get_sync_job_queue
+from flood_monitoring.api.routers import sync
+
+
+class RecordingQueue:
+    db = None
+
+    def __init__(self):
+        self.jobs = []
+
+    def enqueue(self, kind, params):
+        self.jobs.append((kind, params))
+        return SimpleNamespace(id=len(self.jobs), status="queued")
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    monkeypatch.setattr(sync, "is_locked", lambda db, kind: False)
+    return RecordingQueue()
+
+
+@pytest.fixture
+def client(queue):
+    app = FastAPI()
+    app.include_router(sync.router)
+    app.dependency_overrides[get_sync_job_queue] = lambda: queue
+    return TestClient(app)
+
+
+def test_sync_all_uses_bulk_feed_by_default(client, queue):
+    response = client.post("/sync/all")
+    assert response.status_code == 202
+    assert queue.jobs == [("measurements", {})]
+
+
+def test_sync_all_by_id(client, queue):
+    client.post("/sync/all", params={"by_id": "true", "concurrency": 5})
+    assert queue.jobs == [("all", {"concurrency": 5})]
+
+
+def test_sync_stations_modes(client, queue):
+    client.post("/sync/stations")
+    client.post("/sync/stations", params={"bulk": "false"})
+    client.post("/sync/stations", params=[("station_ids", "1"), ("station_ids", "2"), ("station_ids", "1")])
+    assert queue.jobs == [
+        ("measurements", {}),
+        ("all", {"concurrency": None}),
+        ("all", {"station_ids": ["1", "2"], "concurrency": None}),
+    ]
+
+
+def test_running_sync_conflicts(client, queue, monkeypatch):
+    monkeypatch.setattr(sync, "is_locked", lambda db, kind: True)
+    monkeypatch.setattr(sync.SyncRunStore, "active", lambda self, kind: 12)
+    response = client.post("/sync/all")
+    assert response.status_code == 409
+    assert response.json()["detail"]["run_id"] == 12
+    assert queue.jobs == []
@@ -0,0 +1,60 @@
+from datetime import datetime
+
+from flood_monitoring.services.timestamps import IMGWTimestampParser, _iso
+
+NOW = datetime(2025, 3, 1, 12, 0)
+
+
+def test_format_detected_once_and_reused():
+    parser = IMGWTimestampParser(now=NOW)
+    assert parser.parse("15.01.2025 08:30") == datetime(2025, 1, 15, 8, 30)
+    detected = parser._parse
+    assert detected is not _iso
+
+    assert parser.parse("16.01.2025 09:40") == datetime(2025, 1, 16, 9, 40)
+    assert parser._parse is detected
+
+
+def test_format_redetected_when_it_stops_matching():
+    parser = IMGWTimestampParser(now=NOW)
+    parser.parse("15.01.2025 08:30")
+    assert parser.parse("2025-01-16 09:40:00") == datetime(2025, 1, 16, 9, 40)
+    assert parser._parse is _iso
+
+
+def test_repeated_values_parsed_once():
+    parser = IMGWTimestampParser(now=NOW)
+    first = parser.parse_column(["2025-01-15 08:30:00"] * 3)
+    assert first == [datetime(2025, 1, 15, 8, 30)] * 3
+    assert list(parser._cache) == ["2025-01-15 08:30:00"]
+
+
+def test_utc_converted_to_warsaw():
+    parser = IMGWTimestampParser(now=NOW)
+    # Zima UTC+1, lato UTC+2; wynik bez strefy
+    assert parser.parse("2025-01-15T11:00:00.000Z") == datetime(2025, 1, 15, 12, 0)
+    assert parser.parse("2024-07-15T10:00:00+00:00") == datetime(2024, 7, 15, 12, 0)
+
+
+def test_naive_time_is_local():
+    parser = IMGWTimestampParser(now=NOW)
+    assert parser.parse("2024-07-15 10:00:00") == datetime(2024, 7, 15, 10, 0)
+
+
+def test_future_dates_rejected_by_default():
+    parser = IMGWTimestampParser(now=NOW)
+    assert parser.parse("2025-03-01 12:10:00") is None
+    assert parser.future == 1
+    assert parser.parse("2025-03-01 11:50:00") == datetime(2025, 3, 1, 11, 50)
+
+
+def test_future_dates_allowed_for_warnings():
+    parser = IMGWTimestampParser(allow_future=True, now=NOW)
+    assert parser.parse("2025-03-02 06:00:00") == datetime(2025, 3, 2, 6, 0)
+    assert parser.future == 0
+
+
+def test_empty_and_invalid_values():
+    parser = IMGWTimestampParser(now=NOW)
+    assert parser.parse_column([None, "", "wczoraj"]) == [None, None, None]
+    assert parser.invalid == 1
@@ -0,0 +1,111 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+
+from flood_monitoring.models.warnings import HydroWarning, WarningArea
+from flood_monitoring.services.database import DatabaseService, _diff_warnings, _warning_digest
+
+PUBLISHED = datetime(2025, 1, 15, 8, 0)
+T1 = datetime(2025, 1, 15, 9, 0)
+T2 = datetime(2025, 1, 15, 10, 0)
+
+
+def _warning(numer="1/2025", stopien="1", opis="Wisła od Krakowa"):
+    return {
+        "opublikowano": PUBLISHED,
+        "stopien": stopien,
+        "data_od": datetime(2025, 1, 15, 12, 0),
+        "data_do": datetime(2025, 1, 17, 12, 0),
+        "prawdopodobienstwo": "80",
+        "numer": numer,
+        "biuro": "BPH Kraków",
+        "zdarzenie": "Wezbranie z przekroczeniem stanów ostrzegawczych",
+        "przebieg": "Wzrost stanów wody",
+        "komentarz": "",
+        "obszary": [{"wojewodztwo": "małopolskie", "opis": opis, "kod_zlewni": ["2132"]}],
+    }
+
+
+def _key(warning):
+    return warning["numer"], warning["biuro"], warning["opublikowano"]
+
+
+def _stored(row_id, warning, aktywne=True, skrot=None):
+    return SimpleNamespace(id=row_id, skrot=skrot if skrot is not None else _warning_digest(warning), aktywne=aktywne)
+
+
+def _diff(warnings, existing):
+    feed = {_key(warning): warning for warning in warnings}
+    return _diff_warnings(feed, existing, {key: _warning_digest(warning) for key, warning in feed.items()})
+
+
+def test_digest_covers_areas():
+    assert _warning_digest(_warning()) == _warning_digest(_warning())
+    assert _warning_digest(_warning()) != _warning_digest(_warning(opis="Wisła do Sandomierza"))
+    assert _warning_digest(_warning()) != _warning_digest(_warning(stopien="2"))
+
+
+def test_new_warning():
+    assert _diff([_warning()], {}) == ([_key(_warning())], [], [], [])
+
+
+def test_unchanged_warning_not_updated():
+    warning = _warning()
+    assert _diff([warning], {_key(warning): _stored(1, warning)}) == ([], [], [], [])
+
+
+def test_changed_warning():
+    warning = _warning()
+    existing = {_key(warning): _stored(1, warning)}
+    assert _diff([_warning(stopien="2")], existing) == ([], [_key(warning)], [], [])
+
+
+def test_legacy_row_without_digest_is_changed():
+    warning = _warning()
+    assert _diff([warning], {_key(warning): _stored(1, warning, skrot="")})[1] == [_key(warning)]
+
+
+def test_withdrawn_and_reactivated():
+    first, second = _warning("1/2025"), _warning("2/2025")
+    existing = {_key(first): _stored(1, first), _key(second): _stored(2, second, aktywne=False)}
+    assert _diff([second], existing) == ([], [], [_key(second)], [1])
+
+
+def test_inactive_missing_warning_not_withdrawn_again():
+    warning = _warning()
+    assert _diff([], {_key(warning): _stored(1, warning, aktywne=False)}) == ([], [], [], [])
+
+
+@pytest.mark.db
+def test_sync_transitions_and_counters(db):
+    service = DatabaseService(db)
+    first, second = _warning("1/2025"), _warning("2/2025")
+
+    assert service.sync_warnings([first, second], now=T1) == {
+        "inserted": 2, "updated": 0, "withdrawn": 0, "untouched": 0,
+    }
+    assert db.query(WarningArea).count() == 2
+
+    versions = dict(db.execute(text("SELECT numer, xmin::text FROM hydro_warnings")).all())
+    assert service.sync_warnings([first, second], now=T2) == {
+        "inserted": 0, "updated": 0, "withdrawn": 0, "untouched": 2,
+    }
+    # Niezmieniony skrót - wiersze nie są przepisywane
+    assert dict(db.execute(text("SELECT numer, xmin::text FROM hydro_warnings")).all()) == versions
+
+    assert service.sync_warnings([_warning("1/2025", stopien="2")], now=T2) == {
+        "inserted": 0, "updated": 1, "withdrawn": 1, "untouched": 0,
+    }
+    rows = {row.numer: row for row in db.query(HydroWarning)}
+    assert (rows["1/2025"].stopien, rows["1/2025"].zmieniono, rows["1/2025"].aktywne) == ("2", T2, True)
+    assert (rows["2/2025"].aktywne, rows["2/2025"].wycofano) == (False, T2)
+    assert db.query(WarningArea).count() == 2
+
+    assert service.sync_warnings([_warning("1/2025", stopien="2"), second], now=T2) == {
+        "inserted": 0, "updated": 1, "withdrawn": 0, "untouched": 1,
+    }
+    db.expire_all()
+    reactivated = db.query(HydroWarning).filter(HydroWarning.numer == "2/2025").one()
+    assert (reactivated.aktywne, reactivated.wycofano) == (True, None)
@@ -0,0 +1,34 @@
+from datetime import datetime
+
+from flood_monitoring.services.watermarks import MeasurementWatermarks
+
+T0 = datetime(2025, 1, 15, 12, 0)
+T1 = datetime(2025, 1, 15, 12, 10)
+
+
+def test_filter_new_without_marks_keeps_everything():
+    watermarks = MeasurementWatermarks()
+    rows = [("A", T0, 100.0), ("B", T0, 50.0)]
+    assert watermarks.filter_new("stan", rows) == (rows, 0)
+
+
+def test_filter_new_rejects_rows_not_newer_than_mark():
+    watermarks = MeasurementWatermarks()
+    watermarks.series["stan"] = {"A": T0}
+    rows = [("A", T0, 100.0), ("A", T1, 101.0), ("B", T0, 50.0)]
+    new_rows, rejected = watermarks.filter_new("stan", rows)
+    assert new_rows == [("A", T1, 101.0), ("B", T0, 50.0)]
+    assert rejected == 1
+
+
+def test_series_are_independent():
+    watermarks = MeasurementWatermarks()
+    watermarks.advance("stan", [("A", T1, 100.0)])
+    assert watermarks.filter_new("przeplyw", [("A", T0, 1.5)]) == ([("A", T0, 1.5)], 0)
+
+
+def test_advance_only_moves_forward():
+    watermarks = MeasurementWatermarks()
+    watermarks.advance("stan", [("A", T1, 100.0), ("B", T0, 50.0)])
+    watermarks.advance("stan", [("A", T0, 99.0), ("B", T1, 51.0)])
+    assert watermarks.series["stan"] == {"A": T1, "B": T1}